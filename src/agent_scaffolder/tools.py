@@ -1,9 +1,31 @@
 from __future__ import annotations
+import ast
+import asyncio
+import importlib.util
+import itertools
+import json
+import keyword
+import os
+import py_compile
 import re
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 from solace_ai_connector.common.log import log
+from src.artifact_io import load_artifact_bytes
+from src.tool_reloader import reload_module
+from src.tool_metrics import instrument_tool
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
 
 # -----------------------------
 # Utilities
@@ -21,6 +43,116 @@ def _ensure_ident(s: str, kind: str) -> str:
 def _now_tag() -> str:
     return datetime.utcnow().strftime("%Y%m%d-%H%M%S")
 
+_PATH_LOCKS: Dict[str, threading.Lock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+@contextmanager
+def _module_lock(py_file: Path) -> Iterator[None]:
+    """
+    Serialize read-modify-write cycles on one generated module: a per-path
+    thread lock within this process plus an flock on a sidecar lock file
+    across processes (where fcntl is available).
+    """
+    key = str(py_file.resolve())
+    with _PATH_LOCKS_GUARD:
+        lock = _PATH_LOCKS.setdefault(key, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        lock_path = py_file.with_name(f".{py_file.name}.lock")
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def _atomic_write_stream(
+    path: Path,
+    chunks: Iterable[str],
+    validate: Optional[Callable[[Path], Optional[str]]] = None,
+) -> Optional[str]:
+    """
+    Write chunks to a temp file in the same directory, fsync, then rename over
+    the target, so readers (and `sam run`) never see a half-written module.
+    Chunks are written as they are produced and never joined in memory.
+    With `validate`, the temp file is checked first and only renamed when the
+    check returns None; otherwise it is removed, the target is left untouched
+    and the error text is returned.
+    """
+    mode = (path.stat().st_mode & 0o777) if path.exists() else 0o644
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=f".tmp{path.suffix}")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        error = validate(Path(tmp)) if validate else None
+        if error:
+            os.unlink(tmp)
+            return error
+        os.replace(tmp, path)
+        return None
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    _atomic_write_stream(path, (text,))
+
+# Import checks run in fresh interpreters; this bounds how many run at once
+_IMPORT_CHECK_SLOTS = threading.BoundedSemaphore(
+    int(os.environ.get("TOOL_VALIDATION_WORKERS", 0)) or min(8, os.cpu_count() or 1)
+)
+IMPORT_CHECK_TIMEOUT = 60
+
+def _import_check_enabled() -> bool:
+    return os.environ.get("TOOL_IMPORT_CHECK", "true").lower() not in {"0", "false", "no"}
+
+# Loads the staged file under the target's module name, so its package and imports resolve as they will
+_IMPORT_STAGED = (
+    "import importlib.util, sys; name, path = sys.argv[1:3]; "
+    "spec = importlib.util.spec_from_file_location(name, path); module = importlib.util.module_from_spec(spec); "
+    "sys.modules[name] = module; spec.loader.exec_module(module)"
+)
+
+def _validate_module(staged: Path, py_file: Path, module_path: str, base: Path) -> Optional[str]:
+    """
+    Byte-compile a staged module into py_file's __pycache__ entry (the rename
+    keeps mtime and size, so the .pyc stays valid for faster cold starts),
+    then import it in a separate interpreter so errors raised at import time
+    surface now instead of at `sam run`.
+    Returns the error text, or None if the module is valid.
+    """
+    try:
+        py_compile.compile(str(staged), cfile=importlib.util.cache_from_source(str(py_file)), dfile=str(py_file), doraise=True)
+    except py_compile.PyCompileError as e:
+        return e.msg.strip()
+    if not _import_check_enabled():
+        return None
+
+    env = dict(os.environ, TOOL_HOT_RELOAD="false")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(base), env.get("PYTHONPATH", "")) if p)
+    with _IMPORT_CHECK_SLOTS:
+        try:
+            proc = subprocess.run(
+                [sys.executable, "-c", _IMPORT_STAGED, module_path, str(staged)],
+                cwd=str(base), env=env, capture_output=True, text=True, timeout=IMPORT_CHECK_TIMEOUT,
+            )
+        except subprocess.TimeoutExpired:
+            return f"Importing {module_path} did not finish within {IMPORT_CHECK_TIMEOUT}s"
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        # Keep the tail of the traceback: the failing line and the exception
+        return "\n".join(lines[-3:]) or f"Importing {module_path} exited with code {proc.returncode}"
+    return None
+
 def _resolve_base(tool_context) -> Path:
     """
     Resolve a stable base dir for writing source files.
@@ -82,9 +214,56 @@ def _default_body(return_type: str | None) -> str:
         return "    result = {\"status\": \"ok\", \"note\": \"Replace with real logic\"}\n    return result\n"
     return "    return \"OK (replace with real logic)\"\n"
 
-def _function_exists(file_text: str, fname: str) -> bool:
-    pattern = re.compile(rf"^async\s+def\s+{re.escape(fname)}\s*\(", re.MULTILINE)
-    return bool(pattern.search(file_text))
+def _index_top_level(file_text: str) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Parse a module once and map each top-level def/async def/class name to its
+    line spans as (start, end) 0-based half-open ranges, decorators included.
+    Raises SyntaxError if the module does not parse.
+    """
+    spans: Dict[str, List[Tuple[int, int]]] = {}
+    for node in ast.parse(file_text).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+            spans.setdefault(node.name, []).append((start, node.end_lineno))
+    return spans
+
+def _apply_module_edits(
+    file_text: str,
+    blocks: Dict[str, str],
+    spans: Dict[str, List[Tuple[int, int]]],
+) -> str:
+    """
+    Rebuild a module in one pass over its lines: each name in `blocks` that already
+    has spans is replaced in place (its first definition swapped, later duplicates
+    dropped); the rest are appended at the end in order.
+    """
+    replacements: Dict[int, Tuple[int, str]] = {}
+    appended: List[str] = []
+    for name, block in blocks.items():
+        if name in spans:
+            first, *rest = spans[name]
+            replacements[first[0]] = (first[1], block.rstrip("\n") + "\n")
+            for start, end in rest:
+                replacements[start] = (end, "")
+        else:
+            appended.append(block)
+
+    lines = file_text.splitlines(keepends=True)
+    out: List[str] = []
+    i = 0
+    for start in sorted(replacements):
+        end, block = replacements[start]
+        out.extend(lines[i:start])
+        out.append(block)
+        i = end
+    out.extend(lines[i:])
+
+    text = "".join(out)
+    if appended:
+        if text:
+            text = text.rstrip("\n") + "\n\n"
+        text += "".join(appended)
+    return text
 
 def _render_function_block(spec: Dict[str, Any]) -> str:
     fname = _ensure_ident(spec["function_name"], "function")
@@ -97,14 +276,15 @@ def _render_function_block(spec: Dict[str, Any]) -> str:
     doc = _render_docstring(desc, params, returns)
 
     block = []
+    block.append("@instrument_tool")
     block.append(f"async def {fname}({sig}) -> {returns.get('type','Any')}:")
     block.append(f"    {doc}")
     # Simple trace log
     block.append(f"    log.info(\"[{fname}] called\")")
     # Inject custom body or default
     if body:
-        # indent provided body to 4 spaces and ensure trailing newline
-        body_lines = [("    " + line) if line.strip() else line for line in body.splitlines()]
+        # normalize the body's own indentation, then indent it to 4 spaces
+        body_lines = [("    " + line) if line.strip() else line for line in textwrap.dedent(body).splitlines()]
         block.extend(body_lines)
         if not body.endswith("\n"):
             block.append("")
@@ -117,9 +297,25 @@ def _render_header(module_title: str) -> str:
 from __future__ import annotations
 from typing import Any, Dict, List, Optional
 from solace_ai_connector.common.log import log
+from src.tool_metrics import instrument_tool
+from src.tool_reloader import watch_module
+
+# Pick up edits from the scaffolder without restarting the mesh
+watch_module(__name__)
 
 """
 
+_METRICS_IMPORT = "from src.tool_metrics import instrument_tool\n"
+
+def _ensure_metrics_import(file_text: str) -> str:
+    """Add the instrument_tool import to a module scaffolded before tools were instrumented."""
+    if _METRICS_IMPORT in file_text:
+        return file_text
+    imports = [n for n in ast.parse(file_text).body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    lines = file_text.splitlines(keepends=True)
+    at = imports[-1].end_lineno if imports else 0
+    return "".join(lines[:at] + [_METRICS_IMPORT] + lines[at:])
+
 def _render_yaml_tool_block(module_path: str, fn_name: str, description: str = "") -> str:
     desc = description or f"{fn_name} tool."
     return (
@@ -130,9 +326,345 @@ def _render_yaml_tool_block(module_path: str, fn_name: str, description: str = "
         f"  tool_description: \"{desc}\"\n"
     )
 
+def _scaffold_module(
+    base: Path,
+    slug: str,
+    agent_name: str,
+    tools: List[Dict[str, Any]],
+    overwrite: bool,
+) -> Dict[str, Any]:
+    """
+    Locked read-edit-write of src/<slug>/tools.py. Runs in a worker thread.
+    The edited module is staged next to the target, compiled and
+    import-checked, and only renamed into place once both pass.
+    """
+    src_dir = base / "src" / slug
+    py_file = src_dir / "tools.py"
+    init_file = src_dir / "__init__.py"
+
+    src_dir.mkdir(parents=True, exist_ok=True)
+    if not init_file.exists():
+        _atomic_write_text(init_file, "")
+
+    with _module_lock(py_file):
+        # Load or initialize the module file
+        previous = py_file.read_text(encoding="utf-8") if py_file.exists() else None
+        text = previous if previous is not None else _render_header(module_title=agent_name)
+
+        # Index existing top-level definitions once, then apply all edits in a single pass
+        try:
+            text = _ensure_metrics_import(text)
+            spans = _index_top_level(text)
+        except SyntaxError as e:
+            return {"status": "error", "error": f"Existing module {py_file} is not valid Python: {e}"}
+
+        created, skipped = [], []
+        blocks: Dict[str, str] = {}
+        for spec in tools:
+            try:
+                fname = _ensure_ident(spec["function_name"], "function")
+            except Exception as e:
+                skipped.append(f"{spec.get('function_name','<missing>')} (invalid: {e})")
+                continue
+
+            exists = fname in spans or fname in blocks
+            if exists and not overwrite:
+                skipped.append(fname)
+                continue
+
+            blocks[fname] = _render_function_block(spec)
+            if fname not in created:
+                created.append(fname)
+
+        text = _apply_module_edits(text, blocks, spans)
+        try:
+            compile(text, str(py_file), "exec", dont_inherit=True)
+        except SyntaxError as e:
+            return {
+                "status": "error",
+                "error": f"Generated code does not compile: {e.msg} (line {e.lineno}: {(e.text or '').strip()})",
+                "created": [], "skipped": skipped,
+            }
+
+        # Byte-compile and import-check the staged file; the module is only replaced once it passes
+        error = _atomic_write_stream(py_file, (text,), lambda staged: _validate_module(staged, py_file, f"src.{slug}.tools", base))
+        if error:
+            return {"status": "error", "error": f"Generated module failed to import: {error}", "created": [], "skipped": skipped}
+    log.info("[define_dynamic_tools] Wrote %s", py_file)
+
+    return {"py_file": py_file, "created": created, "skipped": skipped, "import_checked": _import_check_enabled()}
+
+# -----------------------------
+# OpenAPI generation
+# -----------------------------
+_HTTP_METHODS = ("get", "put", "post", "delete", "patch", "head", "options")
+_OPENAPI_TYPES = {"integer": "int", "number": "float", "boolean": "bool", "string": "str", "object": "Dict[str, Any]"}
+# Reserved by the generated signature itself
+_RESERVED_PARAMS = {"tool_context", "tool_config", "all_pages", "max_pages", "body", "log"}
+# Query parameter names (lowercased) that mark a paginated list operation, by style
+_PAGINATION_PARAMS = {
+    "cursor": {"cursor", "page_token", "pagetoken", "next_token", "nexttoken", "starting_after", "after", "continuation_token"},
+    "page": {"page", "page_number", "pagenumber"},
+    "offset": {"offset", "skip", "start"},
+}
+
+def _parse_spec_document(raw: bytes) -> Dict[str, Any]:
+    text = raw.decode("utf-8-sig")
+    try:
+        doc = json.loads(text)
+    except ValueError:
+        import yaml
+
+        doc = yaml.safe_load(text)
+    if not isinstance(doc, dict) or not isinstance(doc.get("paths"), dict):
+        raise ValueError("Not an OpenAPI/Swagger document: missing 'paths'")
+    return doc
+
+def _resolve_ref(doc: Dict[str, Any], obj: Any) -> Any:
+    """Follow local '#/...' $refs (chains included); unknown refs resolve to {}."""
+    seen = set()
+    while isinstance(obj, dict) and isinstance(obj.get("$ref"), str):
+        ref = obj["$ref"]
+        if ref in seen or not ref.startswith("#/"):
+            return {}
+        seen.add(ref)
+        target: Any = doc
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            target = target.get(part) if isinstance(target, dict) else None
+        obj = target if target is not None else {}
+    return obj
+
+def _snake(name: str) -> str:
+    name = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name)
+    name = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower()
+    if not name:
+        return "_"
+    if name[0].isdigit():
+        name = f"_{name}"
+    return f"{name}_" if keyword.iskeyword(name) else name
+
+def _clean_text(text: Any, limit: int = 300) -> str:
+    # Safe inside a docstring and a double-quoted YAML scalar
+    text = " ".join(str(text or "").split()).replace("\\", "/").replace('"', "'")
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+def _schema_type(doc: Dict[str, Any], schema: Any) -> str:
+    schema = _resolve_ref(doc, schema) or {}
+    kind = schema.get("type")
+    if kind == "array":
+        return f"List[{_schema_type(doc, schema.get('items'))}]"
+    return _OPENAPI_TYPES.get(kind, "Any")
+
+def _server_url(doc: Dict[str, Any]) -> str:
+    servers = doc.get("servers") or []
+    if servers and isinstance(servers[0], dict):
+        url = servers[0].get("url", "")
+        for var, meta in (servers[0].get("variables") or {}).items():
+            url = url.replace("{" + var + "}", str((meta or {}).get("default", "")))
+        return url
+    if doc.get("host"):  # Swagger 2.0
+        scheme = (doc.get("schemes") or ["https"])[0]
+        return f"{scheme}://{doc['host']}{doc.get('basePath', '')}"
+    return ""
+
+def _iter_operations(doc: Dict[str, Any], include_tags: Optional[List[str]]) -> Iterator[Tuple[str, str, Dict[str, Any], List[Any]]]:
+    tags = set(include_tags or [])
+    for path, item in doc["paths"].items():
+        item = _resolve_ref(doc, item)
+        if not isinstance(item, dict):
+            continue
+        shared = item.get("parameters") or []
+        for method in _HTTP_METHODS:
+            op = item.get(method)
+            if not isinstance(op, dict):
+                continue
+            if tags and not tags.intersection(op.get("tags") or []):
+                continue
+            yield method.upper(), path, op, shared
+
+def _openapi_tool_spec(
+    doc: Dict[str, Any],
+    method: str,
+    path: str,
+    op: Dict[str, Any],
+    shared_params: List[Any],
+    used_names: set,
+) -> Dict[str, Any]:
+    """
+    Build a define_dynamic_tools-style spec (with body) for one operation.
+    Path/query/header parameters become typed arguments (required first),
+    a JSON request body becomes `body`, and GET operations with a recognised
+    page parameter also get `all_pages`/`max_pages`.
+    """
+    fname = _snake(op.get("operationId") or f"{method}_{path}")
+    base_name, n = fname, 2
+    while fname in used_names:
+        fname, n = f"{base_name}_{n}", n + 1
+    used_names.add(fname)
+
+    # Operation-level parameters override path-level ones with the same (in, name)
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for raw in list(shared_params) + list(op.get("parameters") or []):
+        p = _resolve_ref(doc, raw)
+        if isinstance(p, dict) and p.get("name") and p.get("in"):
+            merged[(p["in"], p["name"])] = p
+
+    required, optional = [], []
+    groups: Dict[str, List[Tuple[str, str]]] = {"path": [], "query": [], "header": []}
+    arg_names = set(_RESERVED_PARAMS)
+    body_param: Optional[Dict[str, Any]] = None
+    pagination: Optional[Tuple[str, str]] = None
+    for (location, name), p in merged.items():
+        if location == "body":  # Swagger 2.0
+            body_param = {"schema": p.get("schema"), "required": p.get("required", False), "description": p.get("description", "")}
+            continue
+        if location not in groups:
+            continue
+        arg = _snake(name)
+        while arg in arg_names:
+            arg = f"{arg}_param"
+        arg_names.add(arg)
+        groups[location].append((name, arg))
+
+        typ = _schema_type(doc, p.get("schema") or p)
+        entry = {"name": arg, "description": _clean_text(p.get("description", ""))}
+        if location == "path" or p.get("required"):
+            required.append({**entry, "type": typ})
+        else:
+            optional.append({**entry, "type": f"Optional[{typ}]", "default": None})
+        if method == "GET" and location == "query" and pagination is None:
+            for style, names in _PAGINATION_PARAMS.items():
+                if name.lower() in names:
+                    pagination = (style, name)
+
+    body = _resolve_ref(doc, op.get("requestBody"))
+    if isinstance(body, dict) and body.get("content"):
+        content = body["content"]
+        media = content.get("application/json") or next(iter(content.values()), {}) or {}
+        body_param = {"schema": media.get("schema"), "required": body.get("required", False), "description": body.get("description", "")}
+    if body_param is not None:
+        entry = {"name": "body", "description": _clean_text(body_param["description"] or "JSON request body")}
+        typ = _schema_type(doc, body_param["schema"])
+        typ = "Dict[str, Any]" if typ == "Any" else typ
+        if body_param["required"]:
+            required.append({**entry, "type": typ})
+        else:
+            optional.append({**entry, "type": f"Optional[{typ}]", "default": None})
+    if pagination:
+        optional.append({"name": "all_pages", "type": "bool", "default": False, "description": f"Follow {pagination[0]} pagination and return all items"})
+        optional.append({"name": "max_pages", "type": "int", "default": 10, "description": "Page limit when all_pages is set"})
+
+    def _mapping(pairs: List[Tuple[str, str]]) -> str:
+        return "{" + ", ".join(f"{name!r}: {arg}" for name, arg in pairs) + "}"
+
+    kwargs = [f"path_params={_mapping(groups['path'])}"] if groups["path"] else []
+    if groups["query"]:
+        kwargs.append(f"query={_mapping(groups['query'])}")
+    if groups["header"]:
+        kwargs.append(f"headers={_mapping(groups['header'])}")
+    call_kwargs = kwargs + (["json_body=body"] if body_param is not None else []) + ["tool_config=tool_config"]
+
+    lines = []
+    if pagination:
+        lines.append("if all_pages:")
+        lines.append(f"    return await _api.paginate(")
+        lines.append(f"        {method!r}, {path!r}, {pagination[0]!r}, {pagination[1]!r},")
+        lines.extend(f"        {kw}," for kw in kwargs + ["max_pages=max_pages", "tool_config=tool_config"])
+        lines.append("    )")
+    lines.append(f"return await _api.call(")
+    lines.append(f"    {method!r}, {path!r},")
+    lines.extend(f"    {kw}," for kw in call_kwargs)
+    lines.append(")")
+
+    summary = op.get("summary") or op.get("description") or ""
+    description = _clean_text(f"{summary} ({method} {path})" if summary else f"{method} {path}")
+    return {
+        "function_name": fname,
+        "description": description,
+        "params": required + optional,
+        "returns": {"type": "Dict[str, Any]", "description": "status, status_code and decoded response data"},
+        "body": "\n".join(lines) + "\n",
+    }
+
+def _render_openapi_header(title: str, client_name: str, base_url: str, base_url_env: str) -> str:
+    return f"""# Auto-generated from the OpenAPI spec for {title}; regenerate instead of editing by hand
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from solace_ai_connector.common.log import log
+from src.openapi_runtime import get_client
+from src.tool_metrics import instrument_tool
+from src.tool_reloader import watch_module
+
+# Pick up edits from the scaffolder without restarting the mesh
+watch_module(__name__)
+
+# One pooled HTTP client shared by every tool in this module
+_api = get_client({client_name!r}, default_base_url={base_url!r}, base_url_env={base_url_env!r})
+
+"""
+
+def _write_openapi_module(
+    base: Path,
+    slug: str,
+    module_path: str,
+    doc: Dict[str, Any],
+    base_url: Optional[str],
+    include_tags: Optional[List[str]],
+    overwrite: bool,
+) -> Dict[str, Any]:
+    """
+    Generate src/<slug>/openapi_tools.py plus its YAML tools snippet. Runs in a
+    worker thread; both files are streamed to disk block by block.
+    """
+    src_dir = base / "src" / slug
+    py_file = src_dir / "openapi_tools.py"
+    yaml_file = src_dir / "openapi_tools.yaml"
+    if py_file.exists() and not overwrite:
+        return {"status": "error", "error": f"{py_file} already exists; pass overwrite=true to regenerate it"}
+
+    used_names: set = set()
+    specs = [
+        _openapi_tool_spec(doc, method, path, op, shared, used_names)
+        for method, path, op, shared in _iter_operations(doc, include_tags)
+    ]
+    if not specs:
+        return {"status": "error", "error": "No operations matched in the OpenAPI document"}
+
+    info = doc.get("info") or {}
+    title = _clean_text(f"{info.get('title', slug)} {info.get('version', '')}".strip(), 120)
+    header = _render_openapi_header(title, module_path, base_url or _server_url(doc), f"{slug.upper()}_API_BASE_URL")
+
+    src_dir.mkdir(parents=True, exist_ok=True)
+    init_file = src_dir / "__init__.py"
+    if not init_file.exists():
+        _atomic_write_text(init_file, "")
+    with _module_lock(py_file):
+        error = _atomic_write_stream(
+            py_file,
+            itertools.chain((header,), (_render_function_block(s) for s in specs)),
+            lambda staged: _validate_module(staged, py_file, module_path, base),
+        )
+        if error:
+            return {"status": "error", "error": f"Generated module failed to validate: {error}"}
+        _atomic_write_stream(yaml_file, (
+            ("\n" if i else "") + _render_yaml_tool_block(module_path, s["function_name"], s["description"])
+            for i, s in enumerate(specs)
+        ))
+    log.info("[generate_openapi_tools] Wrote %d operations to %s", len(specs), py_file)
+
+    return {
+        "py_file": py_file,
+        "yaml_file": yaml_file,
+        "functions": [s["function_name"] for s in specs],
+        "descriptions": [s["description"] for s in specs],
+        "base_url_env": f"{slug.upper()}_API_BASE_URL",
+    }
+
 # -----------------------------
 # Public entrypoint
 # -----------------------------
+@instrument_tool
 async def define_dynamic_tools(
     agent_name: str,
     tools: List[Dict[str, Any]],
@@ -179,48 +711,17 @@ async def define_dynamic_tools(
     _ensure_ident(slug if slug[0].isalpha() else f"_{slug}", "module")
 
     base = _resolve_base(tool_context)
-    src_dir = base / "src" / slug
-    py_file = src_dir / "tools.py"
-    init_file = src_dir / "__init__.py"
     module_path = f"src.{slug}.tools"
 
-    src_dir.mkdir(parents=True, exist_ok=True)
-    init_file.write_text("", encoding="utf-8") if not init_file.exists() else None
-
-    # Load or initialize the module file
-    if py_file.exists():
-        text = py_file.read_text(encoding="utf-8")
-    else:
-        text = _render_header(module_title=agent_name)
-
-    created, skipped = [], []
-    for spec in tools:
-        try:
-            fname = _ensure_ident(spec["function_name"], "function")
-        except Exception as e:
-            skipped.append(f"{spec.get('function_name','<missing>')} (invalid: {e})")
-            continue
-
-        exists = _function_exists(text, fname)
-        if exists and not overwrite:
-            skipped.append(fname)
-            continue
-
-        # If overwriting, remove old function block (basic replace by pattern)
-        if exists and overwrite:
-            text = re.sub(
-                rf"^async\s+def\s+{re.escape(fname)}\s*\([^\)]*\)\s*->[\s\S]*?\n(?=^async\s+def|\Z)",
-                "",
-                text,
-                flags=re.MULTILINE,
-            )
-
-        text += _render_function_block(spec)
-        created.append(fname)
+    # File I/O runs off the event loop; the lock makes concurrent requests for the same agent queue up
+    outcome = await asyncio.to_thread(_scaffold_module, base, slug, agent_name, tools, overwrite)
+    if outcome.get("status") == "error":
+        return outcome
+    py_file = outcome["py_file"]
+    created, skipped = outcome["created"], outcome["skipped"]
 
-    # Write final file
-    py_file.write_text(text, encoding="utf-8")
-    log.info("[define_dynamic_tools] Wrote %s", py_file)
+    # Agents that already imported this module get the new code immediately
+    hot_reload = reload_module(module_path) if module_path in sys.modules else None
 
     # Register artifact(s)
     artifact_ids: List[str] = []
@@ -252,5 +753,172 @@ async def define_dynamic_tools(
         "created": created,
         "skipped": skipped,
         "artifact_ids": artifact_ids,
+        "import_checked": outcome["import_checked"],
+        "hot_reload": hot_reload,
         "yaml_tools_block": yaml_tools_block,
     }
+
+@instrument_tool
+async def reload_agent_tools(
+    agent_name: str,
+    tool_context=None,
+    tool_config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Hot-reload src/<agent_slug>/tools.py in the running mesh.
+
+    Existing tool functions are updated in place, so agents use the new code on
+    their next call without a restart. The reload is rejected (and the running
+    code kept) if the module fails to compile or import.
+    """
+    log.info("[reload_agent_tools] called")
+    if not agent_name:
+        return {"status": "error", "error": "agent_name is required"}
+    slug = _slugify(agent_name).replace("-", "_")
+    return await asyncio.to_thread(reload_module, f"src.{slug}.tools")
+
+@instrument_tool
+async def define_dynamic_tools_batch(
+    agents: List[Dict[str, Any]],
+    overwrite: bool = False,
+    max_parallel: int = 8,
+    tool_context=None,
+    tool_config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Scaffold tool modules for many agents in one call.
+
+    Args:
+      agents: List of {"agent_name": str, "tools": [<tool spec>, ...], "overwrite": bool (optional)}
+              using the same tool spec format as define_dynamic_tools.
+      overwrite: Default for entries that do not set their own "overwrite".
+      max_parallel: Upper bound on modules being written at the same time.
+    Returns:
+      {
+        "status": "success" | "partial" | "error",
+        "results": [<define_dynamic_tools result per agent>, ...],
+        "yaml_tools_block": "<one pasteable YAML block for all agents>"
+      }
+    """
+    if not agents:
+        return {"status": "error", "error": "agents must be a non-empty list"}
+
+    sem = asyncio.Semaphore(max(1, max_parallel))
+
+    async def _one(entry: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(entry, dict):
+            return {"agent_name": "", "status": "error", "error": f"each agents entry must be an object, got {type(entry).__name__}"}
+        agent_name = entry.get("agent_name", "")
+        async with sem:
+            try:
+                result = await define_dynamic_tools(
+                    agent_name=agent_name,
+                    tools=entry.get("tools") or [],
+                    overwrite=entry.get("overwrite", overwrite),
+                    tool_context=tool_context,
+                    tool_config=tool_config,
+                )
+            except Exception as e:
+                log.warning("[define_dynamic_tools_batch] %s failed: %s", agent_name, e)
+                result = {"status": "error", "error": str(e)}
+        return {"agent_name": agent_name, **result}
+
+    results = await asyncio.gather(*(_one(entry) for entry in agents))
+
+    yaml_sections = [
+        f"# {r['agent_name']} ({r['module_path']})\n{r['yaml_tools_block']}"
+        for r in results
+        if r.get("status") == "success" and r.get("yaml_tools_block")
+    ]
+    failed = sum(1 for r in results if r.get("status") != "success")
+    status = "success" if not failed else ("error" if failed == len(results) else "partial")
+    log.info("[define_dynamic_tools_batch] %d agents, %d failed", len(results), failed)
+
+    return {
+        "status": status,
+        "agent_count": len(results),
+        "failed_count": failed,
+        "results": results,
+        "yaml_tools_block": "\n".join(yaml_sections),
+    }
+
+@instrument_tool
+async def generate_openapi_tools(
+    agent_name: str,
+    spec_artifact: str,
+    base_url: Optional[str] = None,
+    include_tags: Optional[List[str]] = None,
+    overwrite: bool = False,
+    inline_yaml_limit: int = 50,
+    tool_context=None,
+    tool_config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Generate one typed tool function per operation of an OpenAPI (3.x) or
+    Swagger (2.0) document into src/<agent_slug>/openapi_tools.py.
+
+    The module is regenerated as a whole from the spec. Its tools share one
+    pooled HTTP client (src/openapi_runtime.py); the target server is the spec's
+    first server URL unless base_url, tool_config["base_url"] or the
+    <SLUG>_API_BASE_URL environment variable says otherwise, which is how the
+    tools are pointed at a local stub server.
+
+    Args:
+      agent_name: Logical agent name; becomes folder slug: src/<slug>/
+      spec_artifact: Artifact filename of the JSON/YAML spec.
+      base_url: Override for the server URL baked into the module.
+      include_tags: Only generate operations carrying one of these tags.
+      overwrite: Replace an existing generated module.
+      inline_yaml_limit: Return the YAML tools block inline only up to this many
+        operations; it is always written next to the module as openapi_tools.yaml.
+    Returns:
+      {
+        "status": "success",
+        "module_path": "src.<slug>.openapi_tools",
+        "py_file": "...", "yaml_file": "...",
+        "operation_count": N,
+        "functions": ["list_pets", ...],
+        "yaml_tools_block": "<pasteable YAML>" (when N <= inline_yaml_limit)
+      }
+    """
+    log.info("[generate_openapi_tools] called")
+    if not agent_name:
+        return {"status": "error", "error": "agent_name is required"}
+    if not spec_artifact:
+        return {"status": "error", "error": "spec_artifact is required"}
+
+    slug = _slugify(agent_name).replace("-", "_")
+    _ensure_ident(slug if slug[0].isalpha() else f"_{slug}", "module")
+    base = _resolve_base(tool_context)
+    module_path = f"src.{slug}.openapi_tools"
+
+    try:
+        raw = await load_artifact_bytes(spec_artifact, tool_context=tool_context)
+        doc = await asyncio.to_thread(_parse_spec_document, raw)
+    except Exception as e:
+        return {"status": "error", "error": f"Could not read OpenAPI spec '{spec_artifact}': {e}"}
+
+    outcome = await asyncio.to_thread(
+        _write_openapi_module, base, slug, module_path, doc, base_url, include_tags, overwrite
+    )
+    if outcome.get("status") == "error":
+        return outcome
+
+    hot_reload = reload_module(module_path) if module_path in sys.modules else None
+    functions = outcome["functions"]
+    result = {
+        "status": "success",
+        "module_path": module_path,
+        "py_file": str(outcome["py_file"].resolve()),
+        "yaml_file": str(outcome["yaml_file"].resolve()),
+        "operation_count": len(functions),
+        "functions": functions,
+        "base_url_env": outcome["base_url_env"],
+        "hot_reload": hot_reload,
+    }
+    if len(functions) <= inline_yaml_limit:
+        result["yaml_tools_block"] = "\n".join(
+            _render_yaml_tool_block(module_path, fn, desc)
+            for fn, desc in zip(functions, outcome["descriptions"])
+        )
+    return result
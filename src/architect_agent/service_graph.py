@@ -0,0 +1,370 @@
+# Service dependency graph analysis for the Architect Agent
+#
+# Graphs are stored as compressed sparse rows (CSR): one offsets array and one
+# flat neighbour array of int32 per direction, so thousands of services fit in
+# a few hundred kilobytes and every traversal is a linear scan.
+from __future__ import annotations
+import csv
+import io
+import json
+from array import array
+from heapq import nlargest
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ASYNC_EDGE_KINDS = {"async", "event", "events", "queue", "pubsub", "stream", "message"}
+
+class ServiceGraph:
+    """Directed graph where an edge A -> B means "A calls / depends on B"."""
+
+    def __init__(self, names: List[str], edges: Iterable[Tuple[int, int, bool]]):
+        self.names = names
+        n = len(names)
+        src, dst, sync = array("i"), array("i"), array("b")
+        seen = set()
+        for u, v, is_sync in edges:
+            key = u * n + v
+            if key in seen:
+                continue
+            seen.add(key)
+            src.append(u)
+            dst.append(v)
+            sync.append(1 if is_sync else 0)
+        self.edge_count = len(src)
+        self.sync_edge_count = sum(sync)
+        self.offsets, self.targets = _build_csr(n, src, dst)
+        self.reverse_offsets, self.reverse_targets = _build_csr(n, dst, src)
+        sync_src = array("i", (u for u, s in zip(src, sync) if s))
+        sync_dst = array("i", (v for v, s in zip(dst, sync) if s))
+        self.sync_offsets, self.sync_targets = _build_csr(n, sync_src, sync_dst)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def out_degree(self, node: int) -> int:
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def in_degree(self, node: int) -> int:
+        return self.reverse_offsets[node + 1] - self.reverse_offsets[node]
+
+def _build_csr(n: int, src: array, dst: array) -> Tuple[array, array]:
+    """Counting-sort edges by source into (offsets, targets) arrays."""
+    offsets = array("i", bytes(4 * (n + 1)))
+    for u in src:
+        offsets[u + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    cursor = array("i", offsets[:-1])
+    targets = array("i", bytes(4 * len(src)))
+    for u, v in zip(src, dst):
+        targets[cursor[u]] = v
+        cursor[u] += 1
+    return offsets, targets
+
+# -----------------------------
+# Parsing
+# -----------------------------
+def parse_service_graph(data: bytes, graph_format: str = "auto", filename: str = "") -> ServiceGraph:
+    """Build a ServiceGraph from JSON, YAML or CSV bytes.
+
+    Accepted shapes for JSON/YAML:
+      {"services": [{"name": "a", "depends_on": ["b", {"name": "c", "type": "async"}]}]}
+      {"services": ["a", "b"], "dependencies": [{"from": "a", "to": "b", "sync": true}]}
+      {"a": ["b", "c"], "b": []}
+    CSV needs source and target columns, plus an optional sync/type column.
+    """
+    fmt = (graph_format or "auto").lower()
+    if fmt == "auto":
+        fmt = _detect_format(data, filename)
+    text = data.decode("utf-8-sig")
+
+    builder = _GraphBuilder()
+    if fmt == "csv":
+        for row in csv.DictReader(io.StringIO(text)):
+            row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+            source = row.get("source") or row.get("from") or row.get("service")
+            target = row.get("target") or row.get("to") or row.get("depends_on")
+            if not source:
+                continue
+            if target:
+                builder.add_edge(source, target, _is_sync(row))
+            else:
+                builder.node(source)
+        return builder.build()
+
+    if fmt == "json":
+        doc = json.loads(text)
+    elif fmt in {"yaml", "yml"}:
+        import yaml
+        doc = yaml.safe_load(text)
+    else:
+        raise ValueError(f"Unsupported graph format: '{graph_format}'")
+
+    if isinstance(doc, dict) and ("services" in doc or "dependencies" in doc or "edges" in doc):
+        for svc in doc.get("services") or []:
+            if isinstance(svc, dict):
+                name = str(svc.get("name") or svc.get("id"))
+                builder.node(name)
+                for dep in svc.get("depends_on") or svc.get("dependencies") or []:
+                    if isinstance(dep, dict):
+                        builder.add_edge(name, str(dep.get("name") or dep.get("to")), _is_sync(dep))
+                    else:
+                        builder.add_edge(name, str(dep), True)
+            else:
+                builder.node(str(svc))
+        for edge in doc.get("dependencies") or doc.get("edges") or []:
+            if isinstance(edge, dict):
+                builder.add_edge(
+                    str(edge.get("from") or edge.get("source")),
+                    str(edge.get("to") or edge.get("target")),
+                    _is_sync(edge),
+                )
+            elif isinstance(edge, (list, tuple)) and len(edge) >= 2:
+                builder.add_edge(str(edge[0]), str(edge[1]), True)
+    elif isinstance(doc, dict):
+        for name, deps in doc.items():
+            builder.node(str(name))
+            for dep in deps or []:
+                builder.add_edge(str(name), str(dep), True)
+    else:
+        raise ValueError("Graph document must be a mapping")
+    return builder.build()
+
+def _detect_format(data: bytes, filename: str) -> str:
+    lower = filename.lower()
+    for ext, fmt in ((".json", "json"), (".yaml", "yaml"), (".yml", "yaml"), (".csv", "csv")):
+        if lower.endswith(ext):
+            return fmt
+    head = data[:512].lstrip()
+    if head[:1] in (b"{", b"["):
+        return "json"
+    first_line = head.split(b"\n", 1)[0]
+    if b"," in first_line and b":" not in first_line:
+        return "csv"
+    return "yaml"
+
+def _is_sync(attrs: Dict[str, Any]) -> bool:
+    if "sync" in attrs:
+        value = attrs["sync"]
+        if isinstance(value, str):
+            return value.strip().lower() not in {"false", "0", "no", "async"}
+        return bool(value)
+    kind = str(attrs.get("type") or attrs.get("mode") or "").strip().lower()
+    return kind not in ASYNC_EDGE_KINDS
+
+class _GraphBuilder:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.edges: List[Tuple[int, int, bool]] = []
+
+    def node(self, name: str) -> int:
+        idx = self.ids.get(name)
+        if idx is None:
+            idx = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return idx
+
+    def add_edge(self, source: str, target: str, sync: bool) -> None:
+        self.edges.append((self.node(source), self.node(target), sync))
+
+    def build(self) -> ServiceGraph:
+        return ServiceGraph(self.names, self.edges)
+
+# -----------------------------
+# Algorithms
+# -----------------------------
+def strongly_connected_components(n: int, offsets: array, targets: array) -> Tuple[array, int]:
+    """Iterative Tarjan SCC in O(V + E).
+
+    Returns (component id per node, component count). Components are numbered
+    in completion order, so every edge u -> v between components satisfies
+    comp[u] > comp[v]; descending ids are a topological order.
+    """
+    unvisited = -1
+    index = array("i", [unvisited]) * n
+    low = array("i", [0]) * n
+    comp = array("i", [unvisited]) * n
+    on_stack = bytearray(n)
+    stack: List[int] = []
+    counter = 0
+    comp_count = 0
+
+    for root in range(n):
+        if index[root] != unvisited:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, offsets[root])]
+        while work:
+            node, edge = work[-1]
+            end = offsets[node + 1]
+            if edge < end:
+                work[-1] = (node, edge + 1)
+                nxt = targets[edge]
+                if index[nxt] == unvisited:
+                    index[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack[nxt] = 1
+                    work.append((nxt, offsets[nxt]))
+                elif on_stack[nxt] and index[nxt] < low[node]:
+                    low[node] = index[nxt]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    comp[member] = comp_count
+                    if member == node:
+                        break
+                comp_count += 1
+    return comp, comp_count
+
+def _condense(n: int, offsets: array, targets: array, comp: array, comp_count: int) -> List[List[int]]:
+    """Successor lists of the condensation DAG, without duplicates or self loops."""
+    succ: List[List[int]] = [[] for _ in range(comp_count)]
+    marker = array("i", [-1]) * comp_count
+    members: List[List[int]] = [[] for _ in range(comp_count)]
+    for node in range(n):
+        members[comp[node]].append(node)
+    for c in range(comp_count):
+        for node in members[c]:
+            for e in range(offsets[node], offsets[node + 1]):
+                d = comp[targets[e]]
+                if d != c and marker[d] != c:
+                    marker[d] = c
+                    succ[c].append(d)
+    return succ
+
+def blast_radius(graph: ServiceGraph, comp: array, comp_count: int) -> array:
+    """Number of other services that transitively depend on each service.
+
+    Ancestor sets are propagated over the condensation in topological order
+    as word-parallel bitsets (Python ints), so each edge costs one OR of
+    V/64 machine words; a set is dropped as soon as its count is taken.
+    """
+    n = len(graph)
+    succ = _condense(n, graph.offsets, graph.targets, comp, comp_count)
+    ancestors: List[Optional[int]] = [0] * comp_count
+    for node in range(n):
+        ancestors[comp[node]] |= 1 << node
+    affected = array("i", [0]) * comp_count
+    for c in range(comp_count - 1, -1, -1):
+        mask = ancestors[c]
+        affected[c] = mask.bit_count() - 1
+        for d in succ[c]:
+            ancestors[d] |= mask
+        ancestors[c] = None
+    return array("i", (affected[comp[node]] for node in range(n)))
+
+def _has_self_edge(offsets, targets, node: int) -> bool:
+    return node in targets[offsets[node]:offsets[node + 1]]
+
+def longest_sync_chain(graph: ServiceGraph) -> Dict[str, Any]:
+    """Longest chain of synchronous calls, measured in services.
+
+    Synchronous cycles are collapsed into a single hop and flagged, since a
+    chain through a cycle is unbounded. A service calling itself counts as a
+    cycle too.
+    """
+    n = len(graph)
+    comp, comp_count = strongly_connected_components(n, graph.sync_offsets, graph.sync_targets)
+    succ = _condense(n, graph.sync_offsets, graph.sync_targets, comp, comp_count)
+    members: List[List[int]] = [[] for _ in range(comp_count)]
+    for node in range(n):
+        members[comp[node]].append(node)
+
+    # Successors always carry lower ids, so ascending order is a valid DP order
+    length = array("i", [1]) * comp_count
+    nxt = array("i", [-1]) * comp_count
+    for c in range(comp_count):
+        for d in succ[c]:
+            if length[d] + 1 > length[c]:
+                length[c] = length[d] + 1
+                nxt[c] = d
+    if not comp_count:
+        return {"length": 0, "services": [], "contains_cycle": False, "cyclic_segments": []}
+
+    start = max(range(comp_count), key=length.__getitem__)
+    chain, cyclic = [], []
+    c = start
+    while c != -1:
+        group = members[c]
+        chain.append(graph.names[group[0]])
+        if len(group) > 1 or _has_self_edge(graph.sync_offsets, graph.sync_targets, group[0]):
+            cyclic.append([graph.names[m] for m in group])
+        c = nxt[c]
+    return {
+        "length": len(chain),
+        "services": chain,
+        "contains_cycle": bool(cyclic),
+        "cyclic_segments": cyclic,
+    }
+
+def analyze_service_graph(graph: ServiceGraph, top_n: int = 10, focus: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Cycles, fan-in/fan-out hotspots, blast radius and longest sync chain."""
+    n = len(graph)
+    comp, comp_count = strongly_connected_components(n, graph.offsets, graph.targets)
+
+    comp_sizes = array("i", [0]) * comp_count
+    for node in range(n):
+        comp_sizes[comp[node]] += 1
+    self_loops = [
+        node for node in range(n)
+        if comp_sizes[comp[node]] == 1 and _has_self_edge(graph.offsets, graph.targets, node)
+    ]
+    self_looping = set(self_loops)
+    cyclic_comps = [c for c in range(comp_count) if comp_sizes[c] > 1]
+    largest = nlargest(top_n, cyclic_comps, key=comp_sizes.__getitem__)
+    members: Dict[int, List[str]] = {c: [] for c in largest}
+    for node in range(n):
+        if comp[node] in members:
+            members[comp[node]].append(graph.names[node])
+
+    radius = blast_radius(graph, comp, comp_count)
+    nodes = range(n)
+
+    def ranked(values, key: str) -> List[Dict[str, Any]]:
+        return [
+            {"service": graph.names[i], key: values(i)}
+            for i in nlargest(top_n, nodes, key=values)
+            if values(i) > 0
+        ]
+
+    result = {
+        "services": n,
+        "dependencies": graph.edge_count,
+        "sync_dependencies": graph.sync_edge_count,
+        "cycles": {
+            "count": len(cyclic_comps) + len(self_loops),
+            "services_in_cycles": sum(comp_sizes[c] for c in cyclic_comps) + len(self_loops),
+            "largest": [members[c] for c in largest],
+            "self_loops": [graph.names[i] for i in self_loops[:top_n]],
+        },
+        "hotspots": {
+            "fan_in": ranked(graph.in_degree, "dependents"),
+            "fan_out": ranked(graph.out_degree, "dependencies"),
+        },
+        "blast_radius": ranked(radius.__getitem__, "affected_services"),
+        "longest_sync_chain": longest_sync_chain(graph),
+    }
+
+    if focus:
+        index = {name: i for i, name in enumerate(graph.names)}
+        result["focus"] = {
+            name: {
+                "dependents": graph.in_degree(index[name]),
+                "dependencies": graph.out_degree(index[name]),
+                "affected_services": radius[index[name]],
+                "in_cycle": comp_sizes[comp[index[name]]] > 1 or index[name] in self_looping,
+            } if name in index else None
+            for name in focus
+        }
+    return result
@@ -0,0 +1,139 @@
+# Indexed technology catalog for the Architect Agent
+#
+# The catalog is parsed once into inverted indexes (field -> token -> entry ids)
+# so ranking only touches entries that actually match a project type or an
+# expertise term, and it is re-parsed only when the data file changes on disk.
+from __future__ import annotations
+import os
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from solace_ai_connector.common.log import log
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent / "tech_catalog.yaml"
+COST_LEVELS = {"low": 0, "medium": 1, "high": 2}
+DEFAULT_WEIGHTS = {"expertise": 0.5, "budget": 0.3, "project_type": 0.2}
+INDEXED_FIELDS = ("name", "category", "project_types", "languages", "tags", "cost")
+
+_TOKEN_SPLIT = re.compile(r"[\s/,()]+")
+
+def tokenize(value: str) -> Set[str]:
+    """Lowercased search tokens: the whole value, its parts, and parts without a .js suffix."""
+    lower = value.strip().lower()
+    tokens = {lower} if lower else set()
+    for part in _TOKEN_SPLIT.split(lower):
+        if part:
+            tokens.add(part)
+            if part.endswith(".js"):
+                tokens.add(part[:-3])
+    return tokens
+
+class TechnologyCatalog:
+    """Technology entries plus inverted indexes over their searchable fields."""
+
+    def __init__(self, entries: List[Dict[str, Any]], source: str = ""):
+        self.entries = entries
+        self.source = source
+        self.index: Dict[str, Dict[str, Set[int]]] = {f: defaultdict(set) for f in INDEXED_FIELDS}
+        for i, entry in enumerate(entries):
+            for field in INDEXED_FIELDS:
+                values = entry.get(field) or []
+                if isinstance(values, str):
+                    values = [values]
+                for value in values:
+                    for token in tokenize(str(value)):
+                        self.index[field][token].add(i)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, field: str, value: str) -> Set[int]:
+        """Entry ids whose field matches any token of value."""
+        postings = self.index[field]
+        hits: Set[int] = set()
+        for token in tokenize(value):
+            hits |= postings.get(token, set())
+        return hits
+
+    def expertise_matches(self, expertise: List[str]) -> Dict[int, List[str]]:
+        """Entry id -> expertise areas it matches by name, language or tag."""
+        matched: Dict[int, List[str]] = defaultdict(list)
+        for area in expertise:
+            hits = self.lookup("name", area) | self.lookup("languages", area) | self.lookup("tags", area)
+            for i in hits:
+                matched[i].append(area)
+        return matched
+
+    def rank(
+        self,
+        project_type: str,
+        team_expertise: List[str],
+        budget: str = "medium",
+        weights: Optional[Dict[str, float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Score every entry for the project type, best first.
+
+        Score = w_project_type * project fit + w_expertise * share of team
+        expertise the entry covers + w_budget * budget fit. Cost is on the
+        same low/medium/high scale as the budget; one level over budget
+        earns half credit.
+        """
+        w = {**DEFAULT_WEIGHTS, **(weights or {})}
+        budget_level = COST_LEVELS.get(str(budget).lower(), COST_LEVELS["medium"])
+        candidates = self.lookup("project_types", project_type)
+        expertise = self.expertise_matches(team_expertise) if team_expertise else {}
+        areas = max(len(team_expertise), 1)
+
+        ranked = []
+        for i in candidates:
+            entry = self.entries[i]
+            over = COST_LEVELS.get(str(entry.get("cost", "medium")).lower(), 1) - budget_level
+            budget_fit = 1.0 if over <= 0 else 0.5 if over == 1 else 0.0
+            matched = expertise.get(i, [])
+            expertise_fit = len(set(matched)) / areas
+            score = w["project_type"] + w["expertise"] * expertise_fit + w["budget"] * budget_fit
+            ranked.append((-score, i, {
+                "name": entry["name"],
+                "category": entry.get("category", "other"),
+                "score": round(score, 4),
+                "matched_expertise": sorted(set(matched)),
+                "budget_fit": budget_fit,
+                "cost": entry.get("cost", "medium"),
+            }))
+        # Ties keep catalog order, which is curated most-common-first
+        ranked.sort(key=lambda r: (r[0], r[1]))
+        return [r[2] for r in ranked]
+
+def _load_catalog_file(path: Path) -> TechnologyCatalog:
+    import yaml
+
+    with path.open("r", encoding="utf-8") as f:
+        doc = yaml.safe_load(f) or {}
+    entries = [e for e in doc.get("technologies") or [] if isinstance(e, dict) and e.get("name")]
+    return TechnologyCatalog(entries, source=str(path))
+
+# -----------------------------
+# Hot-reloading cache
+# -----------------------------
+_CACHE: Dict[str, Tuple[Tuple[int, int], TechnologyCatalog]] = {}
+_CACHE_LOCK = threading.Lock()
+
+def get_catalog(path: Optional[str] = None) -> TechnologyCatalog:
+    """Return the catalog for path, re-parsing only if the file's mtime or size changed."""
+    catalog_path = Path(path).expanduser().resolve() if path else DEFAULT_CATALOG_PATH
+    key = str(catalog_path)
+    st = os.stat(catalog_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _CACHE.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        catalog = _load_catalog_file(catalog_path)
+        _CACHE[key] = (stamp, catalog)
+        log.info("[tech_catalog] Loaded %d technologies from %s", len(catalog), catalog_path)
+        return catalog
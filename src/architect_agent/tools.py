@@ -1,8 +1,19 @@
 # Architect Agent tools for solution architecture planning and technical design
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+import math
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from solace_ai_connector.common.log import log
+from src.artifact_io import load_artifact_bytes
+from src.description_analysis import analyze_description
+from src.architect_agent.service_graph import analyze_service_graph, parse_service_graph
+from src.architect_agent.tech_catalog import get_catalog
+from src.tool_metrics import instrument_tool
 
+if TYPE_CHECKING:
+    import numpy as np
+
+@instrument_tool
 async def create_architecture_diagram(
     requirements: str,
     system_type: str = "web_application",
@@ -80,6 +91,7 @@ async def create_architecture_diagram(
     
     return result
 
+@instrument_tool
 async def analyze_requirements(
     project_description: str,
     constraints: List[str] = None,
@@ -102,12 +114,13 @@ async def analyze_requirements(
     constraints = constraints or []
     performance_requirements = performance_requirements or {}
     
-    # Analyze common requirement patterns
+    # Analyze common requirement patterns (shared, cached description parse)
+    hints = analyze_description(project_description)["hints"]
     technical_aspects = {
-        "scalability_needs": "medium" if "scale" not in project_description.lower() else "high",
-        "security_requirements": "standard" if "secure" not in project_description.lower() else "enhanced",
-        "integration_complexity": "low" if "api" not in project_description.lower() else "medium",
-        "real_time_needs": "batch" if "real-time" not in project_description.lower() else "streaming"
+        "scalability_needs": "high" if hints["scale"] else "medium",
+        "security_requirements": "enhanced" if hints["secure"] else "standard",
+        "integration_complexity": "medium" if hints["api"] else "low",
+        "real_time_needs": "streaming" if hints["real_time"] else "batch"
     }
     
     result = {
@@ -129,8 +142,29 @@ async def analyze_requirements(
         ]
     }
     
+    # Size tiers when the caller supplied enough numbers to do so
+    if "target_rps" in performance_requirements and "service_times_ms" in performance_requirements:
+        target_rps = performance_requirements["target_rps"]
+        p95_latency_ms = performance_requirements.get("p95_latency_ms", 500)
+        service_times_ms = performance_requirements["service_times_ms"]
+        error = capacity_inputs_error(target_rps, p95_latency_ms, service_times_ms)
+        try:
+            workers_per_instance = int(float(performance_requirements.get("workers_per_instance", 1)))
+        except (TypeError, ValueError, OverflowError):
+            error = error or "workers_per_instance must be a number"
+        if error:
+            result["capacity_plan"] = {"status": "error", "error": error}
+        else:
+            result["capacity_plan"] = size_service_tiers(
+                target_rps=float(target_rps),
+                p95_latency_ms=float(p95_latency_ms),
+                service_times_ms=service_times_ms,
+                workers_per_instance=max(1, workers_per_instance),
+            )
+    
     return result
 
+@instrument_tool
 async def recommend_technology_stack(
     project_type: str,
     team_expertise: List[str] = None,
@@ -151,39 +185,46 @@ async def recommend_technology_stack(
     log.info("[recommend_technology_stack] called")
     
     team_expertise = team_expertise or []
+    tool_config = tool_config or {}
     
-    # Technology recommendations by project type
-    tech_stacks = {
-        "web_application": {
-            "frontend": ["React", "Vue.js", "Angular"],
-            "backend": ["Node.js", "Python/Django", "Java/Spring"],
-            "database": ["PostgreSQL", "MySQL", "MongoDB"],
-            "deployment": ["Docker", "AWS/Azure", "Vercel"]
-        },
-        "api_service": {
-            "frameworks": ["FastAPI", "Express.js", "Spring Boot"],
-            "database": ["PostgreSQL", "Redis", "DynamoDB"],
-            "deployment": ["Kubernetes", "AWS Lambda", "Docker Compose"]
-        },
-        "data_pipeline": {
-            "processing": ["Apache Spark", "Pandas", "Dask"],
-            "storage": ["Data Lakes", "Warehouse", "Time Series DB"],
-            "orchestration": ["Airflow", "Prefect", "Dagster"]
-        },
-        "mobile_app": {
-            "cross_platform": ["React Native", "Flutter", "Xamarin"],
-            "native": ["Swift/iOS", "Kotlin/Android"],
-            "backend": ["Firebase", "Supabase", "Custom API"]
-        }
-    }
+    try:
+        catalog = get_catalog(tool_config.get("catalog_path"))
+    except Exception as e:
+        return {"status": "error", "error": f"Technology catalog unavailable: {e}"}
+    
+    # Unknown project types fall back to the web application stack
+    if not catalog.lookup("project_types", project_type):
+        project_type_used = "web_application"
+    else:
+        project_type_used = project_type
+    
+    ranked = catalog.rank(
+        project_type_used,
+        team_expertise,
+        budget=budget_constraints,
+        weights=tool_config.get("ranking_weights"),
+    )
     
-    recommended_stack = tech_stacks.get(project_type, tech_stacks["web_application"])
+    per_category = int(tool_config.get("max_per_category", 3))
+    recommended_stack: Dict[str, List[str]] = {}
+    for candidate in ranked:
+        picks = recommended_stack.setdefault(candidate["category"], [])
+        if len(picks) < per_category:
+            picks.append(candidate["name"])
+    
+    recommended = {name for names in recommended_stack.values() for name in names}
+    covered = {
+        area for c in ranked if c["name"] in recommended for area in c["matched_expertise"]
+    }
     
     result = {
         "status": "success",
         "project_type": project_type,
         "recommended_stack": recommended_stack,
-        "team_alignment": f"Matches {len(team_expertise)} of existing expertise areas",
+        "ranked_candidates": [c for c in ranked if c["name"] in recommended],
+        "team_alignment": f"Matches {len(covered)} of {len(team_expertise)} existing expertise areas",
+        "matched_expertise": sorted(covered),
+        "unmatched_expertise": [area for area in team_expertise if area not in covered],
         "budget_considerations": {
             "low": "Focus on open-source solutions and managed services",
             "medium": "Balance of managed services and custom solutions",
@@ -198,3 +239,280 @@ async def recommend_technology_stack(
     }
     
     return result
+
+@instrument_tool
+async def plan_capacity(
+    target_rps: float,
+    p95_latency_ms: float,
+    service_times_ms: Dict[str, float],
+    workers_per_instance: int = 1,
+    max_instances: int = 1000,
+    max_utilization: float = 0.85,
+    tool_context=None,
+    tool_config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Size each service tier with M/M/c (Erlang-C) queueing math.
+    
+    Args:
+        target_rps (float): Expected peak arrival rate in requests per second
+        p95_latency_ms (float): End-to-end p95 latency target in milliseconds
+        service_times_ms (Dict[str, float]): Mean per-request service time for each tier
+        workers_per_instance (int): Concurrent workers (servers) on each instance
+        max_instances (int): Largest instance count to sweep per tier
+        max_utilization (float): Utilization ceiling kept as headroom (0.0-1.0)
+    
+    Returns:
+        Dict[str, Any]: Minimal instance counts, utilization and predicted p95 per tier
+    """
+    log.info("[plan_capacity] called")
+    
+    error = capacity_inputs_error(target_rps, p95_latency_ms, service_times_ms)
+    if error:
+        return {"status": "error", "error": error}
+    try:
+        # Tool calls often carry 2.0 or "2"; the sweep indexes arrays with these
+        workers_per_instance = int(float(workers_per_instance))
+        max_instances = int(float(max_instances))
+        max_utilization = float(max_utilization)
+    except (TypeError, ValueError, OverflowError):
+        return {"status": "error", "error": "workers_per_instance, max_instances and max_utilization must be numbers"}
+    
+    plan = size_service_tiers(
+        target_rps=float(target_rps),
+        p95_latency_ms=float(p95_latency_ms),
+        service_times_ms=service_times_ms,
+        workers_per_instance=max(1, workers_per_instance),
+        max_instances=max(1, max_instances),
+        max_utilization=min(max(max_utilization, 0.01), 1.0),
+    )
+    
+    return {"status": "success", **plan}
+
+@instrument_tool
+async def analyze_service_dependencies(
+    graph_artifact: str,
+    graph_format: str = "auto",
+    top_n: int = 10,
+    focus_services: List[str] = None,
+    tool_context=None,
+    tool_config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Analyze a service dependency graph for cycles, hotspots and blast radius.
+    
+    Args:
+        graph_artifact (str): Artifact filename holding the graph as JSON, YAML or CSV
+        graph_format (str): Input format (auto, json, yaml, csv)
+        top_n (int): Number of entries to return per ranking
+        focus_services (List[str]): Services to report full metrics for
+    
+    Returns:
+        Dict[str, Any]: Cycles (Tarjan SCC), fan-in/fan-out hotspots, blast radius and longest sync chain
+    """
+    log.info("[analyze_service_dependencies] called")
+    
+    try:
+        data = await load_artifact_bytes(graph_artifact, tool_context)
+    except FileNotFoundError as e:
+        return {"status": "error", "error": str(e)}
+    
+    started = time.perf_counter()
+    try:
+        graph = parse_service_graph(data, graph_format, filename=graph_artifact)
+    except (ValueError, UnicodeDecodeError) as e:
+        return {"status": "error", "error": f"Could not parse service graph: {e}"}
+    analysis = analyze_service_graph(graph, top_n=max(1, top_n), focus=focus_services)
+    
+    return {
+        "status": "success",
+        "graph_artifact": graph_artifact,
+        **analysis,
+        "analysis_ms": round((time.perf_counter() - started) * 1000.0, 1),
+    }
+
+# Helper functions for queueing-model capacity planning
+
+P95_TAIL = 0.05
+
+def _positive(value: Any) -> bool:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return False
+    return math.isfinite(number) and number > 0
+
+def capacity_inputs_error(target_rps: Any, p95_latency_ms: Any, service_times_ms: Any) -> Optional[str]:
+    """Why size_service_tiers cannot size these inputs, or None when they are valid."""
+    if not _positive(target_rps) or not _positive(p95_latency_ms):
+        return "target_rps and p95_latency_ms must be positive"
+    if not isinstance(service_times_ms, dict) or not service_times_ms:
+        return "service_times_ms must list at least one tier"
+    if not all(_positive(s) for s in service_times_ms.values()):
+        return "service times must be positive"
+    return None
+
+def size_service_tiers(
+    target_rps: float,
+    p95_latency_ms: float,
+    service_times_ms: Dict[str, float],
+    workers_per_instance: int = 1,
+    max_instances: int = 1000,
+    max_utilization: float = 0.85,
+) -> Dict[str, Any]:
+    """Find the smallest instance count per tier meeting its share of the p95 budget.
+    
+    The end-to-end budget is split across tiers in proportion to their mean
+    service time; summing per-tier p95s over-approximates the end-to-end p95,
+    so the resulting plan is conservative.
+    """
+    total_service_ms = sum(float(s) for s in service_times_ms.values())
+    tiers = {}
+    
+    for tier, service_ms in service_times_ms.items():
+        service_ms = float(service_ms)
+        budget_ms = p95_latency_ms * service_ms / total_service_ms
+        tiers[tier] = size_tier(
+            arrival_rate=target_rps,
+            service_time_s=service_ms / 1000.0,
+            p95_budget_s=budget_ms / 1000.0,
+            workers_per_instance=workers_per_instance,
+            max_instances=max_instances,
+            max_utilization=max_utilization,
+        )
+        tiers[tier]["latency_budget_ms"] = round(budget_ms, 3)
+    
+    return {
+        "model": "M/M/c (Erlang-C)",
+        "target_rps": target_rps,
+        "p95_latency_ms": p95_latency_ms,
+        "workers_per_instance": workers_per_instance,
+        "tiers": tiers,
+        "total_instances": sum(t["instances"] for t in tiers.values()),
+        "all_targets_met": all(t["meets_target"] for t in tiers.values()),
+    }
+
+def size_tier(
+    arrival_rate: float,
+    service_time_s: float,
+    p95_budget_s: float,
+    workers_per_instance: int,
+    max_instances: int,
+    max_utilization: float,
+) -> Dict[str, Any]:
+    """Sweep every instance count for one tier at once and pick the smallest that fits."""
+    import numpy as np
+    mu = 1.0 / service_time_s
+    offered_load = arrival_rate * service_time_s
+    instances = np.arange(1, max_instances + 1)
+    servers = instances * workers_per_instance
+    
+    utilization = offered_load / servers
+    wait_probability = np.ones(len(servers))
+    p95_s = np.full(len(servers), np.inf)
+    
+    stable = utilization < 1.0
+    if stable.any():
+        wait_probability[stable] = erlang_c_sweep(offered_load, int(servers[-1]))[servers[stable] - 1]
+        # Once queueing is negligible the p95 is pinned at the service-time floor,
+        # so only the window up to that point needs the (costlier) quantile solve.
+        window = stable & (utilization <= max_utilization)
+        settled = np.flatnonzero(window & (wait_probability < 1e-12))
+        if len(settled):
+            window[settled[0] + 1:] = False
+        if window.any():
+            p95_s[window] = response_time_quantile(
+                mu, servers[window] * mu - arrival_rate, wait_probability[window], P95_TAIL
+            )
+        if len(settled):
+            p95_s[settled[0] + 1:] = p95_s[settled[0]]
+    
+    feasible = stable & (utilization <= max_utilization) & (p95_s <= p95_budget_s)
+    if feasible.any():
+        idx = int(np.argmax(feasible))
+        meets_target = True
+    elif np.isfinite(p95_s).any():
+        # Report the smallest count that gets within 1% of the best achievable p95
+        idx = int(np.argmax(p95_s <= np.min(p95_s) * 1.01))
+        meets_target = False
+    else:
+        idx = len(instances) - 1
+        meets_target = False
+    
+    result = {
+        "instances": int(instances[idx]),
+        "servers": int(servers[idx]),
+        "utilization": round(float(utilization[idx]), 4),
+        "wait_probability": round(float(wait_probability[idx]), 6),
+        "predicted_p95_ms": round(float(p95_s[idx]) * 1000.0, 3) if math.isfinite(p95_s[idx]) else None,
+        "meets_target": meets_target,
+    }
+    if not meets_target:
+        floor_ms = -math.log(P95_TAIL) * service_time_s * 1000.0
+        result["note"] = (
+            f"No instance count up to {max_instances} meets the budget within the "
+            f"utilization ceiling; service time alone gives a p95 of {floor_ms:.1f} ms"
+        )
+    return result
+
+def erlang_c_sweep(offered_load: float, max_servers: int) -> np.ndarray:
+    """Erlang-C wait probability for every server count c = 1..max_servers.
+    
+    Poisson terms are evaluated in log space and normalised by their maximum,
+    so the cumulative sums stay finite for thousands of servers. Entries with
+    c <= offered_load are unstable and returned as 1.0.
+    """
+    import numpy as np
+    k = np.arange(0, max_servers + 1, dtype=np.float64)
+    log_fact = np.concatenate(([0.0], np.cumsum(np.log(k[1:]))))
+    log_terms = k * math.log(offered_load) - log_fact
+    terms = np.exp(log_terms - log_terms.max())
+    erlang_b = terms / np.cumsum(terms)
+    
+    c = k[1:]
+    b = erlang_b[1:]
+    denom = c - offered_load * (1.0 - b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        erlang_c = np.where(c > offered_load, c * b / denom, 1.0)
+    return np.clip(erlang_c, 0.0, 1.0)
+
+def response_time_quantile(
+    mu: float,
+    theta: np.ndarray,
+    wait_probability: np.ndarray,
+    tail: float,
+    iterations: int = 60,
+) -> np.ndarray:
+    """Solve P(T > t) = tail for the M/M/c response time T = W + S, vectorized.
+    
+    W is 0 with probability 1 - Pw and Exp(theta) otherwise (theta = c*mu - lambda);
+    S is Exp(mu). The survival function is monotone, so a batched bisection
+    converges for every server count at once.
+    """
+    import numpy as np
+    lo = np.zeros_like(theta)
+    hi = 20.0 / np.minimum(theta, mu) - math.log(tail) / mu
+    for _ in range(iterations):
+        mid = (lo + hi) / 2.0
+        above = response_time_survival(mid, mu, theta, wait_probability) > tail
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    return hi
+
+def response_time_survival(
+    t: np.ndarray,
+    mu: float,
+    theta: np.ndarray,
+    wait_probability: np.ndarray,
+) -> np.ndarray:
+    """P(T > t) for the M/M/c response time."""
+    import numpy as np
+    service_tail = np.exp(-mu * t)
+    diff = theta - mu
+    close = np.abs(diff) < 1e-9 * mu
+    safe_diff = np.where(close, 1.0, diff)
+    # Hypoexponential tail of Exp(theta) + Exp(mu); Erlang-2 when the rates coincide
+    queued_tail = np.where(
+        close,
+        service_tail * (1.0 + mu * t),
+        (theta * service_tail - mu * np.exp(-theta * t)) / safe_diff,
+    )
+    return (1.0 - wait_probability) * service_tail + wait_probability * queued_tail
@@ -0,0 +1,271 @@
+# Shared helpers for reading and writing artifacts from agent tools
+from __future__ import annotations
+import asyncio
+import hashlib
+import mmap
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from solace_ai_connector.common.log import log
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+# Host directories whose files may be read by name when they are not artifacts
+# (os.pathsep-separated); unset, tools only read from the artifact service
+LOCAL_DIRS_ENV = "ARTIFACT_LOCAL_DIRS"
+
+def _artifact_service(tool_context) -> Optional[Tuple[Any, str, str, str]]:
+    """The caller's artifact service with the app, user and session ids to address it."""
+    inv_context = getattr(tool_context, "_invocation_context", None) if tool_context is not None else None
+    artifact_service = getattr(inv_context, "artifact_service", None)
+    if artifact_service is None:
+        return None
+    from solace_agent_mesh.agent.utils.context_helpers import get_original_session_id
+
+    return artifact_service, inv_context.app_name, inv_context.user_id, get_original_session_id(inv_context)
+
+def _ranged_service(artifact_service, app_name: str) -> Tuple[Any, str]:
+    """The service implementing ranged reads behind SAM's scope wrapper, if there is one."""
+    inner = getattr(artifact_service, "wrapped_service", None)
+    if inner is not None and hasattr(inner, "load_artifact_range"):
+        return inner, artifact_service._get_scoped_app_name(app_name)
+    if hasattr(artifact_service, "load_artifact_range"):
+        return artifact_service, app_name
+    return None, app_name
+
+def local_artifact_path(filename: str) -> Optional[Path]:
+    """The allowlisted host file for a name the artifact service does not have.
+
+    Only files inside an ARTIFACT_LOCAL_DIRS directory qualify, after resolving
+    symlinks and "..", so callers cannot reach other host paths through tools.
+    """
+    allowed = [Path(d).expanduser().resolve() for d in os.environ.get(LOCAL_DIRS_ENV, "").split(os.pathsep) if d.strip()]
+    if not allowed or not filename:
+        return None
+    name = Path(filename).expanduser()
+    for candidate in ([name] if name.is_absolute() else [root / name for root in allowed]):
+        path = candidate.resolve()
+        if any(path.is_relative_to(root) for root in allowed) and path.is_file():
+            return path
+    return None
+
+def _read_local_range(path: Path, start: int, length: Optional[int]) -> bytes:
+    with open(path, "rb") as f:
+        size = path.stat().st_size
+        end = size if length is None else min(size, start + length)
+        if start >= end:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[start:end]
+
+async def load_artifact_bytes(
+    filename: str,
+    tool_context=None,
+    version: Optional[int] = None,
+) -> bytes:
+    """Load the raw bytes of an artifact.
+
+    The agent's artifact service (scoped to the caller's session) is tried
+    first; files under ARTIFACT_LOCAL_DIRS are accepted as a fallback so tools
+    can also be driven from scripts without the mesh.
+
+    Args:
+        filename (str): Artifact filename
+        version (Optional[int]): Artifact version; latest when omitted
+
+    Returns:
+        bytes: Artifact content
+    """
+    service = _artifact_service(tool_context)
+    if service is not None:
+        artifact_service, app_name, user_id, session_id = service
+        part = await artifact_service.load_artifact(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            filename=filename,
+            version=version,
+        )
+        if part is not None and part.inline_data is not None:
+            return part.inline_data.data
+        log.debug("[load_artifact_bytes] '%s' not in artifact service, trying ARTIFACT_LOCAL_DIRS", filename)
+
+    path = local_artifact_path(filename)
+    if path is not None:
+        return await asyncio.to_thread(path.read_bytes)
+    raise FileNotFoundError(f"Artifact '{filename}' not found")
+
+async def load_artifact_range(
+    filename: str,
+    tool_context=None,
+    version: Optional[int] = None,
+    start: int = 0,
+    length: Optional[int] = None,
+) -> bytes:
+    """Load bytes [start, start + length) of an artifact.
+
+    The content-addressed artifact service reads just the range (mmap for
+    local files); other services load the whole artifact and slice it.
+    Allowlisted local files are memory-mapped.
+
+    Args:
+        filename (str): Artifact filename
+        version (Optional[int]): Artifact version; latest when omitted
+        start (int): First byte offset
+        length (Optional[int]): Number of bytes; to the end when omitted
+
+    Returns:
+        bytes: The requested range (shorter at the end of the artifact)
+    """
+    if start < 0 or (length is not None and length < 0):
+        raise ValueError("start and length must not be negative")
+    service = _artifact_service(tool_context)
+    if service is not None:
+        artifact_service, app_name, user_id, session_id = service
+        ranged, scoped_app_name = _ranged_service(artifact_service, app_name)
+        if ranged is not None:
+            part = await ranged.load_artifact_range(
+                app_name=scoped_app_name,
+                user_id=user_id,
+                session_id=session_id,
+                filename=filename,
+                version=version,
+                start=start,
+                length=length,
+            )
+        else:
+            part = await artifact_service.load_artifact(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                filename=filename,
+                version=version,
+            )
+        if part is not None and part.inline_data is not None:
+            data = part.inline_data.data
+            return data if ranged is not None else data[start:None if length is None else start + length]
+        log.debug("[load_artifact_range] '%s' not in artifact service, trying ARTIFACT_LOCAL_DIRS", filename)
+
+    path = local_artifact_path(filename)
+    if path is not None:
+        return await asyncio.to_thread(_read_local_range, path, start, length)
+    raise FileNotFoundError(f"Artifact '{filename}' not found")
+
+async def iter_artifact_chunks(
+    filename: str,
+    tool_context=None,
+    version: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield an artifact's content in chunks, e.g. to stream it to an HTTP client.
+
+    With the content-addressed artifact service or an allowlisted local file
+    only one chunk is in memory at a time; other services load the artifact
+    once and it is sliced into chunks.
+    """
+    service = _artifact_service(tool_context)
+    if service is not None:
+        artifact_service, app_name, user_id, session_id = service
+        ranged, scoped_app_name = _ranged_service(artifact_service, app_name)
+        if ranged is not None and hasattr(ranged, "iter_artifact_chunks"):
+            try:
+                async for chunk in ranged.iter_artifact_chunks(
+                    app_name=scoped_app_name,
+                    user_id=user_id,
+                    session_id=session_id,
+                    filename=filename,
+                    version=version,
+                    chunk_size=chunk_size,
+                ):
+                    yield chunk
+                return
+            except FileNotFoundError:
+                log.debug("[iter_artifact_chunks] '%s' not in artifact service, trying ARTIFACT_LOCAL_DIRS", filename)
+        else:
+            part = await artifact_service.load_artifact(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                filename=filename,
+                version=version,
+            )
+            if part is not None and part.inline_data is not None:
+                view = memoryview(part.inline_data.data)
+                for offset in range(0, len(view), chunk_size):
+                    yield bytes(view[offset:offset + chunk_size])
+                return
+            log.debug("[iter_artifact_chunks] '%s' not in artifact service, trying ARTIFACT_LOCAL_DIRS", filename)
+
+    path = local_artifact_path(filename)
+    if path is None:
+        raise FileNotFoundError(f"Artifact '{filename}' not found")
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+async def artifact_digest(
+    filename: str,
+    tool_context=None,
+    version: Optional[int] = None,
+) -> str:
+    """SHA-256 hex digest of an artifact's content.
+
+    Taken from the metadata of the content-addressed artifact service when
+    available; otherwise the content is streamed through the hash.
+    """
+    service = _artifact_service(tool_context)
+    if service is not None:
+        artifact_service, app_name, user_id, session_id = service
+        ranged, scoped_app_name = _ranged_service(artifact_service, app_name)
+        if ranged is not None and hasattr(ranged, "artifact_digest"):
+            digest = await ranged.artifact_digest(
+                app_name=scoped_app_name,
+                user_id=user_id,
+                session_id=session_id,
+                filename=filename,
+                version=version,
+            )
+            if digest:
+                return digest
+
+    sha = hashlib.sha256()
+    async for chunk in iter_artifact_chunks(filename, tool_context, version):
+        sha.update(chunk)
+    return sha.hexdigest()
+
+async def save_artifact_bytes(
+    filename: str,
+    data: bytes,
+    mime_type: str,
+    tool_context=None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Save an artifact (and SAM's metadata companion) in the caller's session.
+
+    Returns SAM's save result ({"status", "data_version", ...}); ValueError
+    when the call has no artifact service.
+    """
+    service = _artifact_service(tool_context)
+    if service is None:
+        raise ValueError(f"No artifact service available to save '{filename}'")
+    artifact_service, app_name, user_id, session_id = service
+    from solace_agent_mesh.agent.utils.artifact_helpers import save_artifact_with_metadata
+
+    return await save_artifact_with_metadata(
+        artifact_service=artifact_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        content_bytes=data,
+        mime_type=mime_type,
+        metadata_dict=metadata or {},
+        timestamp=datetime.now(timezone.utc),
+        tool_context=tool_context,
+    )
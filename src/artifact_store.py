@@ -0,0 +1,692 @@
+# Content-addressed artifact store with compression and retention GC
+#
+# A drop-in variant of SAM's filesystem artifact service. Artifact bytes are
+# stored once per SHA-256 under <base_path>/.cas/ and every artifact version
+# file is a hard link to its blob, so repeated tool outputs cost no extra disk
+# or write I/O. The usual <scope>/<user>/<session>/<filename>/<version> layout
+# is kept, which means any plain filesystem artifact service (the WebUI
+# gateway's, for instance) can still read uncompressed artifacts.
+#
+# The link count of a blob is its reference count: deleting a version drops
+# it, and the GC removes blobs nobody links to anymore. The GC also applies
+# the retention policy (max age, always keeping the newest versions) and
+# reports how many bytes it reclaimed, per namespace.
+#
+# Reads can be limited to a byte range (mmap for stored-as-is versions, a
+# streaming decoder for compressed ones) or streamed in chunks, and loaded
+# content is kept in a size-bounded LRU keyed by (artifact, version, range) so
+# the same embed resolved on every turn is read from disk once.
+#
+#   python -m src.artifact_store stats --base-path /tmp/samv2
+#   python -m src.artifact_store gc --base-path /tmp/samv2 --retention-days 30
+from __future__ import annotations
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from google.adk.artifacts import BaseArtifactService
+from google.genai import types as adk_types
+from solace_agent_mesh.agent.adk.artifacts.filesystem_artifact_service import (
+    METADATA_FILE_SUFFIX,
+    FilesystemArtifactService,
+)
+from solace_ai_connector.common.log import log
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is used instead
+    zstandard = None
+
+CAS_DIR = ".cas"
+DEFAULT_MIN_COMPRESS_BYTES = 1024
+DEFAULT_KEEP_VERSIONS = 3
+DEFAULT_GC_INTERVAL_SECONDS = 3600.0
+# Unreferenced blobs younger than this are left alone: a save may be about to link them
+BLOB_GRACE_SECONDS = 300.0
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_CONTENT_CACHE_BYTES = 64 * 1024 * 1024
+# Larger reads bypass the cache instead of evicting everything else
+DEFAULT_CONTENT_CACHE_ENTRY_BYTES = 4 * 1024 * 1024
+
+TEXT_MIME_PREFIXES = ("text/",)
+TEXT_MIME_TYPES = {
+    "application/json", "application/xml", "application/yaml", "application/x-yaml",
+    "application/javascript", "application/x-python", "application/csv", "image/svg+xml",
+}
+ENCODING_SUFFIX = {"gzip": ".gz", "zstd": ".zst"}
+
+def is_text_mime(mime_type: Optional[str]) -> bool:
+    mime = (mime_type or "").split(";")[0].strip().lower()
+    return mime.startswith(TEXT_MIME_PREFIXES) or mime in TEXT_MIME_TYPES or mime.endswith(("+json", "+xml"))
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise OSError("Artifact is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    return data
+
+def open_decoder(f, encoding: Optional[str]):
+    """A readable, forward-seekable stream of the original bytes of an open version file."""
+    if encoding == "zstd":
+        if zstandard is None:
+            raise OSError("Artifact is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(f)
+    if encoding == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    return f
+
+def read_range(path: Path, encoding: Optional[str], start: int = 0, length: Optional[int] = None) -> bytes:
+    """Read bytes [start, start + length) of a version file without loading the rest."""
+    with open(path, "rb") as f:
+        if encoding is None:
+            size = os.fstat(f.fileno()).st_size
+            end = size if length is None else min(size, start + length)
+            if start >= end:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[start:end]
+        reader = open_decoder(f, encoding)
+        reader.seek(start)
+        return reader.read(-1 if length is None else length)
+
+class ContentCache:
+    """Size-bounded LRU of artifact content keyed by (artifact, version, range).
+
+    Each entry remembers the identity of the version file it was read from
+    (inode, size, mtime); a version that was deleted and re-created no longer
+    matches and is read again.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CONTENT_CACHE_BYTES, max_entry_bytes: int = DEFAULT_CONTENT_CACHE_ENTRY_BYTES):
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_entry_bytes = min(self.max_bytes, max(0, int(max_entry_bytes)))
+        self.bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._entries: "OrderedDict[Tuple, Tuple[Tuple[int, int, int], bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def identity(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def get(self, key: Tuple, identity: Tuple[int, int, int]) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != identity:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1], entry[2]
+
+    def put(self, key: Tuple, identity: Tuple[int, int, int], data: bytes, mime_type: str) -> None:
+        if len(data) > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous[1])
+            self._entries[key] = (identity, data, mime_type)
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+def _write_file_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+class ContentAddressedArtifactService(FilesystemArtifactService):
+    """Filesystem artifact service that deduplicates versions by content hash.
+
+    Text artifacts of at least `min_compress_bytes` are compressed when
+    `compression` is "gzip" or "zstd" (zstd falls back to gzip when the
+    zstandard package is missing). Compressed artifacts can only be read back
+    through this service, so leave compression at "none" when another
+    component reads the same base_path with the plain filesystem service.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        compression: str = "none",
+        min_compress_bytes: int = DEFAULT_MIN_COMPRESS_BYTES,
+        retention_days: Optional[float] = None,
+        keep_versions: int = DEFAULT_KEEP_VERSIONS,
+        content_cache_bytes: int = DEFAULT_CONTENT_CACHE_BYTES,
+        content_cache_entry_bytes: int = DEFAULT_CONTENT_CACHE_ENTRY_BYTES,
+    ):
+        super().__init__(base_path=base_path)
+        compression = (compression or "none").lower()
+        if compression == "zstd" and zstandard is None:
+            log.warning("[artifact_store] zstandard not installed; using gzip compression")
+            compression = "gzip"
+        if compression not in ("none", "gzip", "zstd"):
+            raise ValueError(f"Unsupported artifact compression '{compression}'")
+        self.compression = compression
+        self.min_compress_bytes = int(min_compress_bytes)
+        self.retention_days = float(retention_days) if retention_days else None
+        self.keep_versions = max(1, int(keep_versions))
+        self.cas_root = Path(self.base_path) / CAS_DIR
+        self.cas_root.mkdir(parents=True, exist_ok=True)
+        self.stats = {"saves": 0, "dedup_hits": 0, "bytes_written": 0, "bytes_saved": 0}
+        self.content_cache = ContentCache(content_cache_bytes, content_cache_entry_bytes)
+        self._gc_lock = threading.Lock()
+
+    # -----------------------------
+    # Blobs
+    # -----------------------------
+    def _blob_path(self, digest: str, encoding: Optional[str]) -> Path:
+        return self.cas_root / digest[:2] / (digest + ENCODING_SUFFIX.get(encoding or "", ""))
+
+    def _encode(self, data: bytes, mime_type: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        if self.compression == "none" or len(data) < self.min_compress_bytes or not is_text_mime(mime_type):
+            return data, None
+        packed = compress(data, self.compression)
+        # Not worth a decompression on every read unless it saves at least 10%
+        return (packed, self.compression) if len(packed) <= len(data) * 0.9 else (data, None)
+
+    def _store_version(self, version_path: Path, data: bytes, mime_type: Optional[str]) -> Dict[str, Any]:
+        """Link version_path to the blob for data, writing the blob only if it is new."""
+        digest = hashlib.sha256(data).hexdigest()
+        for encoding in (None, "gzip", "zstd"):
+            blob = self._blob_path(digest, encoding)
+            if blob.exists():
+                try:
+                    os.link(blob, version_path)
+                except FileNotFoundError:
+                    break  # collected between the check and the link; write it again
+                self.stats["dedup_hits"] += 1
+                self.stats["bytes_saved"] += len(data)
+                return {"sha256": digest, "encoding": encoding, "size": len(data)}
+
+        payload, encoding = self._encode(data, mime_type)
+        blob = self._blob_path(digest, encoding)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        _write_file_atomic(blob, payload)
+        os.link(blob, version_path)
+        self.stats["bytes_written"] += len(payload)
+        return {"sha256": digest, "encoding": encoding, "size": len(data)}
+
+    # -----------------------------
+    # BaseArtifactService
+    # -----------------------------
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        filename: str,
+        artifact: adk_types.Part,
+    ) -> int:
+        if not artifact.inline_data or artifact.inline_data.data is None:
+            raise OSError("Failed to save artifact: Part has no inline_data to save.")
+        filename = self._normalize_filename_unicode(filename)
+        artifact_dir = Path(self._get_artifact_dir(app_name, user_id, session_id, filename))
+        await asyncio.to_thread(artifact_dir.mkdir, parents=True, exist_ok=True)
+
+        versions = await self.list_versions(
+            app_name=app_name, user_id=user_id, session_id=session_id, filename=filename
+        )
+        version = 0 if not versions else max(versions) + 1
+        version_path = Path(self._get_version_path(str(artifact_dir), version))
+        metadata_path = Path(self._get_metadata_path(str(artifact_dir), version))
+        mime_type = artifact.inline_data.mime_type
+
+        try:
+            stored = await asyncio.to_thread(self._store_version, version_path, artifact.inline_data.data, mime_type)
+            metadata = {"mime_type": mime_type, **{k: v for k, v in stored.items() if v is not None}}
+            await asyncio.to_thread(_write_file_atomic, metadata_path, json.dumps(metadata).encode("utf-8"))
+        except (OSError, ValueError, TypeError) as e:
+            version_path.unlink(missing_ok=True)
+            metadata_path.unlink(missing_ok=True)
+            raise OSError(f"Failed to save artifact version {version}: {e}") from e
+
+        self.stats["saves"] += 1
+        log.debug("[artifact_store] Saved '%s' v%d as %s", filename, version, stored["sha256"][:12])
+        return version
+
+    async def _locate(
+        self, app_name: str, user_id: str, session_id: str, filename: str, version: Optional[int]
+    ) -> Optional[Tuple[str, str, int]]:
+        """Artifact dir, version file path and version number (latest when version is None)."""
+        filename = self._normalize_filename_unicode(filename)
+        artifact_dir = self._get_artifact_dir(app_name, user_id, session_id, filename)
+        if version is None:
+            versions = await self.list_versions(
+                app_name=app_name, user_id=user_id, session_id=session_id, filename=filename
+            )
+            if not versions:
+                return None
+            version = max(versions)
+        return artifact_dir, self._get_version_path(artifact_dir, version), version
+
+    async def _read_cached(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        filename: str,
+        version: Optional[int],
+        start: int,
+        length: Optional[int],
+    ) -> Optional[Tuple[bytes, str]]:
+        located = await self._locate(app_name, user_id, session_id, filename, version)
+        if located is None:
+            return None
+        artifact_dir, version_path, version = located
+        key = (artifact_dir, version, start, length)
+        identity = self.content_cache.identity(version_path)
+        if identity is None:
+            return None
+        cached = self.content_cache.get(key, identity)
+        if cached is not None:
+            return cached
+
+        metadata_path = self._get_metadata_path(artifact_dir, version)
+
+        def _read() -> Optional[Tuple[bytes, Dict[str, Any]]]:
+            try:
+                with open(metadata_path, encoding="utf-8") as f:
+                    metadata = json.load(f)
+                if start == 0 and length is None:
+                    with open(version_path, "rb") as f:
+                        return decompress(f.read(), metadata.get("encoding")), metadata
+                return read_range(Path(version_path), metadata.get("encoding"), start, length), metadata
+            except FileNotFoundError:
+                return None
+
+        try:
+            loaded = await asyncio.to_thread(_read)
+        except (OSError, ValueError) as e:
+            log.error("[artifact_store] Failed to load '%s' v%d: %s", filename, version, e)
+            return None
+        if loaded is None:
+            return None
+        data, metadata = loaded
+        mime_type = metadata.get("mime_type", "application/octet-stream")
+        self.content_cache.put(key, identity, data, mime_type)
+        return data, mime_type
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        filename: str,
+        version: Optional[int] = None,
+    ) -> Optional[adk_types.Part]:
+        loaded = await self._read_cached(app_name, user_id, session_id, filename, version, 0, None)
+        if loaded is None:
+            return None
+        return adk_types.Part.from_bytes(data=loaded[0], mime_type=loaded[1])
+
+    # -----------------------------
+    # Range reads and streaming
+    # -----------------------------
+    async def load_artifact_range(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        filename: str,
+        version: Optional[int] = None,
+        start: int = 0,
+        length: Optional[int] = None,
+    ) -> Optional[adk_types.Part]:
+        """Like load_artifact, but only bytes [start, start + length) of the content."""
+        if start < 0 or (length is not None and length < 0):
+            raise ValueError("start and length must not be negative")
+        loaded = await self._read_cached(app_name, user_id, session_id, filename, version, start, length)
+        if loaded is None:
+            return None
+        return adk_types.Part.from_bytes(data=loaded[0], mime_type=loaded[1])
+
+    async def iter_artifact_chunks(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        filename: str,
+        version: Optional[int] = None,
+        start: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """Yield the artifact content in chunks of at most chunk_size bytes.
+
+        Only one chunk is held in memory at a time, whatever the artifact size;
+        the content cache is bypassed.
+        """
+        located = await self._locate(app_name, user_id, session_id, filename, version)
+        if located is None:
+            raise FileNotFoundError(f"Artifact '{filename}' not found")
+        artifact_dir, version_path, version = located
+        metadata_path = self._get_metadata_path(artifact_dir, version)
+
+        def _open():
+            with open(metadata_path, encoding="utf-8") as f:
+                encoding = json.load(f).get("encoding")
+            raw = open(version_path, "rb")
+            reader = open_decoder(raw, encoding)
+            reader.seek(start)
+            return raw, reader
+
+        try:
+            raw, reader = await asyncio.to_thread(_open)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Artifact '{filename}' v{version} not found") from e
+        try:
+            remaining = length
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await asyncio.to_thread(reader.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            raw.close()
+
+    async def artifact_digest(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        filename: str,
+        version: Optional[int] = None,
+    ) -> Optional[str]:
+        """SHA-256 of the artifact content from its metadata, without reading the content.
+
+        None when the artifact is missing or its metadata predates this store.
+        """
+        located = await self._locate(app_name, user_id, session_id, filename, version)
+        if located is None:
+            return None
+        artifact_dir, _, version = located
+
+        def _read() -> Optional[str]:
+            try:
+                with open(self._get_metadata_path(artifact_dir, version), encoding="utf-8") as f:
+                    return json.load(f).get("sha256")
+            except (OSError, ValueError):
+                return None
+
+        return await asyncio.to_thread(_read)
+
+    # -----------------------------
+    # Retention and GC
+    # -----------------------------
+    def _iter_artifact_dirs(self):
+        """Yield (namespace, artifact_dir) for every <scope>/<user>/<session>/<filename> directory."""
+        base = Path(self.base_path)
+        for ns in base.iterdir():
+            if not ns.is_dir() or ns.name.startswith("."):
+                continue
+            for artifact_dir in ns.glob("*/*/*"):
+                if artifact_dir.is_dir():
+                    yield ns.name, artifact_dir
+
+    def collect_garbage(
+        self,
+        retention_days: Optional[float] = None,
+        keep_versions: Optional[int] = None,
+        ingest_legacy: bool = True,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """Apply retention, fold legacy copies into the blob store, drop unreferenced blobs.
+
+        Versions older than retention_days are deleted, except the newest
+        keep_versions of each artifact. With ingest_legacy, version files
+        written by the plain filesystem service are replaced by links to
+        their blob, which reclaims duplicates made before this service was
+        enabled. Returns the bytes reclaimed, overall and per namespace.
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        keep = self.keep_versions if keep_versions is None else max(1, keep_versions)
+        cutoff = time.time() - retention_days * 86400 if retention_days else None
+        started = time.perf_counter()
+        report: Dict[str, Any] = {
+            "versions_expired": 0,
+            "legacy_ingested": 0,
+            "blobs_removed": 0,
+            "bytes_reclaimed": 0,
+            "by_namespace": {},
+            "dry_run": dry_run,
+        }
+
+        def _reclaim(namespace: Optional[str], size: int) -> None:
+            report["bytes_reclaimed"] += size
+            if namespace:
+                ns = report["by_namespace"].setdefault(namespace, {"bytes_reclaimed": 0, "versions_expired": 0})
+                ns["bytes_reclaimed"] += size
+
+        # Blob inode -> namespace whose expired version held its last reference
+        released: Dict[int, str] = {}
+        with self._gc_lock:
+            for namespace, artifact_dir in self._iter_artifact_dirs():
+                versions = sorted(int(p.name) for p in artifact_dir.iterdir() if p.name.isdigit() and p.is_file())
+                for i, version in enumerate(versions):
+                    data_path = artifact_dir / str(version)
+                    meta_path = artifact_dir / f"{version}{METADATA_FILE_SUFFIX}"
+                    try:
+                        st = data_path.stat()
+                        meta_mtime = meta_path.stat().st_mtime if meta_path.exists() else st.st_mtime
+                    except FileNotFoundError:
+                        continue
+                    expired = cutoff is not None and meta_mtime < cutoff and i < len(versions) - keep
+                    if expired:
+                        report["versions_expired"] += 1
+                        report["by_namespace"].setdefault(namespace, {"bytes_reclaimed": 0, "versions_expired": 0})
+                        report["by_namespace"][namespace]["versions_expired"] += 1
+                        if st.st_nlink == 1:  # not in the blob store: the bytes go with the file
+                            _reclaim(namespace, st.st_size)
+                        elif st.st_nlink == 2:  # last reference: the blob (same inode) is freed below
+                            released[st.st_ino] = namespace
+                            if dry_run:
+                                _reclaim(namespace, st.st_size)
+                        if not dry_run:
+                            data_path.unlink(missing_ok=True)
+                            meta_path.unlink(missing_ok=True)
+                    elif ingest_legacy and st.st_nlink == 1 and meta_path.exists():
+                        reclaimed = self._ingest_legacy(data_path, meta_path, dry_run)
+                        if reclaimed is not None:
+                            report["legacy_ingested"] += 1
+                            _reclaim(namespace, reclaimed)
+                if not dry_run:
+                    try:
+                        artifact_dir.rmdir()  # only succeeds once the last version is gone
+                    except OSError:
+                        pass
+
+            grace_cutoff = time.time() - BLOB_GRACE_SECONDS
+            for blob in self.cas_root.glob("*/*"):
+                try:
+                    st = blob.stat()
+                except FileNotFoundError:
+                    continue
+                if blob.name.startswith(".") or st.st_nlink > 1 or st.st_mtime > grace_cutoff:
+                    continue
+                report["blobs_removed"] += 1
+                _reclaim(released.get(st.st_ino), st.st_size)
+                if not dry_run:
+                    blob.unlink(missing_ok=True)
+
+        report["duration_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+        log.info(
+            "[artifact_store] GC reclaimed %d bytes (%d versions expired, %d blobs removed, %d legacy files ingested)",
+            report["bytes_reclaimed"], report["versions_expired"], report["blobs_removed"], report["legacy_ingested"],
+        )
+        return report
+
+    def _ingest_legacy(self, data_path: Path, meta_path: Path, dry_run: bool) -> Optional[int]:
+        """Replace a standalone version file by a link to its blob; returns bytes reclaimed."""
+        try:
+            metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+            if metadata.get("sha256"):
+                return None  # already a blob whose other links were removed
+            data = data_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if dry_run:
+            digest = hashlib.sha256(data).hexdigest()
+            known = any(self._blob_path(digest, enc).exists() for enc in (None, "gzip", "zstd"))
+            return len(data) if known else 0
+        tmp_link = data_path.with_name(f".{data_path.name}.ingest")
+        tmp_link.unlink(missing_ok=True)
+        written_before = self.stats["bytes_written"]
+        stored = self._store_version(tmp_link, data, metadata.get("mime_type"))
+        os.replace(tmp_link, data_path)
+        metadata.update({k: v for k, v in stored.items() if v is not None})
+        _write_file_atomic(meta_path, json.dumps(metadata).encode("utf-8"))
+        return len(data) - (self.stats["bytes_written"] - written_before)
+
+    def store_stats(self) -> Dict[str, Any]:
+        """Logical vs physical size of the store, and references per namespace."""
+        logical, references = 0, {}
+        for namespace, artifact_dir in self._iter_artifact_dirs():
+            for p in artifact_dir.iterdir():
+                if p.name.isdigit():
+                    references[namespace] = references.get(namespace, 0) + 1
+                    try:
+                        meta = json.loads((artifact_dir / f"{p.name}{METADATA_FILE_SUFFIX}").read_text(encoding="utf-8"))
+                        logical += int(meta.get("size") or p.stat().st_size)
+                    except (OSError, ValueError):
+                        logical += p.stat().st_size
+        blobs = [b.stat() for b in self.cas_root.glob("*/*") if not b.name.startswith(".")]
+        return {
+            "logical_bytes": logical,
+            "blob_bytes": sum(st.st_size for st in blobs),
+            "blob_count": len(blobs),
+            "unreferenced_blobs": sum(1 for st in blobs if st.st_nlink == 1),
+            "references_by_namespace": references,
+            "session_stats": dict(self.stats),
+            "content_cache": self.content_cache.info(),
+        }
+
+# -----------------------------
+# SAM wiring
+# -----------------------------
+_SERVICES: Dict[str, ContentAddressedArtifactService] = {}
+_SERVICES_LOCK = threading.Lock()
+
+def _gc_forever(service: ContentAddressedArtifactService, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            service.collect_garbage()
+        except Exception as e:
+            log.error("[artifact_store] GC failed: %s", e)
+
+def artifact_service_from_config(config: Dict[str, Any]) -> ContentAddressedArtifactService:
+    """Build (or reuse) the store for an artifact_service config block and start its GC thread."""
+    base_path = config.get("base_path")
+    if not base_path:
+        raise ValueError("'base_path' is required for the content_addressed artifact service")
+    key = os.path.abspath(base_path)
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(key)
+        if service is None:
+            service = ContentAddressedArtifactService(
+                base_path,
+                compression=config.get("compression", "none"),
+                min_compress_bytes=int(config.get("min_compress_bytes", DEFAULT_MIN_COMPRESS_BYTES)),
+                retention_days=float(config.get("retention_days") or 0) or None,
+                keep_versions=int(config.get("keep_versions", DEFAULT_KEEP_VERSIONS)),
+                content_cache_bytes=int(config.get("content_cache_bytes", DEFAULT_CONTENT_CACHE_BYTES)),
+                content_cache_entry_bytes=int(config.get("content_cache_entry_bytes", DEFAULT_CONTENT_CACHE_ENTRY_BYTES)),
+            )
+            _SERVICES[key] = service
+            interval = float(config.get("gc_interval_seconds", DEFAULT_GC_INTERVAL_SECONDS))
+            if interval > 0:
+                threading.Thread(
+                    target=_gc_forever, args=(service, interval), name="artifact-store-gc", daemon=True
+                ).start()
+            log.info("[artifact_store] Content-addressed store at %s (compression %s)", key, service.compression)
+        return service
+
+def install_artifact_backend(host_component) -> None:
+    """Add the "content_addressed" artifact_service type to SAM's factory (idempotent)."""
+    from solace_agent_mesh.agent.adk.services import ScopedArtifactServiceWrapper
+    from solace_agent_mesh.agent.sac import component as sac_component
+
+    original = sac_component.initialize_artifact_service
+    if getattr(original, "_content_addressed_backend", False):
+        return
+
+    def initialize_artifact_service(component) -> BaseArtifactService:
+        config = component.get_config("artifact_service", {}) or {}
+        if str(config.get("type", "")).lower() == "content_addressed":
+            return ScopedArtifactServiceWrapper(wrapped_service=artifact_service_from_config(config), component=component)
+        return original(component)
+
+    initialize_artifact_service._content_addressed_backend = True
+    sac_component.initialize_artifact_service = initialize_artifact_service
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or garbage-collect the content-addressed artifact store")
+    parser.add_argument("command", choices=["stats", "gc"])
+    parser.add_argument("--base-path", default=os.environ.get("ARTIFACT_BASE_PATH", "/tmp/samv2"))
+    parser.add_argument("--retention-days", type=float, default=None)
+    parser.add_argument("--keep-versions", type=int, default=DEFAULT_KEEP_VERSIONS)
+    parser.add_argument("--no-ingest", action="store_true", help="Leave files written by the plain filesystem service alone")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    service = ContentAddressedArtifactService(args.base_path)
+    if args.command == "stats":
+        result = service.store_stats()
+    else:
+        result = service.collect_garbage(
+            retention_days=args.retention_days,
+            keep_versions=args.keep_versions,
+            ingest_legacy=not args.no_ingest,
+            dry_run=args.dry_run,
+        )
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,670 @@
+# Columnar query engine for large tabular artifacts
+#
+# SAM's data_analysis tools parse a CSV/JSON artifact into SQLite on every
+# query. This module converts an artifact once into a column store and keeps
+# it under $ARTIFACT_BASE_PATH/.columnar/<sha256>/, so repeat queries on the
+# same content skip parsing entirely:
+#
+#   - one memory-mapped NumPy file per column; strings are dictionary-encoded
+#     (int32 codes + a dictionary), numbers are int64 or float64
+#   - min/max per block of ZONE_ROWS rows for numeric columns (zone maps)
+#
+# A query only maps the columns it references (projection pushdown), evaluates
+# filters block by block and skips blocks whose zone maps rule them out, and
+# string filters are evaluated once against the dictionary instead of per row
+# (predicate pushdown). Only the rows that are returned are materialized.
+from __future__ import annotations
+import asyncio
+import json
+import os
+import shutil
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+from solace_ai_connector.common.log import log
+from src.artifact_io import artifact_digest, iter_artifact_chunks
+from src.tool_metrics import instrument_tool
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+ZONE_ROWS = 65536
+INGEST_CHUNK_ROWS = 100_000
+DEFAULT_LIMIT = 50
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+FILTER_OPS = {"==", "!=", "<", "<=", ">", ">=", "in", "not_in", "contains", "is_null", "not_null"}
+AGGREGATIONS = {"sum", "mean", "min", "max", "count", "nunique"}
+NUMERIC_ONLY_AGGREGATIONS = {"sum", "mean"}
+SOURCE_FORMATS = {
+    ".csv": "csv", ".tsv": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl",
+    ".json": "json", ".parquet": "parquet",
+}
+
+_INGEST_LOCKS: Dict[str, threading.Lock] = {}
+_INGEST_LOCKS_GUARD = threading.Lock()
+
+def cache_root(tool_config: Optional[Dict[str, Any]] = None) -> Path:
+    configured = (tool_config or {}).get("cache_dir") or os.environ.get("COLUMNAR_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    return Path(os.environ.get("ARTIFACT_BASE_PATH", "/tmp/samv2")) / ".columnar"
+
+def detect_format(filename: str, source_format: str = "auto") -> str:
+    if source_format and source_format != "auto":
+        if source_format not in SOURCE_FORMATS.values():
+            raise ValueError(f"Unsupported source_format '{source_format}'")
+        return source_format
+    return SOURCE_FORMATS.get(Path(filename).suffix.lower(), "csv")
+
+# -----------------------------
+# Ingestion
+# -----------------------------
+def _read_chunks(path: Path, fmt: str) -> Iterator["pd.DataFrame"]:
+    """The source file as DataFrames of at most INGEST_CHUNK_ROWS rows."""
+    import pandas as pd
+
+    if fmt in ("csv", "tsv"):
+        yield from pd.read_csv(path, sep="\t" if fmt == "tsv" else ",", chunksize=INGEST_CHUNK_ROWS, low_memory=False)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=INGEST_CHUNK_ROWS)
+    elif fmt == "json":
+        data = json.loads(path.read_bytes())
+        if isinstance(data, dict):
+            data = next((v for v in data.values() if isinstance(v, list)), [data])
+        for i in range(0, len(data), INGEST_CHUNK_ROWS):
+            yield pd.json_normalize(data[i:i + INGEST_CHUNK_ROWS])
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet artifacts requires the pyarrow package") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=INGEST_CHUNK_ROWS):
+            yield batch.to_pandas()
+
+class _ColumnWriter:
+    """Appends one column to its .bin file, chunk by chunk."""
+
+    def __init__(self, directory: Path, index: int, name: str, sample: "pd.Series"):
+        from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype
+
+        self.name = name
+        self.file_name = f"c{index}.bin"
+        self.path = directory / self.file_name
+        self.numeric = is_numeric_dtype(sample) and not is_bool_dtype(sample)
+        self.dtype = ("int64" if is_integer_dtype(sample) else "float64") if self.numeric else "int32"
+        self.rows = 0
+        self.nulls = 0
+        self.coerced = 0
+        self.dictionary: Dict[str, int] = {}
+        self._file = open(self.path, "wb")
+
+    def _promote_to_float(self) -> None:
+        import numpy as np
+
+        self._file.close()
+        np.fromfile(self.path, dtype="int64").astype("float64").tofile(self.path)
+        self._file = open(self.path, "ab")
+        self.dtype = "float64"
+
+    def append_nulls(self, count: int) -> None:
+        import numpy as np
+
+        if count <= 0:
+            return
+        if self.dtype == "int64":
+            self._promote_to_float()
+        fill = np.full(count, np.nan if self.numeric else -1, dtype=self.dtype)
+        self._file.write(fill.tobytes())
+        self.rows += count
+        self.nulls += count
+
+    def append(self, series: "pd.Series") -> None:
+        import numpy as np
+        import pandas as pd
+        from pandas.api.types import is_integer_dtype
+
+        missing = series.isna()
+        if self.numeric:
+            values = pd.to_numeric(series, errors="coerce")
+            if self.dtype == "int64" and not is_integer_dtype(values):
+                self._promote_to_float()
+            if self.dtype == "float64":
+                array = values.to_numpy(dtype="float64", na_value=np.nan)
+            else:
+                array = values.to_numpy(dtype="int64")
+            nulls = int(np.isnan(array).sum()) if self.dtype == "float64" else 0
+            self.coerced += nulls - int(missing.sum())
+        else:
+            local_codes, uniques = pd.factorize(series.astype(str).where(~missing, None))
+            mapping = np.fromiter(
+                (self.dictionary.setdefault(u, len(self.dictionary)) for u in uniques),
+                dtype="int32", count=len(uniques),
+            )
+            array = np.where(local_codes >= 0, mapping[local_codes] if len(mapping) else -1, -1).astype("int32")
+            nulls = int(missing.sum())
+        self._file.write(array.tobytes())
+        self.rows += len(array)
+        self.nulls += nulls
+
+    def finish(self, directory: Path) -> Dict[str, Any]:
+        import numpy as np
+
+        self._file.close()
+        entry: Dict[str, Any] = {
+            "name": self.name,
+            "file": self.file_name,
+            "kind": "numeric" if self.numeric else "string",
+            "dtype": self.dtype,
+            "nulls": self.nulls,
+        }
+        if self.coerced:
+            # Non-numeric values in a column that started out numeric
+            entry["coerced_to_null"] = self.coerced
+        if not self.numeric:
+            dictionary_file = self.file_name.replace(".bin", ".dict.json")
+            (directory / dictionary_file).write_text(json.dumps(list(self.dictionary)), encoding="utf-8")
+            entry["dictionary"] = dictionary_file
+            entry["distinct"] = len(self.dictionary)
+            return entry
+
+        zones: List[Optional[List[float]]] = []
+        if self.rows:
+            column = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(self.rows,))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN blocks
+                for start in range(0, self.rows, ZONE_ROWS):
+                    block = column[start:start + ZONE_ROWS]
+                    lo, hi = np.nanmin(block), np.nanmax(block)
+                    zones.append(None if np.isnan(lo) else [lo.item(), hi.item()])
+            del column
+        entry["zones"] = zones
+        return entry
+
+def convert_to_columnar(source: Path, fmt: str, target: Path) -> Dict[str, Any]:
+    """Convert a CSV/JSON/JSONL/Parquet file into the column store at `target`.
+
+    The store is built in a scratch directory and renamed into place, so a
+    reader never sees a partial conversion.
+    """
+    scratch = target.parent / f".tmp-{target.name}-{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(scratch, ignore_errors=True)
+    scratch.mkdir(parents=True)
+    writers: Dict[str, _ColumnWriter] = {}
+    rows = 0
+    try:
+        for chunk in _read_chunks(source, fmt):
+            chunk.columns = [str(c) for c in chunk.columns]
+            for name in chunk.columns:
+                if name not in writers:
+                    writers[name] = _ColumnWriter(scratch, len(writers), name, chunk[name])
+                    writers[name].append_nulls(rows)  # column first seen in a later chunk
+                writers[name].append(chunk[name])
+            rows += len(chunk)
+            for writer in writers.values():
+                writer.append_nulls(rows - writer.rows)
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "source_format": fmt,
+            "rows": rows,
+            "zone_rows": ZONE_ROWS,
+            "columns": [w.finish(scratch) for w in writers.values()],
+        }
+        (scratch / MANIFEST).write_text(json.dumps(manifest), encoding="utf-8")
+        try:
+            os.replace(scratch, target)
+        except OSError:
+            if not (target / MANIFEST).is_file():
+                raise
+            shutil.rmtree(scratch, ignore_errors=True)  # converted concurrently by another process
+    except BaseException:
+        for writer in writers.values():
+            writer._file.close()
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    return manifest
+
+def evict_cache(root: Path, max_bytes: int, keep: Optional[str] = None) -> int:
+    """Delete the least recently used conversions until the cache fits max_bytes."""
+    entries = []
+    for entry in root.iterdir() if root.is_dir() else []:
+        manifest = entry / MANIFEST
+        if entry.name.startswith(".") or not manifest.is_file():
+            continue
+        size = sum(f.stat().st_size for f in entry.iterdir())
+        entries.append((manifest.stat().st_mtime, size, entry))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if entry.name == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+# -----------------------------
+# Query execution
+# -----------------------------
+class ColumnarTable:
+    """Read-only view of a converted artifact; columns are mapped on first use."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.manifest = json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Column store at {directory} has an unsupported format version")
+        self.rows: int = self.manifest["rows"]
+        self.zone_rows: int = self.manifest["zone_rows"]
+        self.columns: Dict[str, Dict[str, Any]] = {c["name"]: c for c in self.manifest["columns"]}
+        self._arrays: Dict[str, "np.ndarray"] = {}
+        self._dictionaries: Dict[str, "np.ndarray"] = {}
+
+    @property
+    def zone_count(self) -> int:
+        return -(-self.rows // self.zone_rows)
+
+    def schema(self) -> List[Dict[str, Any]]:
+        return [{"name": c["name"], "type": c["kind"], "nulls": c["nulls"]} for c in self.manifest["columns"]]
+
+    def column(self, name: str) -> Dict[str, Any]:
+        if name not in self.columns:
+            raise ValueError(f"Unknown column '{name}'")
+        return self.columns[name]
+
+    def array(self, name: str) -> "np.ndarray":
+        import numpy as np
+
+        array = self._arrays.get(name)
+        if array is None:
+            column = self.column(name)
+            if self.rows == 0:
+                array = np.empty(0, dtype=column["dtype"])
+            else:
+                array = np.memmap(self.directory / column["file"], dtype=column["dtype"], mode="r", shape=(self.rows,))
+            self._arrays[name] = array
+        return array
+
+    def dictionary(self, name: str) -> "np.ndarray":
+        import numpy as np
+
+        values = self._dictionaries.get(name)
+        if values is None:
+            entries = json.loads((self.directory / self.column(name)["dictionary"]).read_text(encoding="utf-8"))
+            values = np.array(entries, dtype=str) if entries else np.array([], dtype=str)
+            self._dictionaries[name] = values
+        return values
+
+    def values(self, name: str, rows: Optional["np.ndarray"]) -> "np.ndarray":
+        """Decoded values of a column at the given row indices (all rows when None)."""
+        import numpy as np
+
+        data = self.array(name)
+        data = np.asarray(data[rows] if rows is not None else data)
+        if self.column(name)["kind"] == "numeric":
+            return data
+        decoded = np.empty(len(data), dtype=object)
+        present = data >= 0
+        decoded[present] = self.dictionary(name)[data[present]]
+        return decoded
+
+def _compare(values: "np.ndarray", op: str, value: Any) -> "np.ndarray":
+    import numpy as np
+
+    if op == "==":
+        return values == value
+    if op == "!=":
+        return values != value
+    if op == "<":
+        return values < value
+    if op == "<=":
+        return values <= value
+    if op == ">":
+        return values > value
+    if op == ">=":
+        return values >= value
+    if op == "in":
+        return np.isin(values, value)
+    if op == "not_in":
+        return ~np.isin(values, value)
+    raise ValueError(f"Operator '{op}' is not supported on this column")
+
+class _Predicate:
+    """One filter, prepared once per query against the column's type and dictionary."""
+
+    def __init__(self, table: ColumnarTable, spec: Dict[str, Any]):
+        import numpy as np
+
+        if not isinstance(spec, dict) or "column" not in spec:
+            raise ValueError("Each filter needs 'column', 'op' and (except for is_null/not_null) 'value'")
+        self.table = table
+        self.name = str(spec["column"])
+        self.op = str(spec.get("op", "=="))
+        if self.op not in FILTER_OPS:
+            raise ValueError(f"Unknown filter op '{self.op}'; use one of {sorted(FILTER_OPS)}")
+        self.meta = table.column(self.name)
+        self.numeric = self.meta["kind"] == "numeric"
+        value = spec.get("value")
+        if self.op in ("in", "not_in") and not isinstance(value, list):
+            value = [value]
+        if self.numeric and self.op not in ("is_null", "not_null", "contains"):
+            try:
+                value = [float(v) for v in value] if isinstance(value, list) else float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Column '{self.name}' is numeric; filter value {spec.get('value')!r} is not a number")
+        elif self.op == "contains" and self.numeric:
+            raise ValueError(f"'contains' needs a string column; '{self.name}' is numeric")
+        elif not self.numeric and self.op not in ("is_null", "not_null"):
+            value = [str(v) for v in value] if isinstance(value, list) else str(value)
+        self.value = value
+
+        # String filters are evaluated once over the dictionary; rows then look up their code.
+        # The extra last slot is for nulls (code -1), which only is_null matches.
+        self.lookup: Optional[np.ndarray] = None
+        if not self.numeric:
+            dictionary = table.dictionary(self.name)
+            if self.op in ("is_null", "not_null"):
+                matches = np.full(len(dictionary), self.op == "not_null")
+            elif self.op == "contains":
+                import pandas as pd
+
+                matches = pd.Series(dictionary, dtype=object).str.contains(self.value, case=False, regex=False).to_numpy()
+            else:
+                matches = _compare(dictionary, self.op, self.value)
+            self.lookup = np.append(np.asarray(matches, dtype=bool), self.op == "is_null")
+
+    @property
+    def never_matches(self) -> bool:
+        return self.lookup is not None and not self.lookup.any()
+
+    def zone_may_match(self, zone: Optional[List[float]]) -> bool:
+        if zone is None:  # every value in the block is null
+            return self.op == "is_null"
+        if self.op in ("!=", "not_in", "is_null", "not_null"):
+            return True
+        lo, hi = zone
+        if self.op == "==":
+            return lo <= self.value <= hi
+        if self.op == "<":
+            return lo < self.value
+        if self.op == "<=":
+            return lo <= self.value
+        if self.op == ">":
+            return hi > self.value
+        if self.op == ">=":
+            return hi >= self.value
+        if self.op == "in":
+            return any(lo <= v <= hi for v in self.value)
+        return True
+
+    def evaluate(self, start: int, end: int) -> "np.ndarray":
+        import numpy as np
+
+        block = np.asarray(self.table.array(self.name)[start:end])
+        if self.lookup is not None:
+            return self.lookup[block]
+        is_null = np.isnan(block) if self.meta["dtype"] == "float64" else np.zeros(len(block), dtype=bool)
+        if self.op == "is_null":
+            return is_null
+        if self.op == "not_null":
+            return ~is_null
+        return _compare(block, self.op, self.value) & ~is_null
+
+def filter_rows(table: ColumnarTable, filters: List[Dict[str, Any]]) -> Tuple[Optional["np.ndarray"], int]:
+    """Row indices matching all filters (None means every row) and the number of blocks scanned."""
+    import numpy as np
+
+    if not filters:
+        return None, table.zone_count
+    predicates = [_Predicate(table, f) for f in filters]
+    if any(p.never_matches for p in predicates):
+        return np.empty(0, dtype=np.int64), 0
+    # Cheap dictionary lookups first; a block stops being evaluated once nothing matches
+    predicates.sort(key=lambda p: p.lookup is None)
+
+    matched: List[np.ndarray] = []
+    scanned = 0
+    for zone in range(table.zone_count):
+        if not all(p.zone_may_match(p.meta["zones"][zone]) for p in predicates if p.numeric):
+            continue
+        scanned += 1
+        start, end = zone * table.zone_rows, min(table.rows, (zone + 1) * table.zone_rows)
+        mask = predicates[0].evaluate(start, end)
+        for predicate in predicates[1:]:
+            if not mask.any():
+                break
+            mask &= predicate.evaluate(start, end)
+        matched.append(np.flatnonzero(mask) + start)
+    return (np.concatenate(matched) if matched else np.empty(0, dtype=np.int64)), scanned
+
+def _sort_key(table: ColumnarTable, name: str, rows: Optional["np.ndarray"], descending: bool) -> "np.ndarray":
+    """Float sort key for a column at the given rows; nulls sort last either way."""
+    import numpy as np
+
+    data = np.asarray(table.array(name)[rows] if rows is not None else table.array(name))
+    if table.column(name)["kind"] == "numeric":
+        key = data.astype("float64")
+        null = np.isnan(key)
+    else:
+        # Rank of each dictionary entry in string order, looked up by code
+        ranks = np.empty(len(table.dictionary(name)), dtype="float64")
+        ranks[np.argsort(table.dictionary(name), kind="stable")] = np.arange(len(ranks))
+        key = np.where(data >= 0, ranks[np.maximum(data, 0)] if len(ranks) else 0.0, np.nan)
+        null = data < 0
+    key = -key if descending else key
+    return np.where(null, np.inf, key)
+
+def _jsonable(value: Any) -> Any:
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+def run_query(
+    table: ColumnarTable,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Dict[str, Any]]] = None,
+    group_by: Optional[List[str]] = None,
+    aggregations: Optional[Dict[str, str]] = None,
+    order_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = DEFAULT_LIMIT,
+) -> Dict[str, Any]:
+    """Filter, project, optionally group/aggregate, order and limit a converted table."""
+    import numpy as np
+
+    limit = max(0, int(limit))
+    rows, scanned = filter_rows(table, filters or [])
+    matched = table.rows if rows is None else len(rows)
+    result: Dict[str, Any] = {
+        "rows_matched": matched,
+        "rows_total": table.rows,
+        "blocks_scanned": scanned,
+        "blocks_total": table.zone_count,
+    }
+
+    if not group_by and not aggregations:
+        selected = columns or list(table.columns)
+        for name in selected:
+            table.column(name)
+        if order_by:
+            key = _sort_key(table, order_by, rows, descending)
+            top = np.argpartition(key, limit - 1)[:limit] if 0 < limit < len(key) else np.arange(min(limit, len(key)))
+            top = top[np.argsort(key[top], kind="stable")]
+            picked = top if rows is None else rows[top]
+        else:
+            picked = np.arange(min(limit, matched)) if rows is None else rows[:limit]
+        values = {name: table.values(name, picked) for name in selected}
+        result["columns"] = selected
+        result["rows"] = [{name: _jsonable(values[name][i]) for name in selected} for i in range(len(picked))]
+        return result
+
+    import pandas as pd
+
+    group_by = list(group_by or [])
+    aggregations = dict(aggregations or {})
+    for name, fn in aggregations.items():
+        if fn not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{fn}' for '{name}'; use one of {sorted(AGGREGATIONS)}")
+        if fn in NUMERIC_ONLY_AGGREGATIONS and table.column(name)["kind"] != "numeric":
+            raise ValueError(f"'{fn}' needs a numeric column; '{name}' holds strings")
+
+    ordered = {name for name, fn in aggregations.items() if fn in {"min", "max"}}
+    frame: Dict[str, Any] = {}
+    for name in dict.fromkeys(group_by + list(aggregations)):
+        data = np.asarray(table.array(name)[rows] if rows is not None else table.array(name))
+        if table.column(name)["kind"] == "numeric":
+            frame[name] = data
+        elif name in ordered:
+            # min/max need ordered categories; sort the dictionary and remap the codes onto it
+            dictionary = table.dictionary(name)
+            order = np.argsort(dictionary, kind="stable")
+            rank = np.empty(len(order), dtype=data.dtype)
+            rank[order] = np.arange(len(order), dtype=data.dtype)
+            codes = np.where(data >= 0, rank[np.maximum(data, 0)] if len(rank) else -1, -1)
+            frame[name] = pd.Categorical.from_codes(
+                codes, categories=pd.Index(dictionary[order], dtype=object), ordered=True
+            )
+        else:
+            frame[name] = pd.Categorical.from_codes(data, categories=pd.Index(table.dictionary(name), dtype=object))
+    df = pd.DataFrame(frame)
+    named = {f"{name}_{fn}": (name, fn) for name, fn in aggregations.items()}
+    if group_by:
+        grouped = df.groupby(group_by, observed=True, dropna=False, sort=False)
+        out = grouped.agg(**named) if named else pd.DataFrame(index=grouped.size().index)
+        out["rows"] = grouped.size()
+        out = out.reset_index()
+    else:
+        out = pd.DataFrame({out_name: [df[name].agg(fn)] for out_name, (name, fn) in named.items()})
+        out["rows"] = matched
+    if order_by:
+        if order_by not in out.columns:
+            raise ValueError(f"order_by '{order_by}' is not a result column; use one of {list(out.columns)}")
+        out = out.sort_values(order_by, ascending=not descending, na_position="last", kind="stable")
+    result["groups"] = len(out)
+    result["columns"] = [str(c) for c in out.columns]
+    result["rows"] = [
+        {str(k): _jsonable(v) for k, v in record.items()}
+        for record in out.head(limit).astype(object).to_dict(orient="records")
+    ]
+    return result
+
+# -----------------------------
+# Tool
+# -----------------------------
+def _ingest_lock(digest: str) -> threading.Lock:
+    with _INGEST_LOCKS_GUARD:
+        return _INGEST_LOCKS.setdefault(digest, threading.Lock())
+
+async def _spool_artifact(artifact: str, tool_context, version: Optional[int], dest: Path) -> None:
+    with open(dest, "wb") as f:
+        async for chunk in iter_artifact_chunks(artifact, tool_context, version):
+            await asyncio.to_thread(f.write, chunk)
+
+@instrument_tool
+async def query_table_artifact(
+    artifact: str,
+    columns: List[str] = None,
+    filters: List[Dict[str, Any]] = None,
+    group_by: List[str] = None,
+    aggregations: Dict[str, str] = None,
+    order_by: str = None,
+    descending: bool = False,
+    limit: int = DEFAULT_LIMIT,
+    version: int = None,
+    source_format: str = "auto",
+    tool_context=None,
+    tool_config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Query a large CSV, JSON, JSONL or Parquet artifact through a cached column store.
+
+    Args:
+        artifact (str): Artifact filename of the table
+        columns (List[str]): Columns to return; all when omitted
+        filters (List[Dict[str, Any]]): Conditions combined with AND, each {"column", "op", "value"}; ops are ==, !=, <, <=, >, >=, in, not_in, contains, is_null, not_null
+        group_by (List[str]): Columns to group by
+        aggregations (Dict[str, str]): Column -> sum, mean, min, max, count or nunique; results are named <column>_<fn>
+        order_by (str): Column (or aggregate result column) to sort by
+        descending (bool): Sort in descending order
+        limit (int): Maximum rows returned
+        version (int): Artifact version; latest when omitted
+        source_format (str): auto (from the extension), csv, tsv, json, jsonl or parquet
+
+    Returns:
+        Dict[str, Any]: Matching rows, match counts, blocks scanned and whether the artifact had to be converted
+    """
+    log.info("[query_table_artifact] called")
+    config = tool_config or {}
+    started = time.perf_counter()
+
+    try:
+        fmt = detect_format(artifact, source_format)
+        digest = await artifact_digest(artifact, tool_context, version)
+    except (FileNotFoundError, ValueError) as e:
+        return {"status": "error", "error": str(e)}
+
+    root = cache_root(config)
+    entry = root / digest
+    converted = False
+    convert_ms = 0.0
+    if not (entry / MANIFEST).is_file():
+        lock = _ingest_lock(digest)
+        await asyncio.to_thread(lock.acquire)
+        try:
+            if not (entry / MANIFEST).is_file():
+                root.mkdir(parents=True, exist_ok=True)
+                source = root / f".src-{digest}-{os.getpid()}"
+                convert_started = time.perf_counter()
+                try:
+                    await _spool_artifact(artifact, tool_context, version, source)
+                    manifest = await asyncio.to_thread(convert_to_columnar, source, fmt, entry)
+                except (OSError, ValueError, ImportError) as e:
+                    return {"status": "error", "error": f"Could not convert '{artifact}' ({fmt}): {e}"}
+                finally:
+                    source.unlink(missing_ok=True)
+                convert_ms = (time.perf_counter() - convert_started) * 1000.0
+                converted = True
+                log.info(
+                    "[query_table_artifact] Converted '%s' (%d rows, %d columns) in %.0f ms",
+                    artifact, manifest["rows"], len(manifest["columns"]), convert_ms,
+                )
+                max_bytes = int(config.get("cache_max_bytes") or os.environ.get("COLUMNAR_CACHE_MAX_BYTES", DEFAULT_CACHE_MAX_BYTES))
+                await asyncio.to_thread(evict_cache, root, max_bytes, digest)
+        finally:
+            lock.release()
+    else:
+        os.utime(entry / MANIFEST)  # recency for cache eviction
+
+    try:
+        table = await asyncio.to_thread(ColumnarTable, entry)
+    except (OSError, ValueError) as e:
+        return {"status": "error", "error": f"Could not open column store for '{artifact}': {e}"}
+    query_started = time.perf_counter()
+    try:
+        result = await asyncio.to_thread(
+            run_query, table, columns, filters, group_by, aggregations, order_by, descending, limit
+        )
+    except ValueError as e:
+        return {"status": "error", "error": str(e), "schema": table.schema()}
+
+    return {
+        "status": "success",
+        "artifact": artifact,
+        "sha256": digest,
+        "converted": converted,
+        **result,
+        "convert_ms": round(convert_ms, 1),
+        "query_ms": round((time.perf_counter() - query_started) * 1000.0, 1),
+        "total_ms": round((time.perf_counter() - started) * 1000.0, 1),
+    }
@@ -0,0 +1,194 @@
+# In-process "company pipeline": requirements -> user stories -> plan -> staffing
+#
+# The most common request walks four agents in a row (RequirementsAgent twice,
+# ProgramManagerAgent, HiringAgent). Each hop costs LLM turns and serializes a
+# large intermediate dict over the broker, although every step is
+# deterministic Python in src/. `run_company_pipeline` calls the four tools
+# directly in the orchestrator's process and passes intermediates on as Python
+# objects:
+#
+#   gather_requirements   -> functional requirements become the story inputs
+#   create_user_stories   -> total story points size the plan when no duration is given
+#   create_project_plan   -> its duration picks the staffing timeline
+#   analyze_team_needs
+#
+# The plan is sized for `team_size` people, while analyze_team_needs derives
+# its target from the project type and timeline. The bundle's
+# "plan_assumptions" records the team size and duration the plan was built
+# on next to that staffing target, so the two can be compared.
+# Only the combined bundle is written, as one JSON artifact; the model gets a
+# short summary and the artifact name. The stage tools keep their own
+# instrumentation, so per-stage latencies show up in the tool metrics as usual.
+from __future__ import annotations
+import json
+import math
+import re
+import time
+from typing import Any, Dict, List, Optional
+from solace_ai_connector.common.log import log
+from src.artifact_io import save_artifact_bytes
+from src.hiring_manager.tools import analyze_team_needs
+from src.program_manager_agent.tools import create_project_plan
+from src.requirements_agent.tools import create_user_stories, gather_requirements
+from src.tool_metrics import instrument_tool
+
+DEFAULT_TEAM_SIZE = 5
+# Story points one person completes per week; sizes development when no duration is given
+POINTS_PER_PERSON_WEEK = 3
+# Share of the plan create_project_plan gives to development
+DEVELOPMENT_SHARE = 0.45
+MIN_DURATION_WEEKS = 4
+# analyze_team_needs staffing timelines, by the longest duration (weeks) each covers
+_TIMELINES = ((13, "3 months"), (26, "6 months"), (52, "12 months"))
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")[:60] or "project"
+
+def story_inputs(requirements: Dict[str, Any]) -> List[str]:
+    """Functional requirements of gather_requirements' result, in document order."""
+    functional = requirements.get("functional_requirements") or {}
+    return [item for group in functional.values() for item in group]
+
+def estimate_duration_weeks(story_points: int, team_size: int) -> int:
+    development_weeks = story_points / max(1, team_size * POINTS_PER_PERSON_WEEK)
+    return max(MIN_DURATION_WEEKS, math.ceil(development_weeks / DEVELOPMENT_SHARE))
+
+def staffing_timeline(duration_weeks: int) -> str:
+    return next((label for limit, label in _TIMELINES if duration_weeks <= limit), "18+ months")
+
+def plan_assumptions(team_size: int, weeks: int, duration_given: bool, team: Dict[str, Any]) -> Dict[str, Any]:
+    """Team size and duration the plan assumes, against the staffing target."""
+    target = team["recommendations"]["target_team_size"]
+    return {
+        "team_size": team_size,
+        "duration_weeks": weeks,
+        "duration_source": "given" if duration_given else "estimated from story points",
+        "staffing_timeline": staffing_timeline(weeks),
+        "staffing_target_team_size": target,
+        "staffing_gap": target - team_size,
+    }
+
+def summarise(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    stories = bundle["user_stories"]["story_overview"]
+    plan = bundle["project_plan"]["project_overview"]
+    team = bundle["team_needs"]["recommendations"]
+    return {
+        "requirements": bundle["requirements"]["requirement_categories"]["total_requirements"],
+        "user_stories": stories["total_stories"],
+        "story_points": stories["total_story_points"],
+        "duration_weeks": plan["total_duration_weeks"],
+        "plan_team_size": bundle["plan_assumptions"]["team_size"],
+        "estimated_end_date": plan["estimated_end_date"],
+        "risk_level": bundle["project_plan"]["risk_assessment"]["risk_level"],
+        "target_team_size": team["target_team_size"],
+        "additional_hires": team["additional_hires"],
+        "priority_skills": team["priority_skills"],
+    }
+
+@instrument_tool
+async def run_company_pipeline(
+    project_description: str,
+    project_name: str = None,
+    project_type: str = "web_application",
+    stakeholder_groups: List[str] = None,
+    compliance_requirements: List[str] = None,
+    user_personas: List[str] = None,
+    story_format: str = "agile",
+    duration_weeks: int = None,
+    team_size: int = DEFAULT_TEAM_SIZE,
+    priority: str = "medium",
+    current_team_size: int = 0,
+    current_skills: List[str] = None,
+    output_filename: str = None,
+    tool_context=None,
+    tool_config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Produce requirements, user stories, a project plan and team needs for a project in one call.
+
+    Args:
+        project_description (str): High-level project description and goals
+        project_name (str): Name of the project; derived from the description when omitted
+        project_type (str): Type of project (web_application, mobile_app, api, etc.)
+        stakeholder_groups (List[str]): Key stakeholder groups to consider
+        compliance_requirements (List[str]): Regulatory or compliance requirements
+        user_personas (List[str]): User personas/roles for the stories
+        story_format (str): Format for user stories (agile, traditional, gherkin)
+        duration_weeks (int): Project duration in weeks; estimated from the story points when omitted
+        team_size (int): Number of team members the plan is sized for (at least 1)
+        priority (str): Project priority level (low, medium, high, critical)
+        current_team_size (int): Number of current team members
+        current_skills (List[str]): Skills already present in the team
+        output_filename (str): Artifact name for the bundle; <project>_pipeline.json when omitted
+
+    Returns:
+        Dict[str, Any]: Summary of each stage, stage timings and the bundle artifact name
+    """
+    log.info("[run_company_pipeline] called")
+    if isinstance(team_size, bool) or not isinstance(team_size, int) or team_size < 1:
+        return {"status": "error", "error": f"team_size must be a whole number of at least 1, got {team_size!r}"}
+    if duration_weeks is not None and (isinstance(duration_weeks, bool) or not isinstance(duration_weeks, int) or duration_weeks < 1):
+        return {"status": "error", "error": f"duration_weeks must be a whole number of at least 1, got {duration_weeks!r}"}
+    project_name = project_name or " ".join(project_description.split()[:6]) or "Project"
+    timings: Dict[str, float] = {}
+
+    async def stage(name: str, call) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = await call
+        timings[name] = round((time.perf_counter() - started) * 1000.0, 2)
+        if not isinstance(result, dict) or result.get("status") != "success":
+            raise ValueError(f"{name} failed: {result.get('error') if isinstance(result, dict) else result}")
+        return result
+
+    try:
+        requirements = await stage("gather_requirements", gather_requirements(
+            project_description, stakeholder_groups, project_type, compliance_requirements,
+            tool_context=tool_context,
+        ))
+        stories = await stage("create_user_stories", create_user_stories(
+            story_inputs(requirements), user_personas, story_format=story_format,
+            tool_context=tool_context,
+        ))
+        weeks = duration_weeks or estimate_duration_weeks(stories["story_overview"]["total_story_points"], team_size)
+        plan = await stage("create_project_plan", create_project_plan(
+            project_name, project_description, weeks, team_size, priority,
+            tool_context=tool_context,
+        ))
+        team = await stage("analyze_team_needs", analyze_team_needs(
+            project_description, current_team_size, current_skills, staffing_timeline(weeks),
+            tool_context=tool_context,
+        ))
+    except ValueError as e:
+        return {"status": "error", "error": str(e), "timings_ms": timings}
+
+    bundle = {
+        "project_name": project_name,
+        "requirements": requirements,
+        "user_stories": stories,
+        "project_plan": plan,
+        "team_needs": team,
+        "plan_assumptions": plan_assumptions(team_size, weeks, duration_weeks is not None, team),
+    }
+    summary = summarise(bundle)
+    result = {
+        "status": "success",
+        "project_name": project_name,
+        "summary": summary,
+        "timings_ms": {**timings, "total": round(sum(timings.values()), 2)},
+    }
+    filename = output_filename or f"{_slug(project_name)}_pipeline.json"
+    try:
+        saved = await save_artifact_bytes(
+            filename,
+            json.dumps(bundle, indent=2, default=str).encode("utf-8"),
+            "application/json",
+            tool_context,
+            metadata={"description": f"Requirements, user stories, project plan and team needs for {project_name}"},
+        )
+    except ValueError:
+        # no artifact service (direct calls, benchmarks): hand the bundle back instead
+        result["bundle"] = bundle
+        return result
+    if saved.get("status") == "error":
+        return {"status": "error", "error": f"Could not save '{filename}': {saved.get('message')}", "summary": summary}
+    result["artifact"] = {"filename": filename, "version": saved.get("data_version")}
+    return result
@@ -0,0 +1,205 @@
+# Shared project-description analysis for all agents
+#
+# The orchestrator hands the same project description to the requirements,
+# architect, hiring and program manager agents. Each of them used to lowercase
+# and keyword-scan it separately; this module does that once and caches the
+# resulting feature record by content hash, in-process (LRU) and on disk under
+# the artifact base path so every agent process reuses the same parse.
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from solace_ai_connector.common.log import log
+
+# Bump when detection rules change so stale disk records are ignored
+ANALYZER_VERSION = 1
+
+DEFAULT_CACHE_SIZE = 1024
+
+# Domain -> (trigger terms, compliance framework); order is reporting order
+DOMAIN_RULES: Tuple[Tuple[str, Tuple[str, ...], str], ...] = (
+    ("healthcare", ("healthcare", "medical", "patient"), "HIPAA"),
+    ("financial", ("financial", "payment", "banking"), "PCI DSS"),
+    ("privacy", ("gdpr", "privacy", "personal data"), "GDPR"),
+    ("government", ("government", "federal", "security"), "FedRAMP"),
+)
+
+# Technical hints used by the architect's requirement analysis
+HINT_TERMS: Dict[str, str] = {
+    "scale": "scale",
+    "secure": "secure",
+    "api": "api",
+    "real_time": "real-time",
+}
+
+# Team project types as matched by the hiring manager, first match wins
+TEAM_TYPE_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("web_development", (
+        "frontend_development", "backend_development", "database_design",
+        "devops", "ui/ux_design", "product_management",
+    )),
+    ("data_science", (
+        "data_analysis", "machine_learning", "statistics",
+        "data_engineering", "visualization", "domain_expertise",
+    )),
+    ("mobile_development", (
+        "ios_development", "android_development", "ui/ux_design",
+        "backend_apis", "devops", "product_management",
+    )),
+    ("infrastructure", (
+        "cloud_architecture", "devops", "security",
+        "monitoring", "automation", "site_reliability",
+    )),
+)
+DEFAULT_TEAM_TYPE = "web_development"
+
+def _all_terms() -> set:
+    terms = {t for _, triggers, _ in DOMAIN_RULES for t in triggers}
+    terms |= set(HINT_TERMS.values())
+    terms |= {t for _, keywords in TEAM_TYPE_KEYWORDS for t in keywords}
+    return terms
+
+def _build_scanner(terms: set) -> re.Pattern:
+    # A zero-width lookahead reports matches at every offset, so overlapping
+    # terms are all found in a single pass over the text.
+    alternation = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))")
+
+_TERMS = _all_terms()
+_SCANNER = _build_scanner(_TERMS)
+# Alternation yields only the longest term at each offset; these fill in the shorter
+# terms it shadows so results match a plain substring test per term.
+_SHADOWED = {t: [o for o in _TERMS if o != t and t.startswith(o)] for t in _TERMS}
+
+def _found_terms(desc_lower: str) -> set:
+    found = set(_SCANNER.findall(desc_lower))
+    for term in list(found):
+        found.update(_SHADOWED[term])
+    return found
+
+def extract_features(description: str) -> Dict[str, Any]:
+    """Scan a description once and build its feature record (uncached)."""
+    desc_lower = description.lower()
+    found = _found_terms(desc_lower)
+
+    domains, compliance = [], []
+    for domain, triggers, framework in DOMAIN_RULES:
+        if any(t in found for t in triggers):
+            domains.append(domain)
+            compliance.append(framework)
+
+    hints = {name: term in found for name, term in HINT_TERMS.items()}
+
+    team_type = DEFAULT_TEAM_TYPE
+    for ptype, keywords in TEAM_TYPE_KEYWORDS:
+        if any(k in found for k in keywords):
+            team_type = ptype
+            break
+
+    return {
+        "analyzer_version": ANALYZER_VERSION,
+        "length": len(description),
+        "domains": domains,
+        "compliance": compliance,
+        "hints": hints,
+        "scale": "high" if hints["scale"] else "medium",
+        "real_time": hints["real_time"],
+        "team_project_type": team_type,
+    }
+
+# -----------------------------
+# Caching
+# -----------------------------
+class _LRUCache:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+_MEMORY_CACHE = _LRUCache(int(os.environ.get("DESCRIPTION_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+
+def description_key(description: str) -> str:
+    """Content hash identifying a description under the current analyzer version."""
+    payload = f"v{ANALYZER_VERSION}\0{description}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+def cache_dir() -> Optional[Path]:
+    """Disk cache location under the artifact base path, or None when disabled."""
+    if os.environ.get("DESCRIPTION_CACHE_DISK", "true").lower() in {"0", "false", "no"}:
+        return None
+    base = os.environ.get("ARTIFACT_BASE_PATH", "/tmp/samv2")
+    return Path(base) / "description_cache"
+
+def _disk_path(key: str) -> Optional[Path]:
+    root = cache_dir()
+    return root / key[:2] / f"{key}.json" if root else None
+
+def _read_disk(key: str) -> Optional[Dict[str, Any]]:
+    path = _disk_path(key)
+    if path is None:
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return record if record.get("analyzer_version") == ANALYZER_VERSION else None
+
+def _write_disk(key: str, record: Dict[str, Any]) -> None:
+    path = _disk_path(key)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        log.debug("[description_analysis] Could not persist %s: %s", key, e)
+
+def analyze_description(description: str) -> Dict[str, Any]:
+    """Return the feature record for a description, computing it at most once.
+
+    Lookup order is the in-process LRU, then the shared disk cache, then a
+    fresh scan. The returned dict is shared between callers: treat it as
+    read-only and copy any list you hand back to the framework.
+    """
+    description = description or ""
+    key = description_key(description)
+
+    record = _MEMORY_CACHE.get(key)
+    if record is not None:
+        return record
+
+    record = _read_disk(key)
+    if record is None:
+        record = extract_features(description)
+        record["key"] = key
+        _write_disk(key, record)
+    _MEMORY_CACHE.put(key, record)
+    return record
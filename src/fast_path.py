@@ -0,0 +1,260 @@
+# Structured tool commands that bypass the LLM
+#
+# A caller that already knows the agent, the tool and the arguments still pays
+# two model turns per agent (pick the tool, then word the result) and two more
+# in the orchestrator. Agents with a `fast_path` block in their app_config
+# (*fast_path in configs/shared_config.yaml) accept commands instead. Send
+# them as message text through any gateway, either as lines
+#
+#   /call ArchitectAgent.plan_capacity {"target_rps": 500, "p95_latency_ms": 300, "service_times_ms": {"api": 20, "db": 8}}
+#   /call create_project_plan {"project_name": "Portal", "project_description": "Customer portal", "duration_weeks": 12}
+#
+# (the agent is optional and defaults to the receiving agent), or as a message
+# that is exactly a JSON object, or an array of them for a batch, with the keys
+# "agent", "tool" and "args".
+#
+# A before_model_callback answers both model turns itself:
+#   1. the request ends with such a message: each command is checked against
+#      the tool's declaration (known tool, required arguments present, no
+#      unknown ones, JSON types match). The callback then returns the tool
+#      calls as if the model had chosen them. Commands for another agent
+#      become one call to its peer tool (peer_<Agent>) carrying the /call
+#      lines, so the orchestrator forwards without a model turn and the peer
+#      takes its own fast path;
+#   2. the request ends with the responses to those calls (recognised by the
+#      "fastpath-" call id prefix): the callback returns them as the answer,
+#      as JSON.
+# Tools still run through ADK and SAM, with the usual tool_context, artifact
+# handling, status updates and tool metrics. A rejected command is answered
+# with the reason, also without a model call. SAM's before_model chain runs
+# first, so the orchestrator's peer tools are part of the request when
+# commands are resolved.
+from __future__ import annotations
+import fnmatch
+import inspect
+import json
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from solace_ai_connector.common.log import log
+
+CALL_ID_PREFIX = "fastpath-"
+PEER_TOOL_PREFIX = "peer_"  # SAM's peer agent tools
+_CALL_LINE = re.compile(r"^/call\s+(?:(?P<agent>[\w-]+)\.)?(?P<tool>[\w-]+)(?:\s+(?P<args>\{.*\}))?\s*$")
+_COMMAND_KEYS = {"agent", "tool", "args"}
+# Supplied by ADK/SAM at call time, never by the caller
+_INJECTED_PARAMS = {"tool_context", "tool_config"}
+_JSON_TYPES = {
+    "STRING": (str,),
+    "INTEGER": (int,),
+    "NUMBER": (int, float),
+    "BOOLEAN": (bool,),
+    "ARRAY": (list,),
+    "OBJECT": (dict,),
+}
+
+class CommandError(ValueError):
+    pass
+
+@dataclass
+class Command:
+    tool: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    agent: Optional[str] = None
+
+    def as_line(self) -> str:
+        prefix = f"{self.agent}." if self.agent else ""
+        return f"/call {prefix}{self.tool} {json.dumps(self.args, separators=(',', ':'))}"
+
+# -----------------------------
+# Parsing and validation
+# -----------------------------
+def _command(entry: Any) -> Command:
+    if not isinstance(entry, dict) or not entry.get("tool") or not set(entry) <= _COMMAND_KEYS:
+        raise CommandError('each command needs "tool" and may only have "agent" and "args"')
+    args = entry.get("args") or {}
+    if not isinstance(args, dict):
+        raise CommandError(f'"args" of {entry["tool"]} must be a JSON object')
+    return Command(tool=str(entry["tool"]), args=args, agent=entry.get("agent") or None)
+
+def parse_commands(text: str) -> Optional[List[Command]]:
+    """Commands in a message, or None when it is an ordinary request."""
+    stripped = text.strip()
+    if stripped[:1] in "{[":
+        try:
+            data = json.loads(stripped)
+        except ValueError:
+            data = None
+        entries = data if isinstance(data, list) else [data]
+        if data is not None and entries and all(isinstance(e, dict) and "tool" in e and set(e) <= _COMMAND_KEYS for e in entries):
+            return [_command(e) for e in entries]
+    commands = []
+    for line in stripped.splitlines():
+        if not line.startswith("/call"):
+            continue
+        match = _CALL_LINE.match(line.strip())
+        if not match:
+            raise CommandError(f"cannot parse {line.strip()!r}; expected /call [Agent.]tool {{json args}}")
+        try:
+            args = json.loads(match["args"]) if match["args"] else {}
+        except ValueError as e:
+            raise CommandError(f"arguments of {match['tool']} are not valid JSON: {e}") from e
+        commands.append(Command(tool=match["tool"], args=args, agent=match["agent"]))
+    return commands or None
+
+def _type_name(schema: Any) -> Optional[str]:
+    kind = getattr(schema, "type", None)
+    return getattr(kind, "value", kind) if kind is not None else None
+
+def _required(tool: Any, parameters: Any) -> List[str]:
+    # ADK lists defaulted parameters as required too; the signature knows better
+    func = getattr(tool, "func", None)
+    if func is None:
+        return [name for name in parameters.required or [] if name not in _INJECTED_PARAMS]
+    return [name for name, p in inspect.signature(func).parameters.items()
+            if name in (parameters.properties or {}) and name not in _INJECTED_PARAMS and p.default is inspect.Parameter.empty]
+
+def validate_args(tool: Any, args: Dict[str, Any]) -> None:
+    """Check arguments against the tool's FunctionDeclaration (built from its signature)."""
+    declaration = tool._get_declaration() if hasattr(tool, "_get_declaration") else None
+    parameters = getattr(declaration, "parameters", None)
+    if parameters is None:
+        if args:
+            raise CommandError(f"{tool.name} takes no arguments")
+        return
+    properties = {name: schema for name, schema in (parameters.properties or {}).items() if name not in _INJECTED_PARAMS}
+    unknown = sorted(set(args) - set(properties))
+    if unknown:
+        raise CommandError(f"{tool.name} has no parameter(s) {', '.join(unknown)}; expected {', '.join(sorted(properties)) or 'none'}")
+    missing = [name for name in _required(tool, parameters) if name not in args]
+    if missing:
+        raise CommandError(f"{tool.name} is missing required argument(s) {', '.join(missing)}")
+    for name, value in args.items():
+        expected = _JSON_TYPES.get(str(_type_name(properties[name]) or "").upper())
+        if value is None or expected is None:
+            continue
+        if not isinstance(value, expected) or (isinstance(value, bool) and bool not in expected):
+            raise CommandError(f"argument {name} of {tool.name} must be {_type_name(properties[name]).lower()}, got {type(value).__name__}")
+
+# -----------------------------
+# Callback
+# -----------------------------
+def _text_response(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+def _last_user_text(llm_request: LlmRequest) -> Optional[str]:
+    if not llm_request.contents:
+        return None
+    last = llm_request.contents[-1]
+    if last.role != "user" or any(p.function_response for p in last.parts or []):
+        return None
+    return "\n".join(p.text for p in last.parts or [] if p.text)
+
+def _fast_path_responses(llm_request: LlmRequest) -> Optional[List[types.FunctionResponse]]:
+    if not llm_request.contents:
+        return None
+    responses = [p.function_response for p in llm_request.contents[-1].parts or [] if p.function_response]
+    if responses and all((r.id or "").startswith(CALL_ID_PREFIX) for r in responses):
+        return responses
+    return None
+
+def _result_text(responses: List[types.FunctionResponse]) -> str:
+    results = []
+    for response in responses:
+        payload = response.response
+        if response.name.startswith(PEER_TOOL_PREFIX) and isinstance(payload, dict) and isinstance(payload.get("result"), str):
+            if len(responses) == 1:
+                return payload["result"]
+            try:
+                payload = json.loads(payload["result"])
+            except ValueError:
+                payload = payload["result"]
+        results.append({"tool": response.name, "result": payload})
+    if len(results) == 1:
+        return json.dumps(results[0]["result"], indent=2, default=str)
+    return json.dumps(results, indent=2, default=str)
+
+def resolve_calls(commands: List[Command], agent_name: str, tools: Dict[str, Any], allowed: Tuple[str, ...]) -> List[types.Part]:
+    """Validated function-call parts for the commands (peer commands grouped per agent)."""
+    parts: List[types.Part] = []
+    forwarded: Dict[str, List[str]] = {}
+    for command in commands:
+        if command.agent and command.agent != agent_name:
+            peer_tool = f"{PEER_TOOL_PREFIX}{command.agent}"
+            if peer_tool not in tools:
+                raise CommandError(f"{agent_name} cannot reach agent {command.agent}")
+            forwarded.setdefault(peer_tool, []).append(command.as_line())
+            continue
+        tool = tools.get(command.tool)
+        if tool is None:
+            raise CommandError(f"{agent_name} has no tool {command.tool}")
+        if not any(fnmatch.fnmatch(command.tool, pattern) for pattern in allowed):
+            raise CommandError(f"{command.tool} is not allowed on the fast path of {agent_name}")
+        validate_args(tool, command.args)
+        parts.append(types.Part(function_call=types.FunctionCall(id=f"{CALL_ID_PREFIX}{uuid.uuid4().hex}", name=command.tool, args=command.args)))
+    for peer_tool, lines in forwarded.items():
+        if not any(fnmatch.fnmatch(peer_tool, pattern) for pattern in allowed):
+            raise CommandError(f"forwarding to {peer_tool[len(PEER_TOOL_PREFIX):]} is not allowed on the fast path of {agent_name}")
+        parts.append(types.Part(function_call=types.FunctionCall(
+            id=f"{CALL_ID_PREFIX}{uuid.uuid4().hex}", name=peer_tool, args={"task_description": "\n".join(lines)})))
+    return parts
+
+def fast_path_response(llm_request: LlmRequest, agent_name: str, allowed: Tuple[str, ...]) -> Optional[LlmResponse]:
+    """The model response for a command turn, or None to let the model answer."""
+    responses = _fast_path_responses(llm_request)
+    if responses:
+        return _text_response(_result_text(responses))
+    text = _last_user_text(llm_request)
+    if not text or "/call" not in text and text.lstrip()[:1] not in "{[":
+        return None
+    try:
+        commands = parse_commands(text)
+        if not commands:
+            return None
+        parts = resolve_calls(commands, agent_name, llm_request.tools_dict, allowed)
+    except CommandError as e:
+        log.info("[fast_path] %s rejected a command: %s", agent_name, e)
+        return _text_response(f"Command rejected: {e}")
+    log.info("[fast_path] %s: %s without a model turn", agent_name, ", ".join(p.function_call.name for p in parts))
+    return LlmResponse(content=types.Content(role="model", parts=parts))
+
+def _allowed(config: Any) -> Optional[Tuple[str, ...]]:
+    """Allowed tool patterns, or None when the fast path is off."""
+    if not isinstance(config, dict):
+        return ("*",) if config is True or str(config).lower() in {"1", "true", "yes"} else None
+    if str(config.get("enabled", True)).strip().lower() in {"0", "false", "no", "off"}:
+        return None
+    allow = config.get("allow") or "*"
+    patterns = [p.strip() for p in allow.split(",")] if isinstance(allow, str) else [str(p) for p in allow]
+    return tuple(p for p in patterns if p)
+
+def install_fast_path(host_component) -> None:
+    """agent_init_function part: wrap SAM's ADK agent factory (idempotent)."""
+    from solace_agent_mesh.agent.sac import component as sac_component
+
+    original = sac_component.initialize_adk_agent
+    if getattr(original, "_fast_path", False):
+        return
+
+    def initialize_adk_agent(component, *args, **kwargs):
+        agent = original(component, *args, **kwargs)
+        allowed = _allowed(component.get_config("fast_path"))
+        if allowed is None:
+            return agent
+        agent_name = component.get_config("agent_name") or agent.name
+        previous = agent.before_model_callback
+
+        def before_model_callback(callback_context, llm_request: LlmRequest) -> Optional[LlmResponse]:
+            response = previous(callback_context, llm_request) if previous else None
+            return response or fast_path_response(llm_request, agent_name, allowed)
+
+        agent.before_model_callback = before_model_callback
+        log.info("[fast_path] %s accepts structured tool commands (%s)", agent_name, ", ".join(allowed))
+        return agent
+
+    initialize_adk_agent._fast_path = True
+    sac_component.initialize_adk_agent = initialize_adk_agent
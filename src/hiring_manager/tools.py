@@ -2,7 +2,10 @@
 from __future__ import annotations
 from typing import Any, Dict, List, Optional
 from solace_ai_connector.common.log import log
+from src.description_analysis import analyze_description
+from src.tool_metrics import instrument_tool
 
+@instrument_tool
 async def create_job_description(
     role_title: str,
     department: str,
@@ -94,6 +97,7 @@ async def create_job_description(
     
     return result
 
+@instrument_tool
 async def design_screening_process(
     role_type: str,
     skills_to_assess: List[str] = None,
@@ -193,6 +197,7 @@ async def design_screening_process(
     
     return result
 
+@instrument_tool
 async def analyze_team_needs(
     project_description: str,
     current_team_size: int = 0,
@@ -236,12 +241,8 @@ async def analyze_team_needs(
         ]
     }
     
-    # Detect project type from description
-    project_type = "web_development"  # default
-    for ptype, skills in project_skill_mapping.items():
-        if any(skill.lower().replace(" ", "_") in project_description.lower() for skill in skills):
-            project_type = ptype
-            break
+    # Detect project type from the shared (cached) description parse
+    project_type = analyze_description(project_description)["team_project_type"]
     
     required_skills = project_skill_mapping[project_type]
     skill_gaps = [skill for skill in required_skills if skill not in current_skills]
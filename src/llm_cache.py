@@ -0,0 +1,472 @@
+# Response cache for LiteLLM model calls
+#
+# Orchestrated workflows send the planning and general models near-identical
+# requests over and over: the same agent instruction, agent cards and tool
+# schemas, and often the same conversation. This cache sits in front of
+# LiteLLM for agents whose model config has a `response_cache` block
+# (*llm_response_cache in configs/shared_config.yaml). A repeated request is
+# answered from memory in microseconds instead of a model round trip.
+#
+# Every request gets two keys, both SHA-256 over canonical JSON of the model,
+# the messages, the tool schemas and the request parameters that change the
+# answer:
+#   exact       the messages as sent;
+#   normalized  whitespace collapsed, SAM's per-turn "Current time ... UTC."
+#               line masked, tool-call ids replaced by their position and
+#               tool-call arguments re-serialized with sorted keys.
+# Entries live in a bounded LRU with a TTL and, with disk_path set, in one
+# JSON file per normalized key (shared by processes and kept over restarts).
+# On a hit the stored answer is returned as a ModelResponse, or as a short
+# chunk stream when the call streams, with fresh tool-call ids. Only complete
+# answers (finish reason stop or tool_calls) are stored.
+#
+# SAM builds the LiteLLM model from the config dict and passes unknown keys on
+# to every completion call. `install_response_cache` (run from the agent's
+# agent_init_function, src.service_backends) wraps LiteLLMClient.acompletion
+# so the `response_cache` key is taken out and acted on. It also tags the
+# block with the agent name, for metrics and the exclude_agents opt-out.
+# Hit, miss and bypass counts, hit ratio, entries and the model time saved go
+# out with the tool metrics (src.tool_metrics, TOOL_METRICS*) as sam_llm_cache_*.
+from __future__ import annotations
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from solace_ai_connector.common.log import log
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 3600.0
+# Request parameters that change the answer (besides model, messages and tools)
+_KEY_PARAMS = (
+    "response_format", "tool_choice", "parallel_tool_calls", "temperature", "top_p", "top_k",
+    "max_tokens", "max_completion_tokens", "stop", "seed", "reasoning_effort", "thinking",
+)
+_CACHEABLE_FINISH = ("stop", "tool_calls")
+_CURRENT_TIME = re.compile(r"Current time [^.\n]*UTC\.")  # added to every instruction by SAM
+_WHITESPACE = re.compile(r"\s+")
+_RESULTS = ("hit_exact", "hit_normalized", "hit_disk", "miss", "bypass")
+
+# -----------------------------
+# Settings
+# -----------------------------
+def _as_bool(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in {"0", "false", "no", "off"}
+    return bool(value)
+
+@dataclass(frozen=True)
+class CacheSettings:
+    enabled: bool = True
+    max_entries: int = DEFAULT_MAX_ENTRIES
+    ttl_seconds: float = DEFAULT_TTL_SECONDS
+    disk_path: Optional[str] = None
+    normalize: bool = True
+    agent: str = "unknown"
+
+    @classmethod
+    def from_config(cls, config: Any) -> "CacheSettings":
+        if not isinstance(config, dict):
+            return cls(enabled=_as_bool(config, False))
+        return cls(
+            enabled=_as_bool(config.get("enabled"), True),
+            max_entries=int(config.get("max_entries") or DEFAULT_MAX_ENTRIES),
+            ttl_seconds=float(config.get("ttl_seconds") or DEFAULT_TTL_SECONDS),
+            disk_path=str(config["disk_path"]) if config.get("disk_path") else None,
+            normalize=_as_bool(config.get("normalize"), True),
+            agent=str(config.get("agent") or "unknown"),
+        )
+
+# -----------------------------
+# Keys
+# -----------------------------
+def _plain(value: Any) -> Any:
+    """LiteLLM messages mix dicts and pydantic objects; turn them into JSON data."""
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if hasattr(value, "model_dump"):
+        return _plain(value.model_dump())
+    return value
+
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", _CURRENT_TIME.sub("Current time <now>.", text)).strip()
+
+def _normalize_arguments(arguments: Any) -> Any:
+    if isinstance(arguments, str):
+        try:
+            return json.loads(arguments)
+        except ValueError:
+            return _normalize_text(arguments)
+    return arguments
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    ids: Dict[str, str] = {}
+
+    def call_id(value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        return ids.setdefault(value, f"call_{len(ids)}")
+
+    normalized = []
+    for message in messages:
+        message = dict(message)
+        content = message.get("content")
+        if isinstance(content, str):
+            message["content"] = _normalize_text(content)
+        elif isinstance(content, list):
+            message["content"] = [
+                {**part, "text": _normalize_text(part["text"])} if isinstance(part.get("text"), str) else part
+                for part in content
+            ]
+        if message.get("tool_calls"):
+            message["tool_calls"] = [
+                {**call, "id": call_id(call.get("id")),
+                 "function": {**call.get("function", {}), "arguments": _normalize_arguments(call.get("function", {}).get("arguments"))}}
+                for call in message["tool_calls"]
+            ]
+        if "tool_call_id" in message:
+            message["tool_call_id"] = call_id(message["tool_call_id"])
+        normalized.append(message)
+    return normalized
+
+def _digest(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def request_keys(model: str, messages: Any, tools: Any, params: Dict[str, Any]) -> Tuple[str, str]:
+    """(exact, normalized) cache keys of a completion request."""
+    messages = _plain(messages) or []
+    tools = _plain(tools) or []
+    relevant = {k: _plain(params[k]) for k in _KEY_PARAMS if params.get(k) is not None}
+    exact = _digest([model, messages, tools, relevant])
+    normalized = _digest([model, normalize_messages(messages), tools, relevant])
+    return exact, normalized
+
+# -----------------------------
+# Store
+# -----------------------------
+class ResponseCache:
+    """LRU/TTL of completed answers with an optional directory of JSON files behind it."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 disk_path: Optional[str] = None):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.stats = {"evictions": 0, "expired": 0, "disk_errors": 0}
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.disk_path:
+            self.disk_path.mkdir(parents=True, exist_ok=True)
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] < time.time():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def _memory_put(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (entry["stored"] + self.ttl_seconds, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _file(self, key: str) -> Path:
+        return self.disk_path / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._file(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self.stats["disk_errors"] += 1
+            return None
+        if entry.get("stored", 0) + self.ttl_seconds < time.time():
+            path.unlink(missing_ok=True)
+            self.stats["expired"] += 1
+            return None
+        return entry
+
+    def _disk_put(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._file(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            self.stats["disk_errors"] += 1
+            log.warning("[llm_cache] Could not write %s: %s", path, e)
+
+    async def get(self, exact: str, normalized: Optional[str]) -> Tuple[Optional[Dict[str, Any]], str]:
+        entry = self._memory_get(exact)
+        if entry is not None:
+            return entry, "hit_exact"
+        if normalized:
+            entry = self._memory_get(normalized)
+            if entry is not None:
+                return entry, "hit_normalized"
+        if self.disk_path:
+            entry = await asyncio.to_thread(self._disk_get, normalized or exact)
+            if entry is not None:
+                self._memory_put(exact, entry)
+                if normalized:
+                    self._memory_put(normalized, entry)
+                return entry, "hit_disk"
+        return None, "miss"
+
+    async def put(self, exact: str, normalized: Optional[str], entry: Dict[str, Any]) -> None:
+        self._memory_put(exact, entry)
+        if normalized:
+            self._memory_put(normalized, entry)
+        if self.disk_path:
+            await asyncio.to_thread(self._disk_put, normalized or exact, entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_CACHES: Dict[Tuple[int, float, Optional[str]], ResponseCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+def cache_for(settings: CacheSettings) -> ResponseCache:
+    key = (settings.max_entries, settings.ttl_seconds, settings.disk_path)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = ResponseCache(settings.max_entries, settings.ttl_seconds, settings.disk_path)
+        return cache
+
+# -----------------------------
+# Responses
+# -----------------------------
+def _entry_from_response(response: Any, seconds: float) -> Optional[Dict[str, Any]]:
+    data = _plain(response)
+    choices = data.get("choices") or []
+    if len(choices) != 1 or choices[0].get("finish_reason") not in _CACHEABLE_FINISH:
+        return None
+    message = choices[0].get("message") or {}
+    calls = [
+        {"name": c["function"]["name"], "arguments": c["function"].get("arguments") or "{}"}
+        for c in message.get("tool_calls") or []
+    ]
+    if not calls and not message.get("content"):
+        return None
+    return {
+        "content": message.get("content"),
+        "tool_calls": calls,
+        "finish_reason": choices[0]["finish_reason"],
+        "usage": data.get("usage"),
+        "seconds": round(seconds, 4),
+        "stored": time.time(),
+    }
+
+def _tool_calls(entry: Dict[str, Any], streaming: bool) -> List[Dict[str, Any]]:
+    calls = []
+    for i, call in enumerate(entry.get("tool_calls") or []):
+        item = {"id": f"call_{uuid.uuid4().hex[:24]}", "type": "function",
+                "function": {"name": call["name"], "arguments": call["arguments"]}}
+        calls.append({**item, "index": i} if streaming else item)
+    return calls
+
+def _model_response(entry: Dict[str, Any], model: str):
+    from litellm import ModelResponse
+
+    message: Dict[str, Any] = {"role": "assistant", "content": entry.get("content")}
+    calls = _tool_calls(entry, streaming=False)
+    if calls:
+        message["tool_calls"] = calls
+    return ModelResponse(
+        id=f"chatcmpl-cache-{uuid.uuid4().hex[:16]}",
+        model=model,
+        choices=[{"index": 0, "message": message, "finish_reason": entry["finish_reason"]}],
+        usage=entry.get("usage") or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    )
+
+async def _replay_stream(entry: Dict[str, Any], model: str) -> AsyncIterator[Any]:
+    from litellm.types.utils import ModelResponseStream
+
+    response_id = f"chatcmpl-cache-{uuid.uuid4().hex[:16]}"
+    delta: Dict[str, Any] = {"role": "assistant", "content": entry.get("content")}
+    calls = _tool_calls(entry, streaming=True)
+    if calls:
+        delta["tool_calls"] = calls
+    yield ModelResponseStream(id=response_id, model=model, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+    final = ModelResponseStream(id=response_id, model=model, choices=[{"index": 0, "delta": {}, "finish_reason": entry["finish_reason"]}])
+    if entry.get("usage"):
+        final.usage = entry["usage"]
+    yield final
+
+async def _recording_stream(stream: Any, messages: Any, on_complete) -> AsyncIterator[Any]:
+    import litellm
+
+    started = time.monotonic()
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        yield chunk
+    try:
+        response = litellm.stream_chunk_builder(chunks, messages=messages)
+    except Exception as e:  # an unusual chunk sequence only costs the cache entry
+        log.debug("[llm_cache] Could not assemble streamed response: %s", e)
+        return
+    if response is not None:
+        await on_complete(response, time.monotonic() - started)
+
+# -----------------------------
+# Metrics
+# -----------------------------
+_COUNTS: Dict[Tuple[str, str, str], int] = {}
+_SAVED_SECONDS: Dict[Tuple[str, str], float] = {}
+_METRICS_LOCK = threading.Lock()
+
+def _count(agent: str, model: str, result: str, saved: float = 0.0) -> None:
+    with _METRICS_LOCK:
+        _COUNTS[(agent, model, result)] = _COUNTS.get((agent, model, result), 0) + 1
+        if saved:
+            _SAVED_SECONDS[(agent, model)] = _SAVED_SECONDS.get((agent, model), 0.0) + saved
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Per agent/model counts by result and hit ratio (of cacheable calls)."""
+    with _METRICS_LOCK:
+        counts = dict(_COUNTS)
+        saved = dict(_SAVED_SECONDS)
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (agent, model, result), n in counts.items():
+        entry = stats.setdefault(f"{agent}/{model}", {r: 0 for r in _RESULTS})
+        entry[result] = n
+    for name, entry in stats.items():
+        hits = entry["hit_exact"] + entry["hit_normalized"] + entry["hit_disk"]
+        lookups = hits + entry["miss"]
+        entry["hit_ratio"] = round(hits / lookups, 4) if lookups else None
+        agent, model = name.split("/", 1)
+        entry["saved_seconds"] = round(saved.get((agent, model), 0.0), 3)
+    return stats
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_metrics() -> List[str]:
+    stats = cache_stats()
+    lines = ["# HELP sam_llm_cache_requests_total LLM calls by response cache result",
+             "# TYPE sam_llm_cache_requests_total counter"]
+    ratio = ["# HELP sam_llm_cache_hit_ratio Cache hits over cacheable LLM calls",
+             "# TYPE sam_llm_cache_hit_ratio gauge"]
+    saved = ["# HELP sam_llm_cache_saved_seconds_total Model latency avoided by cache hits (as recorded on the miss)",
+             "# TYPE sam_llm_cache_saved_seconds_total counter"]
+    for name, entry in sorted(stats.items()):
+        agent, model = name.split("/", 1)
+        labels = f'agent="{_label(agent)}",model="{_label(model)}"'
+        for result in _RESULTS:
+            lines.append(f'sam_llm_cache_requests_total{{{labels},result="{result}"}} {entry[result]}')
+        if entry["hit_ratio"] is not None:
+            ratio.append(f"sam_llm_cache_hit_ratio{{{labels}}} {entry['hit_ratio']:g}")
+        saved.append(f"sam_llm_cache_saved_seconds_total{{{labels}}} {entry['saved_seconds']:g}")
+    store = ["# HELP sam_llm_cache_entries Entries in the in-memory response cache",
+             "# TYPE sam_llm_cache_entries gauge",
+             "# HELP sam_llm_cache_evictions_total Entries dropped by the LRU bound",
+             "# TYPE sam_llm_cache_evictions_total counter"]
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+    for i, cache in enumerate(caches):
+        store.append(f'sam_llm_cache_entries{{cache="{i}"}} {len(cache)}')
+        store.append(f'sam_llm_cache_evictions_total{{cache="{i}"}} {cache.stats["evictions"]}')
+    return lines + ratio + saved + store
+
+# -----------------------------
+# LiteLLM integration
+# -----------------------------
+async def cached_completion(call, model: str, messages: Any, tools: Any, settings: CacheSettings, **kwargs):
+    """Answer from the cache or run `call(model, messages, tools, **kwargs)` and store the answer."""
+    if not settings.enabled or (kwargs.get("n") or 1) > 1:
+        _count(settings.agent, model, "bypass")
+        return await call(model, messages, tools, **kwargs)
+    cache = cache_for(settings)
+    exact, normalized = request_keys(model, messages, tools, kwargs)
+    normalized = normalized if settings.normalize else None
+    entry, result = await cache.get(exact, normalized)
+    if entry is not None:
+        _count(settings.agent, model, result, entry.get("seconds") or 0.0)
+        log.debug("[llm_cache] %s %s for %s", result, (normalized or exact)[:12], settings.agent)
+        return _replay_stream(entry, model) if kwargs.get("stream") else _model_response(entry, model)
+    _count(settings.agent, model, "miss")
+
+    async def store(response: Any, seconds: float) -> None:
+        stored = _entry_from_response(response, seconds)
+        if stored is not None:
+            await cache.put(exact, normalized, stored)
+
+    started = time.monotonic()
+    response = await call(model, messages, tools, **kwargs)
+    if kwargs.get("stream"):
+        return _recording_stream(response, messages, store)
+    await store(response, time.monotonic() - started)
+    return response
+
+def _tag_model_config(host_component) -> None:
+    model_config = host_component.get_config("model")
+    if not isinstance(model_config, dict) or "response_cache" not in model_config:
+        return
+    config = model_config["response_cache"]
+    config = copy.deepcopy(config) if isinstance(config, dict) else {"enabled": _as_bool(config, False)}
+    agent = host_component.get_config("agent_name") or "unknown"
+    excluded = config.pop("exclude_agents", None) or ""
+    if isinstance(excluded, str):
+        excluded = [name.strip() for name in excluded.split(",")]
+    if agent in excluded:
+        config["enabled"] = False
+    config["agent"] = agent
+    # The dict is the agent's own (SAM adds its retry defaults to it the same way)
+    model_config["response_cache"] = config
+    if _as_bool(config.get("enabled"), True):
+        log.info("[llm_cache] Response cache on for %s (%s entries, ttl %ss, disk %s)", agent,
+                 config.get("max_entries"), config.get("ttl_seconds"), config.get("disk_path") or "off")
+
+def install_response_cache(host_component) -> None:
+    """agent_init_function part: wrap LiteLLM calls once per process, tag this agent's settings."""
+    from solace_agent_mesh.agent.adk.models.lite_llm import LiteLLMClient
+
+    _tag_model_config(host_component)
+    original = LiteLLMClient.acompletion
+    if getattr(original, "_response_cache", False):
+        return
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        config = kwargs.pop("response_cache", None)
+        if config is None:
+            return await original(self, model, messages, tools, **kwargs)
+
+        async def call(model, messages, tools, **kwargs):
+            return await original(self, model, messages, tools, **kwargs)
+
+        return await cached_completion(call, model, messages, tools, CacheSettings.from_config(config), **kwargs)
+
+    acompletion._response_cache = True
+    LiteLLMClient.acompletion = acompletion
+
+    from src.tool_metrics import register_collector
+
+    register_collector(render_metrics)
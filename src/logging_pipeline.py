@@ -0,0 +1,342 @@
+# Asynchronous, sampled logging pipeline
+#
+# configs/logging_config.ini sends DEBUG from the root, LiteLLM,
+# solace_ai_connector and uvicorn loggers straight to stdout and a rotating
+# file, so every record costs a formatted write (and now and then a rollover)
+# on the thread that logged it, which is usually the event loop.
+# `install_logging_pipeline` rewires the loggers that are already configured:
+#
+#   - their handlers move behind one QueueHandler per handler set and are
+#     drained by a QueueListener thread, so callers only enqueue the record
+#   - a shared filter rate-limits or samples low-level records per logger
+#     before they are queued (LOG_SAMPLING)
+#   - file handlers (or all handlers) can switch to a compact JSON formatter
+#     (LOG_JSON)
+#
+# LOG_SAMPLING rules are separated by ";": <logger>[@LEVEL]=rate:<n>/s keeps at
+# most n records per second, <logger>[@LEVEL]=sample:<n> keeps one record in n.
+# A rule covers the logger and its children, for records at LEVEL (default
+# DEBUG) and below; warnings and errors are never dropped unless LEVEL says so.
+#
+#   python -m src.logging_pipeline --calls 2000     # tool-call latency with and without it
+from __future__ import annotations
+import argparse
+import asyncio
+import atexit
+import contextlib
+import copy
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_LOGGING_CONFIG = REPO_ROOT / "configs" / "logging_config.ini"
+DEFAULT_SAMPLING = "LiteLLM=rate:50/s; solace_ai_connector=sample:10; uvicorn=rate:20/s"
+
+_LOCK = threading.Lock()
+_LISTENERS: List[logging.handlers.QueueListener] = []
+_REWIRED: List[Tuple[logging.Logger, List[logging.Handler], logging.Handler]] = []
+
+def pipeline_enabled() -> bool:
+    return os.environ.get("LOG_PIPELINE", "true").lower() not in {"0", "false", "no"}
+
+# -----------------------------
+# Sampling and rate limiting
+# -----------------------------
+class _Rule:
+    __slots__ = ("prefix", "max_level", "rate", "every", "tokens", "last", "counter", "dropped")
+
+    def __init__(self, prefix: str, max_level: int, rate: Optional[float] = None, every: Optional[int] = None):
+        self.prefix = prefix
+        self.max_level = max_level
+        self.rate = rate
+        self.every = every
+        self.tokens = rate or 0.0
+        self.last = time.monotonic()
+        self.counter = 0
+        self.dropped = 0
+
+    def matches(self, name: str) -> bool:
+        return self.prefix in ("", "root") or name == self.prefix or name.startswith(self.prefix + ".")
+
+    def allow(self) -> bool:
+        if self.every:
+            self.counter += 1
+            return self.counter % self.every == 1 or self.every == 1
+        # Token bucket holding at most one second worth of records
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+def parse_sampling_rules(spec: str) -> List[_Rule]:
+    """Parse a LOG_SAMPLING string into rules, most specific logger first."""
+    rules: List[_Rule] = []
+    for part in (spec or "").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        target, _, policy = part.partition("=")
+        name, _, level = target.strip().partition("@")
+        max_level = logging.getLevelName(level.strip().upper() or "DEBUG")
+        if not isinstance(max_level, int):
+            raise ValueError(f"Unknown level '{level}' in sampling rule '{part}'")
+        kind, _, amount = policy.strip().partition(":")
+        try:
+            if kind == "rate":
+                rules.append(_Rule(name.strip(), max_level, rate=float(amount.removesuffix("/s"))))
+            elif kind == "sample":
+                rules.append(_Rule(name.strip(), max_level, every=max(1, int(amount))))
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"Sampling rule '{part}' must look like 'logger=rate:<n>/s' or 'logger=sample:<n>'")
+    return sorted(rules, key=lambda r: len(r.prefix), reverse=True)
+
+class SamplingFilter(logging.Filter):
+    """Drop low-level records of noisy loggers according to per-logger rules.
+
+    The first record let through after some were dropped carries the count in
+    `record.suppressed`.
+    """
+
+    def __init__(self, rules: List[_Rule]):
+        super().__init__()
+        self.rules = rules
+        self.dropped_total = 0
+        self._by_logger: Dict[str, Optional[_Rule]] = {}
+        self._lock = threading.Lock()
+
+    def _rule_for(self, name: str) -> Optional[_Rule]:
+        try:
+            return self._by_logger[name]
+        except KeyError:
+            rule = next((r for r in self.rules if r.matches(name)), None)
+            self._by_logger[name] = rule
+            return rule
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rule = self._rule_for(record.name)
+        if rule is None or record.levelno > rule.max_level:
+            return True
+        with self._lock:
+            if not rule.allow():
+                rule.dropped += 1
+                self.dropped_total += 1
+                return False
+            if rule.dropped:
+                record.suppressed = rule.dropped
+                rule.dropped = 0
+        return True
+
+# -----------------------------
+# Formatting
+# -----------------------------
+class CompactJsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus exc/suppressed when present."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+_EXC_FORMATTER = logging.Formatter()
+
+class _PipelineQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like QueueHandler.prepare (message merged, nothing unpicklable left), but the
+        # traceback stays in exc_text so the target formatter can place it
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            record.message = f"{record.message} [{suppressed} similar records suppressed]"
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+# -----------------------------
+# Installation
+# -----------------------------
+def _configured_loggers() -> List[logging.Logger]:
+    loggers = [logging.getLogger()]
+    loggers += [l for l in list(logging.Logger.manager.loggerDict.values()) if isinstance(l, logging.Logger)]
+    return [l for l in loggers if l.handlers]
+
+def install_logging_pipeline(sampling: Optional[str] = None, json_targets: Optional[str] = None) -> Dict[str, Any]:
+    """Move the handlers of all configured loggers behind queue handlers (idempotent).
+
+    Args:
+        sampling: LOG_SAMPLING-style rules; read from the environment when None
+        json_targets: "none", "file" or "all"; LOG_JSON when None
+    """
+    with _LOCK:
+        if _LISTENERS:
+            return {"installed": True, "already_installed": True}
+        if not pipeline_enabled():
+            return {"installed": False}
+        rules = parse_sampling_rules(os.environ.get("LOG_SAMPLING", DEFAULT_SAMPLING) if sampling is None else sampling)
+        json_targets = (json_targets or os.environ.get("LOG_JSON", "none")).lower()
+        sampling_filter = SamplingFilter(rules) if rules else None
+
+        queue_handlers: Dict[Tuple[int, ...], logging.Handler] = {}
+        targets_seen: Dict[int, logging.Handler] = {}
+        for logger in _configured_loggers():
+            targets = [h for h in logger.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+            if not targets:
+                continue
+            key = tuple(id(h) for h in targets)
+            queue_handler = queue_handlers.get(key)
+            if queue_handler is None:
+                records: queue.SimpleQueue = queue.SimpleQueue()
+                queue_handler = _PipelineQueueHandler(records)
+                # Records no target would write are dropped before they are copied and queued
+                queue_handler.setLevel(min(h.level for h in targets))
+                if sampling_filter is not None:
+                    queue_handler.addFilter(sampling_filter)
+                listener = logging.handlers.QueueListener(records, *targets, respect_handler_level=True)
+                listener.start()
+                _LISTENERS.append(listener)
+                queue_handlers[key] = queue_handler
+            for handler in targets:
+                logger.removeHandler(handler)
+                targets_seen[id(handler)] = handler
+            logger.addHandler(queue_handler)
+            _REWIRED.append((logger, targets, queue_handler))
+
+        if json_targets in ("file", "all"):
+            for handler in targets_seen.values():
+                if json_targets == "all" or isinstance(handler, logging.FileHandler):
+                    handler.setFormatter(CompactJsonFormatter())
+
+        atexit.register(stop_logging_pipeline)
+        summary = {
+            "installed": True,
+            "loggers": len(_REWIRED),
+            "queues": len(_LISTENERS),
+            "sampling_rules": len(rules),
+            "json": json_targets,
+        }
+    logging.getLogger(__name__).info("[logging_pipeline] Installed: %s", summary)
+    return summary
+
+def stop_logging_pipeline(restore: bool = False) -> None:
+    """Flush and stop the listener threads; with restore, put the original handlers back."""
+    with _LOCK:
+        if restore:
+            for logger, targets, queue_handler in _REWIRED:
+                logger.removeHandler(queue_handler)
+                for handler in targets:
+                    logger.addHandler(handler)
+        for listener in _LISTENERS:
+            with contextlib.suppress(Exception):
+                listener.stop()
+        _LISTENERS.clear()
+        _REWIRED.clear()
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+CHATTER_LOGGERS = ("LiteLLM", "solace_ai_connector.flow", "uvicorn")
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def _time_tool_calls(calls: int, chatter: int, idle_ms: float) -> List[float]:
+    from src.architect_agent.tools import create_architecture_diagram
+
+    chatter_logs = [logging.getLogger(name) for name in CHATTER_LOGGERS]
+    latencies: List[float] = []
+    for i in range(calls):
+        started = time.perf_counter()
+        # The DEBUG records LiteLLM and the connector emit around a real tool call
+        for n in range(chatter):
+            chatter_logs[n % len(chatter_logs)].debug("call %d step %d payload=%s", i, n, {"tokens": n, "ok": True})
+        await create_architecture_diagram("Order tracking with payments", "microservices", "large")
+        latencies.append((time.perf_counter() - started) * 1e6)
+        # Real calls are separated by LLM round trips; the listener drains the queue meanwhile
+        await asyncio.sleep(idle_ms / 1000.0)
+    return latencies
+
+def run_benchmark(config_path: Path, calls: int, chatter: int, sampling: str, idle_ms: float = 2.0) -> List[Dict[str, Any]]:
+    """Tool-call latency under the INI config as is, with the queue, and with queue + sampling."""
+    results = []
+    modes = [("sync", None), ("queued", ""), ("queued+sampled", sampling)]
+    for mode, rules in modes:
+        with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as devnull:
+            cwd, stdout = os.getcwd(), sys.stdout
+            os.chdir(workdir)  # the INI's file handler writes sam.log relative to cwd
+            sys.stdout = devnull
+            try:
+                logging.config.fileConfig(str(config_path), disable_existing_loggers=False)
+                if rules is not None:
+                    install_logging_pipeline(sampling=rules, json_targets="none")
+                asyncio.run(_time_tool_calls(min(50, calls), chatter, idle_ms))  # warm-up
+                latencies = asyncio.run(_time_tool_calls(calls, chatter, idle_ms))
+                stop_logging_pipeline(restore=True)
+                logging.shutdown()
+                written = sum(p.stat().st_size for p in Path(workdir).glob("sam.log*"))
+            finally:
+                sys.stdout = stdout
+                os.chdir(cwd)
+        results.append({
+            "mode": mode,
+            "calls": calls,
+            "records_per_call": chatter + 1,
+            "p50_us": round(_percentile(latencies, 0.50), 1),
+            "p95_us": round(_percentile(latencies, 0.95), 1),
+            "p99_us": round(_percentile(latencies, 0.99), 1),
+            "mean_us": round(statistics.fmean(latencies), 1),
+            "log_bytes": written,
+        })
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tool-call latency with and without the logging pipeline")
+    parser.add_argument("--config", default=str(DEFAULT_LOGGING_CONFIG), help="Logging INI file")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--chatter", type=int, default=20, help="DEBUG records logged around each call")
+    parser.add_argument("--idle-ms", type=float, default=2.0, help="Pause between calls, standing in for the LLM round trip")
+    parser.add_argument("--sampling", default=DEFAULT_SAMPLING, help="LOG_SAMPLING rules for the sampled run")
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(REPO_ROOT))
+    results = run_benchmark(Path(args.config).resolve(), args.calls, args.chatter, args.sampling, args.idle_ms)
+    print(f"{'mode':<16}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'mean us':>10}{'log bytes':>12}")
+    for r in results:
+        print(f"{r['mode']:<16}{r['p50_us']:>10}{r['p95_us']:>10}{r['p99_us']:>10}{r['mean_us']:>10}{r['log_bytes']:>12}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
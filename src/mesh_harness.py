@@ -0,0 +1,546 @@
+# In-process broker harness and load driver for the agent mesh
+#
+# Load-testing the gateway -> orchestrator -> agent -> tool path normally needs
+# a Solace broker at SOLACE_BROKER_URL. This module stands in for it. It has
+# three parts:
+#
+#   FakeBroker   publish/subscribe with Solace topic wildcards ("*" matches one
+#                level, ">" the rest). A topic trie finds the subscribers, and
+#                every subscription is a queue drained by its own consumer.
+#                Payloads are JSON-encoded on publish and decoded on delivery,
+#                as on the wire.
+#   ToolAgent    stand-in for one SAM agent app: the agent_name and python tools
+#                from its configs/agents/*.yaml, subscribed to
+#                <namespace>/a2a/v1/agent/request/<Agent>.
+#   LoadGateway  sends JSON-RPC message/send requests with the replyTo /
+#                a2aStatusTopic user properties SAM's gateways set, and
+#                correlates the status updates and final responses it gets
+#                back on its gateway/status and gateway/response topics.
+#
+# A request names the tool (and, via the orchestrator, the peer agent) in a
+# DataPart. The orchestrator stand-in delegates it as a sub-task over the
+# agent/request, agent/status and agent/response topics, as SAM's peer-agent
+# tool does. Agents run no LLM turns here, so the numbers are the messaging,
+# serialization and tool cost of each hop.
+#
+#   python -m src.mesh_harness                                # 2000 tasks, 200 in flight
+#   python -m src.mesh_harness --tasks 10000 --concurrency 1000 --only architect
+#   python -m src.mesh_harness --direct --size 1000           # skip the orchestrator hop
+#
+# Tool arguments come from the benchmark cases in src/tool_benchmark.py. The
+# scaffolder is left out by default because its tools write modules to disk.
+from __future__ import annotations
+import argparse
+import asyncio
+import glob
+import importlib
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.startup_profiler import parse_config
+from src.tool_benchmark import CASES, Run, StubToolContext, isolate_environment
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CONFIG_GLOB = "configs/agents/*.yaml"
+DEFAULT_EXCLUDED_CONFIGS = ("agent_scaffolder.yaml",)
+ORCHESTRATOR_NAME = "OrchestratorAgent"
+GATEWAY_ID = "loadgen"
+# Argument sets pre-built per tool; tasks cycle through them
+ARG_VARIANTS = 8
+
+Handler = Callable[[str, Dict[str, Any], Dict[str, Any]], Awaitable[None]]
+
+# -----------------------------
+# Topic layout (same as solace_agent_mesh.common.a2a.protocol)
+# -----------------------------
+def a2a_base_topic(namespace: str) -> str:
+    return f"{namespace.rstrip('/')}/a2a/v1"
+
+def agent_request_topic(namespace: str, agent_name: str) -> str:
+    return f"{a2a_base_topic(namespace)}/agent/request/{agent_name}"
+
+def gateway_status_topic(namespace: str, gateway_id: str, task_id: str) -> str:
+    return f"{a2a_base_topic(namespace)}/gateway/status/{gateway_id}/{task_id}"
+
+def gateway_response_topic(namespace: str, gateway_id: str, task_id: str) -> str:
+    return f"{a2a_base_topic(namespace)}/gateway/response/{gateway_id}/{task_id}"
+
+def peer_agent_status_topic(namespace: str, delegating_agent: str, sub_task_id: str) -> str:
+    return f"{a2a_base_topic(namespace)}/agent/status/{delegating_agent}/{sub_task_id}"
+
+def agent_response_topic(namespace: str, delegating_agent: str, sub_task_id: str) -> str:
+    return f"{a2a_base_topic(namespace)}/agent/response/{delegating_agent}/{sub_task_id}"
+
+def _send_request(task_id: str, data: Dict[str, Any], target: str) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": task_id,
+        "method": "message/send",
+        "params": {
+            "message": {
+                "kind": "message",
+                "role": "user",
+                "messageId": uuid.uuid4().hex,
+                "contextId": task_id,
+                "parts": [{"kind": "data", "data": data}],
+                "metadata": {"agent_name": target},
+            }
+        },
+    }
+
+def _status_update(task_id: str, state: str) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": task_id,
+        "result": {"kind": "status-update", "taskId": task_id, "contextId": task_id, "status": {"state": state}, "final": False},
+    }
+
+def _task_result(task_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    failed = not isinstance(result, dict) or result.get("status") == "error"
+    return {
+        "jsonrpc": "2.0",
+        "id": task_id,
+        "result": {
+            "kind": "task",
+            "id": task_id,
+            "contextId": task_id,
+            "status": {"state": "failed" if failed else "completed"},
+            "artifacts": [{"artifactId": task_id, "parts": [{"kind": "data", "data": result}]}],
+        },
+    }
+
+def _error_response(task_id: str, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": task_id, "error": {"code": code, "message": message}}
+
+# -----------------------------
+# Broker
+# -----------------------------
+class _Node:
+    __slots__ = ("children", "star", "rest", "subscribers")
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        self.star: Optional[_Node] = None
+        self.rest: List[_Subscription] = []  # ">" at this level
+        self.subscribers: List[_Subscription] = []
+
+@dataclass(eq=False)
+class _Subscription:
+    pattern: str
+    handler: Handler
+    queue: "asyncio.Queue[Tuple[str, bytes, Dict[str, Any]]]" = field(default_factory=asyncio.Queue)
+    consumer: Optional[asyncio.Task] = None
+    max_depth: int = 0
+
+class FakeBroker:
+    """In-process publish/subscribe with Solace topic wildcards."""
+
+    def __init__(self):
+        self._root = _Node()
+        self._subscriptions: List[_Subscription] = []
+        self.published = 0
+        self.delivered = 0
+        self.unrouted = 0
+
+    def subscribe(self, pattern: str, handler: Handler) -> _Subscription:
+        node = self._root
+        levels = pattern.split("/")
+        for i, level in enumerate(levels):
+            if level == ">" and i == len(levels) - 1:
+                sub = _Subscription(pattern, handler)
+                node.rest.append(sub)
+                break
+            if level == "*":
+                node.star = node.star or _Node()
+                node = node.star
+            else:
+                node = node.children.setdefault(level, _Node())
+        else:
+            sub = _Subscription(pattern, handler)
+            node.subscribers.append(sub)
+        sub.consumer = asyncio.get_running_loop().create_task(self._consume(sub))
+        self._subscriptions.append(sub)
+        return sub
+
+    def _match(self, levels: List[str]) -> List[_Subscription]:
+        matched: List[_Subscription] = []
+        frontier = [self._root]
+        for i, level in enumerate(levels):
+            next_frontier = []
+            for node in frontier:
+                if node.rest:  # ">" needs at least one more level
+                    matched.extend(node.rest)
+                child = node.children.get(level)
+                if child is not None:
+                    next_frontier.append(child)
+                if node.star is not None:
+                    next_frontier.append(node.star)
+            frontier = next_frontier
+            if not frontier:
+                break
+        else:
+            for node in frontier:
+                matched.extend(node.subscribers)
+        return matched
+
+    def publish(self, topic: str, payload: Dict[str, Any], user_properties: Optional[Dict[str, Any]] = None) -> None:
+        self.published += 1
+        subscriptions = self._match(topic.split("/"))
+        if not subscriptions:
+            self.unrouted += 1
+            return
+        data = json.dumps(payload).encode("utf-8")
+        props = dict(user_properties or {})
+        for sub in subscriptions:
+            sub.queue.put_nowait((topic, data, props))
+            depth = sub.queue.qsize()
+            if depth > sub.max_depth:
+                sub.max_depth = depth
+
+    async def _consume(self, sub: _Subscription) -> None:
+        while True:
+            topic, data, props = await sub.queue.get()
+            self.delivered += 1
+            try:
+                await sub.handler(topic, json.loads(data), props)
+            except Exception as e:
+                print(f"[mesh_harness] Handler for '{sub.pattern}' failed: {type(e).__name__}: {e}", file=sys.stderr)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "published": self.published,
+            "delivered": self.delivered,
+            "unrouted": self.unrouted,
+            "max_queue_depth": {s.pattern: s.max_depth for s in self._subscriptions},
+        }
+
+    async def close(self) -> None:
+        for sub in self._subscriptions:
+            sub.consumer.cancel()
+        await asyncio.gather(*(s.consumer for s in self._subscriptions), return_exceptions=True)
+
+# -----------------------------
+# Agent and gateway stand-ins
+# -----------------------------
+class ToolAgent:
+    """Runs the python tool named in each request, like a SAM agent's tool call."""
+
+    def __init__(self, broker: FakeBroker, namespace: str, name: str,
+                 tools: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]], tool_context: Any, max_in_flight: int):
+        self.broker = broker
+        self.namespace = namespace
+        self.name = name
+        self.tools = tools
+        self.tool_context = tool_context
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        self._running: set = set()
+
+    def start(self) -> None:
+        self.broker.subscribe(agent_request_topic(self.namespace, self.name), self._on_request)
+
+    async def _on_request(self, topic: str, message: Dict[str, Any], props: Dict[str, Any]) -> None:
+        # Tasks run concurrently up to max_in_flight; the request queue keeps draining
+        await self._slots.acquire()
+        task = asyncio.get_running_loop().create_task(self._run(message, props))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, message: Dict[str, Any], props: Dict[str, Any]) -> None:
+        try:
+            task_id = message["id"]
+            data = message["params"]["message"]["parts"][0]["data"]
+            if props.get("a2aStatusTopic"):
+                self.broker.publish(props["a2aStatusTopic"], _status_update(task_id, "working"))
+            response = await self.handle(task_id, data)
+            self.broker.publish(props["replyTo"], response)
+        finally:
+            self._slots.release()
+
+    async def handle(self, task_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        tool = self.tools.get(data.get("tool"))
+        if tool is None:
+            return _error_response(task_id, -32601, f"{self.name} has no tool '{data.get('tool')}'")
+        try:
+            result = await tool(**data.get("args", {}), tool_context=self.tool_context)
+        except Exception as e:
+            result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        return _task_result(task_id, result)
+
+class OrchestratorAgent(ToolAgent):
+    """Delegates requests that name a peer agent as sub-tasks over the peer topics."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def start(self) -> None:
+        super().start()
+        base = a2a_base_topic(self.namespace)
+        self.broker.subscribe(f"{base}/agent/response/{self.name}/>", self._on_peer_response)
+        self.broker.subscribe(f"{base}/agent/status/{self.name}/>", self._on_peer_status)
+
+    async def handle(self, task_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        peer = data.get("agent")
+        if not peer or peer == self.name:
+            return await super().handle(task_id, data)
+        sub_task_id = f"{task_id}:{uuid.uuid4().hex[:8]}"
+        future = asyncio.get_running_loop().create_future()
+        self._pending[sub_task_id] = future
+        self.broker.publish(
+            agent_request_topic(self.namespace, peer),
+            _send_request(sub_task_id, {"tool": data["tool"], "args": data.get("args", {})}, peer),
+            {
+                "clientId": self.name,
+                "userId": "load-user",
+                "replyTo": agent_response_topic(self.namespace, self.name, sub_task_id),
+                "a2aStatusTopic": peer_agent_status_topic(self.namespace, self.name, sub_task_id),
+            },
+        )
+        peer_response = await future
+        peer_response["id"] = task_id
+        if "result" in peer_response:
+            peer_response["result"]["id"] = task_id
+        return peer_response
+
+    async def _on_peer_response(self, topic: str, message: Dict[str, Any], props: Dict[str, Any]) -> None:
+        future = self._pending.pop(message.get("id"), None)
+        if future is not None and not future.done():
+            future.set_result(message)
+
+    async def _on_peer_status(self, topic: str, message: Dict[str, Any], props: Dict[str, Any]) -> None:
+        pass  # SAM forwards these to the gateway; the end-to-end latency does not depend on them
+
+class LoadGateway:
+    """Sends tasks and waits for their final response, timing each one."""
+
+    def __init__(self, broker: FakeBroker, namespace: str, gateway_id: str = GATEWAY_ID):
+        self.broker = broker
+        self.namespace = namespace
+        self.gateway_id = gateway_id
+        self._pending: Dict[str, Tuple[asyncio.Future, float, List[float]]] = {}
+
+    def start(self) -> None:
+        base = a2a_base_topic(self.namespace)
+        self.broker.subscribe(f"{base}/gateway/response/{self.gateway_id}/>", self._on_response)
+        self.broker.subscribe(f"{base}/gateway/status/{self.gateway_id}/>", self._on_status)
+
+    async def send(self, target: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], float, Optional[float]]:
+        """Returns the response, its latency and the time to the first status update (seconds)."""
+        task_id = f"gdk-task-{uuid.uuid4().hex}"
+        future = asyncio.get_running_loop().create_future()
+        first_status: List[float] = []
+        started = time.perf_counter()
+        self._pending[task_id] = (future, started, first_status)
+        self.broker.publish(
+            agent_request_topic(self.namespace, target),
+            _send_request(task_id, data, target),
+            {
+                "clientId": self.gateway_id,
+                "userId": "load-user",
+                "replyTo": gateway_response_topic(self.namespace, self.gateway_id, task_id),
+                "a2aStatusTopic": gateway_status_topic(self.namespace, self.gateway_id, task_id),
+            },
+        )
+        response = await future
+        return response, time.perf_counter() - started, first_status[0] if first_status else None
+
+    async def _on_response(self, topic: str, message: Dict[str, Any], props: Dict[str, Any]) -> None:
+        entry = self._pending.pop(message.get("id"), None)
+        if entry is not None and not entry[0].done():
+            entry[0].set_result(message)
+
+    async def _on_status(self, topic: str, message: Dict[str, Any], props: Dict[str, Any]) -> None:
+        entry = self._pending.get(message.get("id"))
+        if entry is not None and not entry[2]:
+            entry[2].append(time.perf_counter() - entry[1])
+
+# -----------------------------
+# Mesh assembly and workload
+# -----------------------------
+@dataclass
+class AgentSpec:
+    name: str
+    namespace: str
+    tools: Dict[str, Tuple[str, str]]  # function name -> (module, function)
+
+def load_agent_specs(paths: List[Path]) -> List[AgentSpec]:
+    specs = []
+    for path in paths:
+        config, _ = parse_config(path)
+        for app in config.get("apps") or []:
+            app_config = app.get("app_config") or {}
+            if not app_config.get("agent_name"):
+                continue
+            tools = {
+                t["function_name"]: (t["component_module"], t["function_name"])
+                for t in app_config.get("tools") or []
+                if isinstance(t, dict) and t.get("tool_type") == "python" and t.get("component_module")
+            }
+            specs.append(AgentSpec(app_config["agent_name"], str(app_config.get("namespace") or ""), tools))
+    return specs
+
+@dataclass
+class WorkItem:
+    agent: str
+    tool: str
+    arg_sets: List[Dict[str, Any]]
+
+async def build_workload(specs: List[AgentSpec], only: Optional[List[str]], size: int,
+                         tool_context: StubToolContext) -> List[WorkItem]:
+    """Pre-built argument sets for every tool that has a benchmark case (not timed)."""
+    by_module_tool = {(module, fn): spec.name for spec in specs for module, fn in spec.tools.values()}
+    workload = []
+    for case in CASES:
+        agent = by_module_tool.get((f"src.{case.agent}.tools", case.tool))
+        if agent is None or (only and not any(o in f"{agent}/{case.tool}" or o in case.name for o in only)):
+            continue
+        arg_sets = []
+        for i in range(ARG_VARIANTS):
+            run = Run(tool_context=tool_context, n=size, rng=random.Random(f"{case.name}:{size}:{i}"), tag=f"load_{case.tool}_{i}")
+            arg_sets.append(await case.setup(run))
+        workload.append(WorkItem(agent, case.tool, arg_sets))
+    return workload
+
+def _resolve_tools(spec: AgentSpec) -> Dict[str, Callable[..., Awaitable[Dict[str, Any]]]]:
+    return {name: getattr(importlib.import_module(module), fn) for name, (module, fn) in spec.tools.items()}
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(values)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000.0, 3)
+
+    return {"p50_ms": at(0.5), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": round(ordered[-1] * 1000.0, 3)}
+
+async def run_load(specs: List[AgentSpec], tasks: int, concurrency: int, size: int, direct: bool,
+                   only: Optional[List[str]], max_in_flight: int, scratch: Path) -> Dict[str, Any]:
+    broker = FakeBroker()
+    tool_context = StubToolContext(scratch / "scaffold")
+    namespace = next((s.namespace for s in specs if s.namespace), "unslop")
+    agents: Dict[str, ToolAgent] = {}
+    for spec in specs:
+        cls = OrchestratorAgent if spec.name == ORCHESTRATOR_NAME else ToolAgent
+        agents[spec.name] = cls(broker, namespace, spec.name, _resolve_tools(spec), tool_context, max_in_flight)
+        agents[spec.name].start()
+    gateway = LoadGateway(broker, namespace)
+    gateway.start()
+
+    workload = await build_workload(specs, only, size, tool_context)
+    if not workload:
+        await broker.close()
+        raise ValueError("No tool of the selected agents matches the workload")
+    via_orchestrator = not direct and ORCHESTRATOR_NAME in agents
+
+    latencies: List[float] = []
+    first_status: List[float] = []
+    per_tool: Dict[str, List[float]] = {}
+    failures: Dict[str, int] = {}
+    slots = asyncio.Semaphore(max(1, concurrency))
+    schedule = itertools.cycle(workload)
+
+    async def one(item: WorkItem, i: int) -> None:
+        args = item.arg_sets[i % len(item.arg_sets)]
+        if via_orchestrator and item.agent != ORCHESTRATOR_NAME:
+            target, data = ORCHESTRATOR_NAME, {"agent": item.agent, "tool": item.tool, "args": args}
+        else:
+            target, data = item.agent, {"tool": item.tool, "args": args}
+        try:
+            response, elapsed, status_after = await gateway.send(target, data)
+        finally:
+            slots.release()
+        key = f"{item.agent}/{item.tool}"
+        latencies.append(elapsed)
+        per_tool.setdefault(key, []).append(elapsed)
+        if status_after is not None:
+            first_status.append(status_after)
+        state = (response.get("result") or {}).get("status", {}).get("state") if "result" in response else "error"
+        if state != "completed":
+            failures[key] = failures.get(key, 0) + 1
+
+    started = time.perf_counter()
+    pending = []
+    for i in range(tasks):
+        await slots.acquire()
+        pending.append(asyncio.get_running_loop().create_task(one(next(schedule), i)))
+    await asyncio.gather(*pending)
+    wall = time.perf_counter() - started
+    await broker.close()
+
+    return {
+        "tasks": tasks,
+        "concurrency": concurrency,
+        "input_size": size,
+        "route": "direct" if not via_orchestrator else f"via {ORCHESTRATOR_NAME}",
+        "wall_seconds": round(wall, 3),
+        "throughput_per_s": round(tasks / wall, 1) if wall else None,
+        "latency": _percentiles(latencies),
+        "first_status": _percentiles(first_status),
+        "failed": sum(failures.values()),
+        "per_tool": {
+            key: {"tasks": len(values), "failed": failures.get(key, 0), **_percentiles(values)}
+            for key, values in sorted(per_tool.items())
+        },
+        "broker": broker.stats(),
+    }
+
+def format_report(report: Dict[str, Any]) -> str:
+    lat = report["latency"]
+    lines = [
+        f"{report['tasks']} tasks, {report['concurrency']} in flight, input size {report['input_size']}, {report['route']}",
+        f"wall {report['wall_seconds']:.2f}s  throughput {report['throughput_per_s']} tasks/s  failed {report['failed']}",
+        f"latency ms  p50 {lat['p50_ms']}  p95 {lat['p95_ms']}  p99 {lat['p99_ms']}  max {lat['max_ms']}",
+        f"first status ms  p50 {report['first_status']['p50_ms']}  p95 {report['first_status']['p95_ms']}",
+        f"broker      published {report['broker']['published']}  delivered {report['broker']['delivered']}  unrouted {report['broker']['unrouted']}",
+        "",
+        f"{'tool':<52}{'tasks':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'failed':>8}",
+    ]
+    for key, entry in report["per_tool"].items():
+        lines.append(f"{key:<52}{entry['tasks']:>8}{entry['p50_ms']:>10}{entry['p95_ms']:>10}{entry['p99_ms']:>10}{entry['failed']:>8}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the agent mesh over an in-process broker")
+    parser.add_argument("configs", nargs="*", help=f"Agent configs (default: {DEFAULT_CONFIG_GLOB} without the scaffolder)")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200, help="Tasks in flight at the gateway")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Concurrent tasks per agent")
+    parser.add_argument("--size", type=int, default=10, help="Input size of the tool arguments (see src.tool_benchmark)")
+    parser.add_argument("--only", action="append", help="Only tools whose agent/tool name contains this (repeatable)")
+    parser.add_argument("--direct", action="store_true", help=f"Send to the agents directly instead of via {ORCHESTRATOR_NAME}")
+    parser.add_argument("--output", help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("NAMESPACE", "unslop")
+    paths = [Path(p) for p in args.configs] or [
+        Path(p) for p in sorted(glob.glob(str(REPO_ROOT / DEFAULT_CONFIG_GLOB)))
+        if Path(p).name not in DEFAULT_EXCLUDED_CONFIGS
+    ]
+    scratch = Path(tempfile.mkdtemp(prefix="mesh_harness_"))
+    try:
+        isolate_environment(scratch)
+        specs = load_agent_specs(paths)
+        report = asyncio.run(run_load(
+            specs, args.tasks, args.concurrency, args.size, args.direct, args.only, args.max_in_flight, scratch,
+        ))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(format_report(report))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
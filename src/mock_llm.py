@@ -0,0 +1,380 @@
+# Deterministic local LLM stand-in (OpenAI-compatible, for LiteLLM)
+#
+# The agents' model calls dominate end-to-end timings and need a remote
+# service. This server answers /v1/chat/completions the way an OpenAI-style
+# endpoint does (plain and SSE streaming, text and tool calls), from a script
+# or from recorded completions, with timing taken from a latency profile.
+# Orchestration overhead, streaming and the tool paths can then be benchmarked
+# on their own and reproducibly.
+#
+#   python -m src.mock_llm --script configs/mock_llm_script.yaml --profile realistic
+#   python -m src.mock_llm --record /tmp/recorded.jsonl --upstream https://llm.example.com/v1
+#   python -m src.mock_llm --replay /tmp/recorded.jsonl --profile fast
+#
+# Point LLM_SERVICE_ENDPOINT at http://127.0.0.1:8765/v1 and use the
+# *llm_service_* model anchors from configs/shared_config.yaml (LiteLLM sends
+# "openai/<name>" models to api_base).
+#
+# Replies are chosen in this order:
+#   1. a recorded completion for the same conversation (--replay / --record),
+#      keyed by a fingerprint of the messages and the offered tool names;
+#   2. the first script rule whose conditions all match: model (glob),
+#      contains (last user message), system_contains, tool (an offered tool,
+#      glob). A rule's "turns" list is indexed by the number of assistant
+#      messages since the last user message, so a rule can script
+#      call tool -> read result -> answer;
+#   3. the script's default reply.
+# A profile gives the time to first token, the token rate and a jitter
+# fraction. The jitter comes from a RNG seeded with --seed and the
+# fingerprint, so the same request always gets the same timing.
+from __future__ import annotations
+import argparse
+import asyncio
+import fnmatch
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+DEFAULT_PORT = 8765
+DEFAULT_HOST = "127.0.0.1"
+
+PROFILES: Dict[str, Dict[str, float]] = {
+    "instant": {"ttft_ms": 0, "tokens_per_s": 0, "jitter": 0},  # 0 tokens/s: no pacing
+    "fast": {"ttft_ms": 150, "tokens_per_s": 200, "jitter": 0.1},
+    "realistic": {"ttft_ms": 900, "tokens_per_s": 80, "jitter": 0.25},
+    "slow": {"ttft_ms": 3000, "tokens_per_s": 25, "jitter": 0.25},
+}
+DEFAULT_REPLY = {"content": "OK"}
+
+_TOKEN = re.compile(r"\s*\S+|\s+")
+
+# -----------------------------
+# Requests and fingerprints
+# -----------------------------
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return ""
+
+def fingerprint(body: Dict[str, Any]) -> str:
+    """Stable key of a conversation: message texts, tool calls and offered tool names (not ids or model)."""
+    messages = []
+    for m in body.get("messages") or []:
+        calls = [
+            [c.get("function", {}).get("name"), c.get("function", {}).get("arguments")]
+            for c in m.get("tool_calls") or []
+        ]
+        messages.append([m.get("role"), _text(m.get("content")), calls])
+    tools = sorted(t.get("function", {}).get("name", "") for t in body.get("tools") or [])
+    canonical = json.dumps([messages, tools], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _turn_index(messages: List[Dict[str, Any]]) -> int:
+    """Assistant messages since the last user message (tool-call rounds in this turn)."""
+    count = 0
+    for m in reversed(messages):
+        if m.get("role") == "user":
+            break
+        if m.get("role") == "assistant":
+            count += 1
+    return count
+
+def _last(messages: List[Dict[str, Any]], role: str) -> str:
+    return next((_text(m.get("content")) for m in reversed(messages) if m.get("role") == role), "")
+
+# -----------------------------
+# Script and recordings
+# -----------------------------
+@dataclass
+class Rule:
+    name: str
+    when: Dict[str, Any]
+    turns: List[Dict[str, Any]]
+    profile: Optional[str] = None
+
+    def matches(self, body: Dict[str, Any]) -> bool:
+        messages = body.get("messages") or []
+        when = self.when
+        if "model" in when and not fnmatch.fnmatch(str(body.get("model", "")), when["model"]):
+            return False
+        if "contains" in when and when["contains"].lower() not in _last(messages, "user").lower():
+            return False
+        if "system_contains" in when and when["system_contains"].lower() not in _last(messages, "system").lower():
+            return False
+        if "tool" in when:
+            offered = [t.get("function", {}).get("name", "") for t in body.get("tools") or []]
+            if not any(fnmatch.fnmatch(name, when["tool"]) for name in offered):
+                return False
+        return True
+
+    def reply(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self.turns[min(_turn_index(body.get("messages") or []), len(self.turns) - 1)]
+
+class Script:
+    def __init__(self, doc: Optional[Dict[str, Any]] = None):
+        doc = doc or {}
+        self.profiles = {**PROFILES, **(doc.get("profiles") or {})}
+        self.default = doc.get("default") or DEFAULT_REPLY
+        self.rules: List[Rule] = []
+        for i, entry in enumerate(doc.get("rules") or []):
+            turns = entry.get("turns") or [entry.get("reply") or DEFAULT_REPLY]
+            self.rules.append(Rule(entry.get("name") or f"rule-{i}", entry.get("when") or {}, turns, entry.get("profile")))
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "Script":
+        if not path:
+            return cls()
+        text = Path(path).read_text(encoding="utf-8")
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+
+            return cls(yaml.safe_load(text))
+        return cls(json.loads(text))
+
+    def choose(self, body: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Optional[str]]:
+        for rule in self.rules:
+            if rule.matches(body):
+                return rule.name, rule.reply(body), rule.profile
+        return "default", self.default, None
+
+class Recordings:
+    """Completions keyed by conversation fingerprint, stored as JSON lines."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self.replies: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.is_file():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.replies[entry["fingerprint"]] = entry["reply"]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.replies.get(key)
+
+    def add(self, key: str, reply: Dict[str, Any], model: str) -> None:
+        with self._lock:
+            self.replies[key] = reply
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"fingerprint": key, "model": model, "reply": reply}) + "\n")
+
+def _reply_from_openai(response: Dict[str, Any]) -> Dict[str, Any]:
+    message = (response.get("choices") or [{}])[0].get("message") or {}
+    calls = [
+        {"name": c["function"]["name"], "arguments": c["function"].get("arguments") or "{}"}
+        for c in message.get("tool_calls") or []
+    ]
+    return {"tool_calls": calls} if calls else {"content": message.get("content") or ""}
+
+# -----------------------------
+# Completions
+# -----------------------------
+def _tool_calls(reply: Dict[str, Any], key: str) -> List[Dict[str, Any]]:
+    calls = []
+    for i, call in enumerate(reply.get("tool_calls") or []):
+        arguments = call.get("arguments", {})
+        calls.append({
+            "id": f"call_{key[:12]}_{i}",
+            "type": "function",
+            "function": {
+                "name": call["name"],
+                "arguments": arguments if isinstance(arguments, str) else json.dumps(arguments),
+            },
+        })
+    return calls
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text)
+
+def _usage(body: Dict[str, Any], completion_tokens: int) -> Dict[str, int]:
+    prompt_chars = sum(len(_text(m.get("content"))) for m in body.get("messages") or [])
+    prompt_tokens = max(1, prompt_chars // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+class Pacer:
+    """Sleeps so that chunk i goes out at ttft + i / rate after the request started."""
+
+    def __init__(self, profile: Dict[str, float], rng: random.Random):
+        jitter = float(profile.get("jitter", 0))
+        self.ttft = max(0.0, float(profile.get("ttft_ms", 0)) / 1000.0 * (1 + rng.uniform(-jitter, jitter)))
+        rate = float(profile.get("tokens_per_s", 0))
+        self.interval = 1.0 / (rate * (1 + rng.uniform(-jitter, jitter))) if rate > 0 else 0.0
+        self.started = time.monotonic()
+
+    async def wait(self, index: int) -> None:
+        delay = self.started + self.ttft + index * self.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class MockLLM:
+    def __init__(self, script: Script, recordings: Recordings, profile: str = "fast", seed: int = 0,
+                 upstream: Optional[str] = None, upstream_key: Optional[str] = None):
+        self.script = script
+        self.recordings = recordings
+        self.profile = profile
+        self.seed = seed
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.upstream_key = upstream_key
+        self.stats: Dict[str, int] = {"requests": 0, "streamed": 0}
+        self.by_source: Dict[str, int] = {}
+
+    async def resolve(self, body: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any], Dict[str, float]]:
+        key = fingerprint(body)
+        source, reply, profile_name = "recorded", self.recordings.get(key), None
+        if reply is None and self.upstream:
+            reply = await self._record(body, key)
+            source, profile_name = "upstream", "instant"  # the upstream call already took its time
+        if reply is None:
+            source, reply, profile_name = self.script.choose(body)
+        profile = self.script.profiles.get(profile_name or self.profile) or self.script.profiles["fast"]
+        self.stats["requests"] += 1
+        self.by_source[source] = self.by_source.get(source, 0) + 1
+        return key, source, reply, profile
+
+    async def _record(self, body: Dict[str, Any], key: str) -> Dict[str, Any]:
+        import httpx
+
+        headers = {"Authorization": f"Bearer {self.upstream_key}"} if self.upstream_key else {}
+        forward = {k: v for k, v in body.items() if k not in {"stream", "stream_options"}}
+        async with httpx.AsyncClient(timeout=300) as client:
+            response = await client.post(f"{self.upstream}/chat/completions", json=forward, headers=headers)
+            response.raise_for_status()
+        reply = _reply_from_openai(response.json())
+        self.recordings.add(key, reply, str(body.get("model", "")))
+        return reply
+
+    async def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        key, _, reply, profile = await self.resolve(body)
+        pacer = Pacer(profile, random.Random(f"{self.seed}:{key}"))
+        calls = _tool_calls(reply, key)
+        content = reply.get("content") if not calls else None
+        pieces = _tokens(content or "") + [t for c in calls for t in _tokens(c["function"]["arguments"])]
+        await pacer.wait(len(pieces))
+        message: Dict[str, Any] = {"role": "assistant", "content": content}
+        if calls:
+            message["tool_calls"] = calls
+        return {
+            "id": f"chatcmpl-{key[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if calls else "stop"}],
+            "usage": _usage(body, len(pieces)),
+        }
+
+    async def stream(self, body: Dict[str, Any]) -> AsyncIterator[bytes]:
+        key, _, reply, profile = await self.resolve(body)
+        self.stats["streamed"] += 1
+        pacer = Pacer(profile, random.Random(f"{self.seed}:{key}"))
+        calls = _tool_calls(reply, key)
+        base = {"id": f"chatcmpl-{key[:24]}", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model", "mock")}
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> bytes:
+            payload = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            return b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n"
+
+        index = 0
+        await pacer.wait(0)
+        yield chunk({"role": "assistant", "content": ""})
+        if calls:
+            for i, call in enumerate(calls):
+                yield chunk({"tool_calls": [{"index": i, "id": call["id"], "type": "function",
+                                             "function": {"name": call["function"]["name"], "arguments": ""}}]})
+                for piece in _tokens(call["function"]["arguments"]):
+                    index += 1
+                    await pacer.wait(index)
+                    yield chunk({"tool_calls": [{"index": i, "function": {"arguments": piece}}]})
+        else:
+            for piece in _tokens(reply.get("content") or ""):
+                index += 1
+                await pacer.wait(index)
+                yield chunk({"content": piece})
+        yield chunk({}, "tool_calls" if calls else "stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            yield b"data: " + json.dumps({**base, "choices": [], "usage": _usage(body, index)}).encode("utf-8") + b"\n\n"
+        yield b"data: [DONE]\n\n"
+
+# -----------------------------
+# HTTP server
+# -----------------------------
+def create_app(mock: MockLLM):
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+
+    async def chat_completions(request: Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"error": {"message": "Request body must be JSON", "type": "invalid_request_error"}}, status_code=400)
+        if not isinstance(body, dict) or not body.get("messages"):
+            return JSONResponse({"error": {"message": "'messages' is required", "type": "invalid_request_error"}}, status_code=400)
+        if body.get("stream"):
+            return StreamingResponse(mock.stream(body), media_type="text/event-stream")
+        return JSONResponse(await mock.complete(body))
+
+    async def models(request: Request):
+        names = sorted({r.when["model"] for r in mock.script.rules if "model" in r.when} | {"mock"})
+        return JSONResponse({"object": "list", "data": [{"id": n, "object": "model", "owned_by": "mock"} for n in names]})
+
+    async def stats(request: Request):
+        return JSONResponse({**mock.stats, "by_source": mock.by_source, "recorded": len(mock.recordings.replies)})
+
+    async def health(request: Request):
+        return JSONResponse({"status": "ok"})
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/chat/completions", chat_completions, methods=["POST"]),
+        Route("/v1/models", models),
+        Route("/models", models),
+        Route("/stats", stats),
+        Route("/health", health),
+    ])
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve scripted or recorded LLM completions (OpenAI-compatible)")
+    parser.add_argument("--script", default=os.environ.get("MOCK_LLM_SCRIPT"), help="YAML/JSON rules, profiles and default reply")
+    parser.add_argument("--replay", default=os.environ.get("MOCK_LLM_REPLAY"), help="Recorded completions (JSON lines)")
+    parser.add_argument("--record", help="Forward unknown conversations to --upstream and append them to this file")
+    parser.add_argument("--upstream", help="OpenAI-compatible base URL to record from")
+    parser.add_argument("--upstream-key", default=os.environ.get("LLM_SERVICE_API_KEY"))
+    parser.add_argument("--profile", default=os.environ.get("MOCK_LLM_PROFILE", "fast"), help=f"Latency profile ({', '.join(PROFILES)} or one from the script)")
+    parser.add_argument("--seed", type=int, default=int(os.environ.get("MOCK_LLM_SEED", 0)))
+    parser.add_argument("--host", default=os.environ.get("MOCK_LLM_HOST", DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MOCK_LLM_PORT", DEFAULT_PORT)))
+    args = parser.parse_args(argv)
+    if args.record and not args.upstream:
+        parser.error("--record needs --upstream")
+
+    import uvicorn
+
+    script = Script.load(args.script)
+    if args.profile not in script.profiles:
+        parser.error(f"unknown profile '{args.profile}'")
+    recordings = Recordings(args.record or args.replay)
+    mock = MockLLM(script, recordings, profile=args.profile, seed=args.seed,
+                   upstream=args.upstream if args.record else None, upstream_key=args.upstream_key)
+    print(f"Mock LLM on http://{args.host}:{args.port}/v1 (profile {args.profile}, {len(script.rules)} rules, "
+          f"{len(recordings.replies)} recorded completions)", flush=True)
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
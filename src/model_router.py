@@ -0,0 +1,281 @@
+# Per-turn routing between an agent's model and a fast model
+#
+# The specialist agents run every turn on the general (pro) model, although
+# most turns either pick one tool for a short request or turn a tool result
+# into an answer. With a `model_router` block in an agent's app_config
+# (*model_router in configs/shared_config.yaml), each turn is classified from
+# the LLM request and sent to the fast model when it is:
+#   tool_result    the model is reading tool output of at most
+#                  max_tool_result_chars, after at most max_tool_rounds
+#                  tool calls in this turn (formatting);
+#   short_request  a user request of at most max_request_chars with none of
+#                  planning_keywords (tool selection).
+# Everything else stays on the agent's model: long_request, planning_keyword,
+# tool_rounds, large_tool_result. A fast call that fails before it produced
+# any output is retried on the agent's model (route "fallback").
+#
+# To measure what routing saves, sample_rate of the fast-eligible turns still
+# go to the agent's model (reason "sample"). The saving is then fast turns x
+# (mean sampled latency - mean fast latency), comparing the same kind of turn
+# on both models. Turn counts, latency sums and the saving go out with the
+# tool metrics (src.tool_metrics, TOOL_METRICS*) as sam_model_router_*.
+#
+# SAM builds the ADK agent after the agent_init_function ran;
+# `install_model_router` (called from src.service_backends) wraps that factory
+# and swaps the agent's model for a RoutedLlm.
+from __future__ import annotations
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from solace_ai_connector.common.log import log
+
+DEFAULT_FAST_MODEL = "gemini-2.5-flash"
+DEFAULT_MAX_REQUEST_CHARS = 800
+DEFAULT_MAX_TOOL_ROUNDS = 3
+DEFAULT_MAX_TOOL_RESULT_CHARS = 24000
+DEFAULT_SAMPLE_RATE = 0.05
+DEFAULT_PLANNING_KEYWORDS = (
+    "plan", "design", "architecture", "architect", "strategy", "roadmap", "trade-off", "tradeoff",
+    "compare", "evaluate", "prioritize", "prioritise", "why", "explain", "migrate", "break down",
+)
+_FAST_REASONS = ("tool_result", "short_request")
+
+# -----------------------------
+# Settings and classification
+# -----------------------------
+def _as_bool(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in {"0", "false", "no", "off"}
+    return bool(value)
+
+@dataclass
+class RouterSettings:
+    enabled: bool = True
+    fast_model: Any = DEFAULT_FAST_MODEL
+    max_request_chars: int = DEFAULT_MAX_REQUEST_CHARS
+    max_tool_rounds: int = DEFAULT_MAX_TOOL_ROUNDS
+    max_tool_result_chars: int = DEFAULT_MAX_TOOL_RESULT_CHARS
+    planning_keywords: Tuple[str, ...] = DEFAULT_PLANNING_KEYWORDS
+    sample_rate: float = DEFAULT_SAMPLE_RATE
+    fallback: bool = True
+    _keywords: Optional[re.Pattern] = field(default=None, repr=False)
+
+    @classmethod
+    def from_config(cls, config: Any) -> "RouterSettings":
+        if not isinstance(config, dict):
+            return cls(enabled=_as_bool(config, False))
+        keywords = config.get("planning_keywords")
+        if isinstance(keywords, str):
+            keywords = [k.strip() for k in keywords.split(",")]
+        return cls(
+            enabled=_as_bool(config.get("enabled"), True),
+            fast_model=config.get("fast_model") or DEFAULT_FAST_MODEL,
+            max_request_chars=int(config.get("max_request_chars", DEFAULT_MAX_REQUEST_CHARS)),
+            max_tool_rounds=int(config.get("max_tool_rounds", DEFAULT_MAX_TOOL_ROUNDS)),
+            max_tool_result_chars=int(config.get("max_tool_result_chars", DEFAULT_MAX_TOOL_RESULT_CHARS)),
+            planning_keywords=tuple(k.lower() for k in keywords if k) if keywords else DEFAULT_PLANNING_KEYWORDS,
+            sample_rate=float(config.get("sample_rate", DEFAULT_SAMPLE_RATE) or 0.0),
+            fallback=_as_bool(config.get("fallback"), True),
+        )
+
+    def keyword_pattern(self) -> Optional[re.Pattern]:
+        if self._keywords is None and self.planning_keywords:
+            words = "|".join(re.escape(k) for k in sorted(self.planning_keywords, key=len, reverse=True))
+            self._keywords = re.compile(rf"\b(?:{words})\w*", re.IGNORECASE)
+        return self._keywords
+
+def _response_chars(part: Any) -> int:
+    try:
+        return len(json.dumps(part.function_response.response, default=str))
+    except (TypeError, ValueError):
+        return len(str(part.function_response.response))
+
+def classify(llm_request: LlmRequest, settings: RouterSettings) -> Tuple[str, str]:
+    """("fast" | "primary", reason) for one model turn."""
+    contents = llm_request.contents or []
+    rounds = 0
+    request_text = ""
+    for content in reversed(contents):
+        parts = content.parts or []
+        if any(p.function_call for p in parts):
+            rounds += 1
+        if content.role == "user" and not any(p.function_response for p in parts):
+            request_text = " ".join(p.text for p in parts if p.text)
+            break
+    last_parts = (contents[-1].parts or []) if contents else []
+    tool_results = [p for p in last_parts if p.function_response]
+
+    if rounds > settings.max_tool_rounds:
+        return "primary", "tool_rounds"
+    if tool_results:
+        if sum(_response_chars(p) for p in tool_results) > settings.max_tool_result_chars:
+            return "primary", "large_tool_result"
+        return "fast", "tool_result"
+    if len(request_text) > settings.max_request_chars:
+        return "primary", "long_request"
+    pattern = settings.keyword_pattern()
+    if pattern is not None and pattern.search(request_text):
+        return "primary", "planning_keyword"
+    return "fast", "short_request"
+
+# -----------------------------
+# Metrics
+# -----------------------------
+_TURNS: Dict[Tuple[str, str, str], List[float]] = {}  # (agent, route, reason) -> [count, seconds]
+_TURNS_LOCK = threading.Lock()
+
+def _record(agent: str, route: str, reason: str, seconds: float) -> None:
+    with _TURNS_LOCK:
+        entry = _TURNS.setdefault((agent, route, reason), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+def router_stats() -> Dict[str, Dict[str, Any]]:
+    """Per agent: turns by route and reason, fast share, mean latency per route and estimated saving."""
+    with _TURNS_LOCK:
+        turns = {key: list(value) for key, value in _TURNS.items()}
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (agent, route, reason), (count, seconds) in sorted(turns.items()):
+        entry = stats.setdefault(agent, {"turns": {}, "_seconds": {}, "_sample": [0, 0.0]})
+        entry["turns"][f"{route}/{reason}"] = count
+        totals = entry["_seconds"].setdefault(route, [0, 0.0])
+        totals[0] += count
+        totals[1] += seconds
+        if reason == "sample":
+            entry["_sample"] = [count, seconds]
+    for agent, entry in stats.items():
+        seconds = entry.pop("_seconds")
+        sample_count, sample_seconds = entry.pop("_sample")
+        total = sum(count for count, _ in seconds.values())
+        fast_count, fast_seconds = seconds.get("fast", [0, 0.0])
+        entry["fast_share"] = round(fast_count / total, 4) if total else None
+        entry["mean_seconds"] = {route: round(s / c, 4) for route, (c, s) in seconds.items() if c}
+        # Only comparable when eligible turns were also measured on the agent's model
+        if sample_count and fast_count:
+            saved = fast_count * (sample_seconds / sample_count - fast_seconds / fast_count)
+            entry["saved_seconds"] = round(saved, 3)
+        else:
+            entry["saved_seconds"] = None
+    return stats
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_metrics() -> List[str]:
+    with _TURNS_LOCK:
+        turns = {key: list(value) for key, value in _TURNS.items()}
+    counts = ["# HELP sam_model_router_turns_total Model turns by route and reason",
+              "# TYPE sam_model_router_turns_total counter"]
+    latency = ["# HELP sam_model_router_turn_seconds_total Model time of routed turns",
+               "# TYPE sam_model_router_turn_seconds_total counter"]
+    for (agent, route, reason), (count, seconds) in sorted(turns.items()):
+        labels = f'agent="{_label(agent)}",route="{route}",reason="{reason}"'
+        counts.append(f"sam_model_router_turns_total{{{labels}}} {int(count)}")
+        latency.append(f"sam_model_router_turn_seconds_total{{{labels}}} {seconds:g}")
+    saved = ["# HELP sam_model_router_saved_seconds Model time saved by fast routing (estimated from sampled turns)",
+             "# TYPE sam_model_router_saved_seconds gauge"]
+    for agent, entry in router_stats().items():
+        if entry["saved_seconds"] is not None:
+            saved.append(f'sam_model_router_saved_seconds{{agent="{_label(agent)}"}} {entry["saved_seconds"]:g}')
+    return counts + latency + saved
+
+# -----------------------------
+# Routed model
+# -----------------------------
+def build_model(config: Any) -> BaseLlm:
+    """A BaseLlm from a model config the way SAM reads `model:` (name string or LiteLLM dict)."""
+    if isinstance(config, BaseLlm):
+        return config
+    if isinstance(config, dict):
+        from solace_agent_mesh.agent.adk.models.lite_llm import LiteLlm
+
+        config = dict(config)
+        config.setdefault("num_retries", 3)
+        config.setdefault("timeout", 120)
+        return LiteLlm(**config)
+    from google.adk.models.registry import LLMRegistry
+
+    return LLMRegistry.new_llm(str(config))
+
+class RoutedLlm(BaseLlm):
+    """Sends each turn to `primary` or `fast` as `classify` decides."""
+
+    primary: Any
+    fast: Any
+    settings: Any
+    agent: str = "unknown"
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        route, reason = classify(llm_request, self.settings)
+        if route == "fast" and self.settings.sample_rate > 0 and random.random() < self.settings.sample_rate:
+            route, reason = "primary", "sample"
+        target = self.fast if route == "fast" else self.primary
+        llm_request.model = target.model
+        started = time.monotonic()
+        produced = False
+        try:
+            async for response in target.generate_content_async(llm_request, stream=stream):
+                produced = True
+                yield response
+        except Exception as e:
+            if route != "fast" or produced or not self.settings.fallback:
+                raise
+            log.warning("[model_router] %s: fast model %s failed (%s); retrying on %s",
+                        self.agent, self.fast.model, e, self.primary.model)
+            route = "fallback"
+            llm_request.model = self.primary.model
+            async for response in self.primary.generate_content_async(llm_request, stream=stream):
+                yield response
+        _record(self.agent, route, reason, time.monotonic() - started)
+        log.debug("[model_router] %s turn -> %s (%s)", self.agent, route, reason)
+
+    def connect(self, llm_request: LlmRequest):
+        return self.primary.connect(llm_request)
+
+def route_agent_model(agent: Any, config: Any, agent_name: str) -> bool:
+    """Replace `agent.model` with a RoutedLlm when the config enables routing."""
+    settings = RouterSettings.from_config(config)
+    if not settings.enabled:
+        return False
+    primary = agent.canonical_model
+    fast_config = settings.fast_model
+    if isinstance(fast_config, dict) and isinstance(fast_config.get("response_cache"), dict):
+        fast_config = {**fast_config, "response_cache": {**fast_config["response_cache"], "agent": agent_name}}
+    fast = build_model(fast_config)
+    if fast.model == primary.model:
+        return False
+    agent.model = RoutedLlm(model=primary.model, primary=primary, fast=fast, settings=settings, agent=agent_name)
+    log.info("[model_router] %s: routing simple turns from %s to %s (requests <= %d chars, tool results <= %d chars)",
+             agent_name, primary.model, fast.model, settings.max_request_chars, settings.max_tool_result_chars)
+    return True
+
+def install_model_router(host_component) -> None:
+    """agent_init_function part: wrap SAM's ADK agent factory (idempotent)."""
+    from solace_agent_mesh.agent.sac import component as sac_component
+
+    original = sac_component.initialize_adk_agent
+    if getattr(original, "_model_router", False):
+        return
+
+    def initialize_adk_agent(component, *args, **kwargs):
+        agent = original(component, *args, **kwargs)
+        config = component.get_config("model_router")
+        if config:
+            route_agent_model(agent, config, component.get_config("agent_name") or agent.name)
+        return agent
+
+    initialize_adk_agent._model_router = True
+    sac_component.initialize_adk_agent = initialize_adk_agent
+
+    from src.tool_metrics import register_collector
+
+    register_collector(render_metrics)
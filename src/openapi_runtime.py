@@ -0,0 +1,241 @@
+# Runtime support for tool modules generated from OpenAPI specs
+#
+# Every generated module asks for one named ApiClient at import time and all of
+# its tool functions send requests through it, so calls share a pooled
+# keep-alive connection set instead of opening a connection per call. The
+# pagination helper walks cursor, page-number and offset style list endpoints
+# and returns the concatenated items.
+from __future__ import annotations
+import asyncio
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from solace_ai_connector.common.log import log
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_PAGES = 10
+
+# Response keys that hold the page items / the next cursor, in lookup order
+ITEM_KEYS = ("items", "data", "results", "records", "value", "entries")
+CURSOR_KEYS = (
+    "next_cursor", "nextCursor", "next_page_token", "nextPageToken",
+    "cursor", "next", "continuation_token", "continuationToken",
+)
+
+def _path_segment(value: Any) -> str:
+    """A path parameter encoded as one segment: "/", "?", "#" and dot segments cannot leave the templated path."""
+    segment = quote(str(value), safe="")
+    return segment.replace(".", "%2E") if segment in (".", "..") else segment
+
+class ApiClient:
+    """Pooled HTTP client shared by the tools of one generated module.
+
+    The base URL comes from, in order: tool_config["base_url"], the module's
+    environment variable, then the server URL in the spec. httpx pools are
+    bound to an event loop, so one AsyncClient is kept per running loop.
+    """
+
+    def __init__(self, name: str, default_base_url: str = "", base_url_env: str = ""):
+        self.name = name
+        self.default_base_url = default_base_url
+        self.base_url_env = base_url_env
+        self.transport = None  # tests can point this at an httpx.MockTransport
+        self._clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._lock = threading.Lock()
+
+    def base_url(self, tool_config: Optional[Dict[str, Any]] = None) -> str:
+        url = (tool_config or {}).get("base_url")
+        if not url and self.base_url_env:
+            url = os.environ.get(self.base_url_env)
+        return (url or self.default_base_url).rstrip("/")
+
+    def _client(self):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            with self._lock:
+                # Another caller on this loop may have created it meanwhile
+                client = self._clients.get(loop)
+                if client is not None and not client.is_closed:
+                    return client
+                # Drop clients of loops that have since been closed
+                for stale in [l for l in self._clients if l.is_closed()]:
+                    del self._clients[stale]
+                client = httpx.AsyncClient(
+                    timeout=float(os.environ.get("OPENAPI_TOOL_TIMEOUT", DEFAULT_TIMEOUT)),
+                    limits=httpx.Limits(
+                        max_connections=int(os.environ.get("OPENAPI_TOOL_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+                        max_keepalive_connections=int(os.environ.get("OPENAPI_TOOL_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+                    ),
+                    transport=self.transport,
+                )
+                self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        path_params: Optional[Dict[str, Any]],
+        query: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, Any]],
+        json_body: Any,
+        tool_config: Optional[Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], Any]:
+        config = tool_config or {}
+        url_path = path
+        for key, value in (path_params or {}).items():
+            url_path = url_path.replace("{" + key + "}", _path_segment(value))
+        request_headers = {k: str(v) for k, v in (config.get("headers") or {}).items()}
+        request_headers.update({k: str(v) for k, v in (headers or {}).items() if v is not None})
+        params = {k: v for k, v in (query or {}).items() if v is not None}
+
+        response = await self._client().request(
+            method,
+            self.base_url(config) + url_path,
+            params=params,
+            headers=request_headers,
+            json=json_body,
+        )
+        try:
+            data = response.json() if response.content else None
+        except ValueError:
+            data = response.text
+        result: Dict[str, Any] = {
+            "status": "success" if response.is_success else "error",
+            "status_code": response.status_code,
+            "data": data,
+        }
+        if not response.is_success:
+            result["error"] = f"{method} {url_path} returned HTTP {response.status_code}"
+        return result, response
+
+    async def call(
+        self,
+        method: str,
+        path: str,
+        path_params: Optional[Dict[str, Any]] = None,
+        query: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        json_body: Any = None,
+        tool_config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Send one request and wrap the decoded response in the usual tool result dict."""
+        try:
+            result, _ = await self._send(method, path, path_params, query, headers, json_body, tool_config)
+        except Exception as e:
+            log.warning("[%s] %s %s failed: %s", self.name, method, path, e)
+            return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        return result
+
+    async def paginate(
+        self,
+        method: str,
+        path: str,
+        style: str,
+        page_param: str,
+        path_params: Optional[Dict[str, Any]] = None,
+        query: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        tool_config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Follow a list endpoint across pages and concatenate the items.
+
+        Args:
+            style (str): "cursor", "page" or "offset"
+            page_param (str): Query parameter that selects the page
+            max_pages (int): Upper bound on requests made
+
+        Returns:
+            Dict[str, Any]: status, items, pages fetched and whether more pages were left
+        """
+        query = dict(query or {})
+        items: List[Any] = []
+        pages = 0
+        more = False
+        while pages < max(1, max_pages):
+            try:
+                result, response = await self._send(method, path, path_params, query, headers, None, tool_config)
+            except Exception as e:
+                log.warning("[%s] %s %s failed on page %d: %s", self.name, method, path, pages + 1, e)
+                return {"status": "error", "error": f"{type(e).__name__}: {e}", "items": items, "pages": pages}
+            if result["status"] != "success":
+                return {**result, "items": items, "pages": pages}
+            pages += 1
+            page_items = extract_items(result["data"])
+            items.extend(page_items)
+
+            next_value = next_page_value(style, page_param, query.get(page_param), result["data"], response, len(page_items))
+            more = next_value is not None
+            if not more:
+                break
+            query[page_param] = next_value
+
+        return {"status": "success", "items": items, "item_count": len(items), "pages": pages, "has_more": more}
+
+def extract_items(data: Any) -> List[Any]:
+    """The list of records in a page: the body itself or its first known list field."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in ITEM_KEYS:
+            if isinstance(data.get(key), list):
+                return data[key]
+        for value in data.values():
+            if isinstance(value, list):
+                return value
+    return []
+
+def next_page_value(style: str, page_param: str, current: Any, data: Any, response, item_count: int) -> Any:
+    """Value of the page parameter for the next request, or None on the last page."""
+    if item_count == 0:
+        return None
+    if style == "cursor":
+        if isinstance(data, dict):
+            for key in CURSOR_KEYS:
+                if data.get(key):
+                    return data[key]
+            meta = data.get("meta") or data.get("pagination") or {}
+            if isinstance(meta, dict):
+                for key in CURSOR_KEYS:
+                    if meta.get(key):
+                        return meta[key]
+        link = response.links.get("next", {}).get("url") if response is not None else None
+        if link:
+            from urllib.parse import parse_qs, urlparse
+
+            return (parse_qs(urlparse(link).query).get(page_param) or [None])[0]
+        return None
+    if style == "page":
+        return int(current or 1) + 1
+    if style == "offset":
+        return int(current or 0) + item_count
+    return None
+
+_CLIENTS: Dict[str, ApiClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def get_client(name: str, default_base_url: str = "", base_url_env: str = "") -> ApiClient:
+    """Return the shared client for a generated module, creating it on first use.
+
+    Keyed by name so a hot reload of the module keeps the existing pool.
+    """
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(name)
+        if client is None:
+            client = _CLIENTS[name] = ApiClient(name, default_base_url, base_url_env)
+        else:
+            client.default_base_url = default_base_url
+            client.base_url_env = base_url_env
+        return client
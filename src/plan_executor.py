@@ -0,0 +1,359 @@
+# Dependency-DAG execution of multi-agent plans in the orchestrator
+#
+# The orchestrator used to walk a plan one peer call per model turn, so
+# requirements -> (architect | hiring | program manager) took four peer round
+# trips plus four model turns, one after another. With `plan_execution` in its
+# app_config it gets the `run_plan` tool instead: the model submits the plan
+# once as steps {id, agent, task, depends_on}. A before_model_callback then
+# dispatches every step whose dependencies are done as parallel peer calls
+# (at most max_parallel per wave, longest remaining chain first), without a
+# model turn in between. Dependent steps get the results of their prerequisites
+# appended to their task. The model only returns for the final answer, so
+# wall-clock time follows the depth of the plan, not its length.
+#
+# SAM resumes the orchestrator once every peer call of a model response has
+# answered, so a wave waits for its slowest step. Each branch has its own
+# timeout (branch_timeout_seconds, or timeout_seconds on the step), below the
+# orchestrator's request_timeout_seconds; a timed-out or failed step skips
+# its dependents and the other branches carry on. Progress is published as
+# status updates when a wave starts, next to SAM's per-peer result
+# notifications, so partial results reach the gateway while the plan runs.
+from __future__ import annotations
+import copy
+import inspect
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from solace_ai_connector.common.log import log
+from src.tool_metrics import instrument_tool
+
+STATE_KEY = "plan_execution"
+CALL_ID_PREFIX = "dag-"
+PEER_TOOL_PREFIX = "peer_"  # SAM's peer agent tools
+DEFAULT_MAX_PARALLEL = 4
+DEFAULT_BRANCH_TIMEOUT_SECONDS = 300
+DEFAULT_CONTEXT_CHARS = 4000
+_FAILED = ("failed", "timeout", "skipped")
+
+# -----------------------------
+# Plan validation
+# -----------------------------
+def _normalise_steps(steps: Any) -> List[Dict[str, Any]]:
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("steps must be a non-empty list of {id, agent, task, depends_on}")
+    normalised, seen = [], set()
+    for index, step in enumerate(steps, start=1):
+        if not isinstance(step, dict):
+            raise ValueError(f"step {index} is not an object")
+        step_id = str(step.get("id") or f"step{index}")
+        if step_id in seen:
+            raise ValueError(f"duplicate step id {step_id!r}")
+        seen.add(step_id)
+        agent, task = step.get("agent"), step.get("task")
+        if not agent or not task:
+            raise ValueError(f"step {step_id!r} needs an agent and a task")
+        depends_on = step.get("depends_on") or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        timeout = step.get("timeout_seconds")
+        normalised.append({
+            "id": step_id,
+            "agent": str(agent).removeprefix(PEER_TOOL_PREFIX),
+            "task": str(task),
+            "depends_on": [str(d) for d in depends_on],
+            "timeout_seconds": float(timeout) if timeout else None,
+            "status": "pending",
+        })
+    for step in normalised:
+        unknown = [d for d in step["depends_on"] if d not in seen]
+        if unknown:
+            raise ValueError(f"step {step['id']!r} depends on unknown step(s) {', '.join(unknown)}")
+        if step["id"] in step["depends_on"]:
+            raise ValueError(f"step {step['id']!r} depends on itself")
+    return normalised
+
+def plan_waves(steps: List[Dict[str, Any]]) -> List[List[str]]:
+    """Steps grouped by dependency depth (Kahn's algorithm); ValueError on a cycle."""
+    remaining = {s["id"]: set(s["depends_on"]) for s in steps}
+    waves = []
+    while remaining:
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"the plan has a dependency cycle between {', '.join(sorted(remaining))}")
+        waves.append(ready)
+        for step_id in ready:
+            del remaining[step_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return waves
+
+def _heights(steps: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Length of the longest chain of dependents below each step (critical path first)."""
+    dependents: Dict[str, List[str]] = {s["id"]: [] for s in steps}
+    for step in steps:
+        for dep in step["depends_on"]:
+            dependents[dep].append(step["id"])
+    heights: Dict[str, int] = {}
+
+    def height(step_id: str) -> int:
+        if step_id not in heights:
+            heights[step_id] = 1 + max((height(d) for d in dependents[step_id]), default=0)
+        return heights[step_id]
+
+    for step_id in dependents:
+        height(step_id)
+    return heights
+
+# -----------------------------
+# Tool
+# -----------------------------
+@instrument_tool
+async def run_plan(
+    steps: List[Dict[str, Any]],
+    max_parallel: Optional[int] = None,
+    branch_timeout_seconds: Optional[int] = None,
+    tool_context=None,
+    tool_config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Run a multi-agent plan as a dependency graph, with independent steps delegated concurrently.
+
+    Args:
+        steps (List[Dict[str, Any]]): Plan steps, each {"id", "agent", "task", "depends_on": [step ids]} and optionally "timeout_seconds"; "agent" is the peer agent name
+        max_parallel (int): Maximum concurrent peer calls; the configured default when omitted
+        branch_timeout_seconds (int): Timeout per step; the configured default when omitted
+
+    Returns:
+        Dict[str, Any]: The accepted plan and its waves; step results follow as peer responses
+    """
+    log.info("[run_plan] called")
+    try:
+        normalised = _normalise_steps(steps)
+        waves = plan_waves(normalised)
+    except ValueError as e:
+        return {"status": "error", "error": str(e)}
+    if tool_context is None:
+        return {"status": "error", "error": "run_plan needs the agent's tool context"}
+    task_id = (tool_context.state.get("a2a_context") or {}).get("logical_task_id")
+    current = tool_context.state.get(STATE_KEY)
+    if current and current.get("status") == "running" and current.get("task_id") == task_id:
+        return {"status": "error", "error": f"plan {current['id']} is still running"}
+    plan = {
+        "id": uuid.uuid4().hex[:8],
+        "task_id": task_id,
+        "status": "running",
+        "started": time.time(),
+        "max_parallel": int(max_parallel) if max_parallel else None,
+        "branch_timeout_seconds": float(branch_timeout_seconds) if branch_timeout_seconds else None,
+        "steps": normalised,
+    }
+    tool_context.state[STATE_KEY] = plan
+    return {
+        "status": "scheduled",
+        "plan_id": plan["id"],
+        "waves": waves,
+        "message": "Steps are being delegated now; their results follow as peer agent responses. Write the final answer once all have arrived.",
+    }
+
+# -----------------------------
+# Scheduler
+# -----------------------------
+def _outcome(payload: Any, timeout: float) -> Tuple[str, str]:
+    if isinstance(payload, dict) and payload.get("status") == "error":
+        return "failed", str(payload.get("message") or payload.get("error") or payload)
+    text = payload.get("result") if isinstance(payload, dict) and "result" in payload else payload
+    text = text if isinstance(text, str) else str(text)
+    if text.startswith("Request to peer agent tool") and "timed out" in text:
+        return "timeout", f"timed out after {timeout:g} seconds"
+    return "done", text
+
+def _task_with_context(step: Dict[str, Any], by_id: Dict[str, Dict[str, Any]], context_chars: int) -> str:
+    if not step["depends_on"]:
+        return step["task"]
+    sections = []
+    for dep in step["depends_on"]:
+        result = by_id[dep].get("result") or ""
+        if len(result) > context_chars:
+            result = result[:context_chars] + f"\n[... {len(result) - context_chars} more characters]"
+        sections.append(f"[{dep}: {by_id[dep]['agent']}]\n{result}")
+    return step["task"] + "\n\nResults of the steps this task depends on:\n\n" + "\n\n".join(sections)
+
+def advance(
+    plan: Dict[str, Any],
+    responses: Dict[str, Any],
+    peer_tools: List[str],
+    settings: Dict[str, Any],
+) -> List[types.Part]:
+    """Record peer responses in the plan and return the calls of the next wave (plan is updated in place)."""
+    by_id = {s["id"]: s for s in plan["steps"]}
+    now = time.time()
+    for step in plan["steps"]:
+        if step["status"] == "running" and step.get("call_id") in responses:
+            step["status"], step["result"] = _outcome(responses[step["call_id"]], step["timeout"])
+            step["finished"] = now
+    if any(s["status"] == "running" for s in plan["steps"]):
+        return []
+
+    changed = True
+    while changed:
+        changed = False
+        for step in plan["steps"]:
+            failed = [d for d in step["depends_on"] if by_id[d]["status"] in _FAILED]
+            if step["status"] == "pending" and failed:
+                step["status"], step["result"] = "skipped", f"skipped because {', '.join(failed)} did not complete"
+                changed = True
+    heights = _heights(plan["steps"])
+    ready = [s for s in plan["steps"] if s["status"] == "pending" and all(by_id[d]["status"] == "done" for d in s["depends_on"])]
+    ready.sort(key=lambda s: -heights[s["id"]])
+
+    max_parallel = max(1, min(plan.get("max_parallel") or settings["max_parallel"], settings["max_parallel"]))
+    parts = []
+    for step in ready:
+        tool_name = f"{PEER_TOOL_PREFIX}{step['agent']}"
+        if tool_name not in peer_tools:
+            step["status"], step["result"] = "failed", f"agent {step['agent']} is not available"
+            continue
+        if len(parts) >= max_parallel:
+            break
+        step["status"] = "running"
+        step["call_id"] = f"{CALL_ID_PREFIX}{plan['id']}-{uuid.uuid4().hex[:12]}"
+        step["timeout"] = min(step.get("timeout_seconds") or plan.get("branch_timeout_seconds") or settings["branch_timeout_seconds"], settings["request_timeout_seconds"])
+        step["started"] = now
+        parts.append(types.Part(function_call=types.FunctionCall(
+            id=step["call_id"], name=tool_name,
+            args={"task_description": _task_with_context(step, by_id, settings["context_chars"])},
+        )))
+    if parts:
+        plan["waves"] = plan.get("waves", 0) + 1
+    elif any(s["status"] == "pending" for s in plan["steps"]):
+        # agents that turned out to be unavailable may have unblocked or skipped others
+        return advance(plan, {}, peer_tools, settings)
+    else:
+        plan["status"] = "finished"
+        plan["finished"] = now
+    return parts
+
+def progress_text(plan: Dict[str, Any]) -> str:
+    steps = plan["steps"]
+    finished = [s for s in steps if s["status"] in ("done",) + _FAILED]
+    running = [f"{s['id']} ({s['agent']})" for s in steps if s["status"] == "running"]
+    problems = [f"{s['id']} {s['status']}" for s in steps if s["status"] in _FAILED]
+    text = f"Plan {plan['id']}: {len(finished)}/{len(steps)} steps finished"
+    if problems:
+        text += f" ({', '.join(problems)})"
+    if running:
+        text += f"; running {', '.join(running)}"
+    if plan["status"] == "finished":
+        text += f"; took {plan['finished'] - plan['started']:.1f}s in {plan.get('waves', 0)} wave(s)"
+    return text
+
+def _plan_responses(llm_request: LlmRequest) -> Optional[Dict[str, Any]]:
+    """Peer responses to plan steps (or the run_plan result) ending the request, keyed by call id."""
+    if not llm_request.contents:
+        return None
+    parts = [p.function_response for p in llm_request.contents[-1].parts or [] if p.function_response]
+    if any(r.name == "run_plan" for r in parts) or any((r.id or "").startswith(CALL_ID_PREFIX) for r in parts):
+        return {r.id: r.response for r in parts}
+    return None
+
+# -----------------------------
+# Install
+# -----------------------------
+def _settings(component) -> Optional[Dict[str, Any]]:
+    config = component.get_config("plan_execution")
+    if not config:
+        return None
+    config = config if isinstance(config, dict) else {}
+    if str(config.get("enabled", True)).strip().lower() in {"0", "false", "no", "off"}:
+        return None
+    request_timeout = (component.get_config("inter_agent_communication") or {}).get("request_timeout_seconds") or 600
+    return {
+        "max_parallel": int(config.get("max_parallel") or DEFAULT_MAX_PARALLEL),
+        "branch_timeout_seconds": float(config.get("branch_timeout_seconds") or DEFAULT_BRANCH_TIMEOUT_SECONDS),
+        "context_chars": int(config.get("context_chars") or DEFAULT_CONTEXT_CHARS),
+        "request_timeout_seconds": float(request_timeout),
+    }
+
+def _shorten_peer_timeout(component, tool_context, timeout: float) -> None:
+    # PeerAgentTool arms SAM's timeout with request_timeout_seconds; re-arm it for this branch
+    task_id = (tool_context.state.get("a2a_context") or {}).get("logical_task_id")
+    with component.active_tasks_lock:
+        task_context = component.active_tasks.get(task_id)
+    if task_context is None:
+        return
+    with task_context.lock:
+        sub_tasks = [sub_id for sub_id, correlation in task_context.active_peer_sub_tasks.items()
+                     if correlation.get("adk_function_call_id") == tool_context.function_call_id]
+    for sub_id in sub_tasks:
+        component.cache_service.add_data(key=sub_id, value=task_id, expiry=timeout, component=component)
+
+async def _maybe_await(value: Any) -> Any:
+    return await value if inspect.isawaitable(value) else value
+
+def plan_model_callback(component, settings: Dict[str, Any], previous: Any = None):
+    """before_model_callback that advances a running plan, else defers to `previous`.
+
+    Plan responses are handled before `previous` runs: a `/call run_plan` on
+    the fast path returns its result under a fastpath- call id, and the fast
+    path would otherwise answer it as text and the plan would never start.
+    """
+    async def before_model_callback(callback_context, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        plan = callback_context.state.get(STATE_KEY)
+        responses = _plan_responses(llm_request)
+        if not plan or plan.get("status") != "running" or responses is None:
+            return await _maybe_await(previous(callback_context, llm_request)) if previous else None
+        plan = copy.deepcopy(plan)
+        peer_tools = [name for name in llm_request.tools_dict if name.startswith(PEER_TOOL_PREFIX)]
+        parts = advance(plan, responses, peer_tools, settings)
+        callback_context.state[STATE_KEY] = plan
+        status = progress_text(plan)
+        log.info("[plan_executor] %s", status)
+        a2a_context = callback_context.state.get("a2a_context")
+        if a2a_context:
+            await component._publish_agent_status_signal_update(status, a2a_context)
+        if not parts:
+            return None  # all steps answered: the model writes the final answer
+        return LlmResponse(content=types.Content(role="model", parts=parts))
+
+    return before_model_callback
+
+def install_plan_executor(host_component) -> None:
+    """agent_init_function part: wrap SAM's ADK agent factory (idempotent)."""
+    from solace_agent_mesh.agent.sac import component as sac_component
+
+    original = sac_component.initialize_adk_agent
+    if getattr(original, "_plan_executor", False):
+        return
+
+    def initialize_adk_agent(component, *args, **kwargs):
+        agent = original(component, *args, **kwargs)
+        settings = _settings(component)
+        if settings is None:
+            return agent
+        previous_tool_cb = agent.after_tool_callback
+
+        async def after_tool_callback(tool, args, tool_context, tool_response):
+            result = await _maybe_await(previous_tool_cb(tool, args, tool_context, tool_response)) if previous_tool_cb else None
+            call_id = tool_context.function_call_id or ""
+            if call_id.startswith(CALL_ID_PREFIX):
+                plan = tool_context.state.get(STATE_KEY) or {}
+                timeout = next((s.get("timeout") for s in plan.get("steps", []) if s.get("call_id") == call_id), None)
+                if timeout:
+                    try:
+                        _shorten_peer_timeout(component, tool_context, timeout)
+                    except Exception as e:
+                        log.warning("[plan_executor] Could not set the branch timeout of %s: %s", call_id, e)
+            return result
+
+        agent.before_model_callback = plan_model_callback(component, settings, agent.before_model_callback)
+        agent.after_tool_callback = after_tool_callback
+        log.info(
+            "[plan_executor] %s runs plans as a DAG (max_parallel=%d, branch_timeout=%gs)",
+            component.get_config("agent_name"), settings["max_parallel"], settings["branch_timeout_seconds"],
+        )
+        return agent
+
+    initialize_adk_agent._plan_executor = True
+    sac_component.initialize_adk_agent = initialize_adk_agent
@@ -3,7 +3,9 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 from solace_ai_connector.common.log import log
+from src.tool_metrics import instrument_tool
 
+@instrument_tool
 async def create_project_plan(
     project_name: str,
     project_description: str,
@@ -86,6 +88,7 @@ async def create_project_plan(
     
     return result
 
+@instrument_tool
 async def track_project_progress(
     project_name: str,
     current_phase: str,
@@ -175,6 +178,7 @@ async def track_project_progress(
     
     return result
 
+@instrument_tool
 async def manage_stakeholders(
     project_name: str,
     stakeholder_groups: List[str] = None,
@@ -2,7 +2,10 @@
 from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
 from solace_ai_connector.common.log import log
+from src.description_analysis import analyze_description
+from src.tool_metrics import instrument_tool
 
+@instrument_tool
 async def gather_requirements(
     project_description: str,
     stakeholder_groups: List[str] = None,
@@ -77,6 +80,7 @@ async def gather_requirements(
     
     return result
 
+@instrument_tool
 async def analyze_requirements(
     requirements_list: List[str],
     project_constraints: List[str] = None,
@@ -146,6 +150,7 @@ async def analyze_requirements(
     
     return result
 
+@instrument_tool
 async def create_user_stories(
     requirements: List[str],
     user_personas: List[str] = None,
@@ -344,18 +349,8 @@ def generate_stakeholder_requirements(group: str, project_type: str, description
 
 def analyze_compliance_needs(description: str, requirements: List[str]) -> Dict[str, Any]:
     """Analyze compliance requirements based on project description."""
-    potential_compliance = []
-    
-    # Check for common compliance indicators
-    desc_lower = description.lower()
-    if any(term in desc_lower for term in ["healthcare", "medical", "patient"]):
-        potential_compliance.append("HIPAA")
-    if any(term in desc_lower for term in ["financial", "payment", "banking"]):
-        potential_compliance.append("PCI DSS")
-    if any(term in desc_lower for term in ["gdpr", "privacy", "personal data"]):
-        potential_compliance.append("GDPR")
-    if any(term in desc_lower for term in ["government", "federal", "security"]):
-        potential_compliance.append("FedRAMP")
+    # Compliance indicators come from the shared (cached) description parse
+    potential_compliance = list(analyze_description(description)["compliance"])
     
     return {
         "identified_compliance": potential_compliance,
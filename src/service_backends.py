@@ -0,0 +1,35 @@
+# Extra ADK service types for SAM agents
+#
+# SAM picks session and artifact services from a fixed set of types. Agents
+# that want the repo's own backends point `agent_init_function` here; SAM runs
+# it before creating the agent's services, and it adds:
+#   session_service.type: "sqlite"               -> src.session_store
+#   artifact_service.type: "content_addressed"   -> src.artifact_store
+# Every other type is passed through to SAM unchanged.
+#
+# The hook is also the first repo code to run in the `sam run` process, so it
+# moves the already-configured loggers onto the queued logging pipeline
+# (src.logging_pipeline; LOG_PIPELINE=false keeps them synchronous).
+#
+# It also installs the LLM response cache (src.llm_cache) for agents whose
+# LiteLLM model config has a `response_cache` block, and the per-turn model
+# router (src.model_router) for agents with a `model_router` block, and the
+# structured-command fast path (src.fast_path) for agents with `fast_path`,
+# and DAG plan execution (src.plan_executor) for agents with `plan_execution`.
+from __future__ import annotations
+from src.artifact_store import install_artifact_backend
+from src.fast_path import install_fast_path
+from src.llm_cache import install_response_cache
+from src.logging_pipeline import install_logging_pipeline
+from src.model_router import install_model_router
+from src.plan_executor import install_plan_executor
+from src.session_store import install_session_backend
+
+def install_service_backends(host_component) -> None:
+    install_logging_pipeline()
+    install_session_backend(host_component)
+    install_artifact_backend(host_component)
+    install_response_cache(host_component)
+    install_model_router(host_component)
+    install_fast_path(host_component)
+    install_plan_executor(host_component)
@@ -0,0 +1,516 @@
+# Persistent session service: SQLite (WAL) behind a bounded in-memory LRU
+#
+# The in-memory session service keeps every session of every agent for the
+# life of the process and loses them all on restart. This service keeps only
+# recently used sessions in memory (LRU with an idle TTL) and persists every
+# session to a local SQLite database. Writes are queued and committed in
+# batches by a background thread, so appending an event never waits for disk.
+# App and user state stay in memory only while one of their sessions is
+# cached, so memory follows the cache size, not the number of users seen.
+#
+# SAM has no registry for session service types, so the "sqlite" type is
+# installed by `install_session_backend`, which runs from each agent's
+# agent_init_function (src.service_backends) before SAM creates its services.
+from __future__ import annotations
+import asyncio
+import atexit
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+from solace_ai_connector.common.log import log
+
+DEFAULT_CACHE_SIZE = 2048
+DEFAULT_TTL_SECONDS = 1800.0
+DEFAULT_FLUSH_INTERVAL = 0.25
+DEFAULT_FLUSH_BATCH = 256
+
+SessionKey = Tuple[str, str, str]
+ScopedState = Tuple[Dict[str, Any], Dict[str, Any]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    last_update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+def _session_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    # app:/user: keys live in their own tables and temp: keys are never stored
+    prefixes = (State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX)
+    return {k: v for k, v in state.items() if not k.startswith(prefixes)}
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+class _PendingWrites:
+    """Writes queued since the last flush, coalesced where later ones supersede earlier ones."""
+
+    def __init__(self):
+        self.deletes: List[SessionKey] = []
+        self.sessions: Dict[SessionKey, Tuple[str, float]] = {}
+        self.events: List[Tuple[str, str, str, str]] = []
+        self.app_states: Dict[str, str] = {}
+        self.user_states: Dict[Tuple[str, str], str] = {}
+
+    def __len__(self) -> int:
+        return len(self.deletes) + len(self.sessions) + len(self.events) + len(self.app_states) + len(self.user_states)
+
+class SqliteSessionService(BaseSessionService):
+    """ADK session service persisted to SQLite with an LRU/TTL cache in front.
+
+    Sessions handed out are copies, as with the in-memory service; the cached
+    copy is the one kept in sync with storage. Queued writes are flushed every
+    `flush_interval` seconds, when `flush_batch_size` writes are waiting, before
+    any read that has to go to disk, and at interpreter exit.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_batch_size: int = DEFAULT_FLUSH_BATCH,
+    ):
+        import sqlite3
+
+        self.db_path = Path(db_path).expanduser()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_size = max(1, int(cache_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self.flush_interval = float(flush_interval)
+        self.flush_batch_size = max(1, int(flush_batch_size))
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+
+        self._cache: "OrderedDict[SessionKey, Tuple[Session, float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Scoped state and how many cached sessions hold it; guarded by _cache_lock
+        self._app_state: Dict[str, Dict[str, Any]] = {}
+        self._user_state: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._app_refs: Dict[str, int] = {}
+        self._user_refs: Dict[Tuple[str, str], int] = {}
+
+        self._pending = _PendingWrites()
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="session-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # -----------------------------
+    # Cache
+    # -----------------------------
+    def _hold(self, key: SessionKey, delta: int) -> None:
+        # Drop scoped state once the last cached session of its app or user is gone
+        app_name, user_id = key[0], key[1]
+        refs = self._app_refs.get(app_name, 0) + delta
+        if refs > 0:
+            self._app_refs[app_name] = refs
+        else:
+            self._app_refs.pop(app_name, None)
+            self._app_state.pop(app_name, None)
+        refs = self._user_refs.get((app_name, user_id), 0) + delta
+        if refs > 0:
+            self._user_refs[(app_name, user_id)] = refs
+        else:
+            self._user_refs.pop((app_name, user_id), None)
+            self._user_state.pop((app_name, user_id), None)
+
+    def _evict(self, key: SessionKey) -> None:
+        if self._cache.pop(key, None) is not None:
+            self._hold(key, -1)
+
+    def _expire(self, now: float) -> None:
+        # Entries are in access order, so expired ones are all at the front
+        while self._cache:
+            key, (_, accessed) = next(iter(self._cache.items()))
+            if now - accessed <= self.ttl_seconds:
+                break
+            self._evict(key)
+
+    def _cache_get(self, key: SessionKey) -> Optional[Session]:
+        now = time.monotonic()
+        with self._cache_lock:
+            self._expire(now)
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            self._cache[key] = (entry[0], now)
+            self._cache.move_to_end(key)
+            return entry[0]
+
+    def _cache_put(self, key: SessionKey, session: Session) -> None:
+        now = time.monotonic()
+        with self._cache_lock:
+            if key not in self._cache:
+                self._hold(key, 1)
+            self._cache[key] = (session, now)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._evict(next(iter(self._cache)))
+            self._expire(now)
+
+    def cache_info(self) -> Dict[str, Any]:
+        with self._cache_lock, self._pending_lock:
+            return {
+                "cached_sessions": len(self._cache),
+                "cached_user_states": len(self._user_state),
+                "pending_writes": len(self._pending),
+            }
+
+    # -----------------------------
+    # Write-behind queue
+    # -----------------------------
+    def _queue(self, fn) -> None:
+        with self._pending_lock:
+            fn(self._pending)
+            full = len(self._pending) >= self.flush_batch_size
+        if full:
+            self._wake.set()
+
+    def _write_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                log.error("[session_store] Flush to %s failed: %s", self.db_path, e)
+            with self._cache_lock:
+                self._expire(time.monotonic())
+
+    def flush(self) -> int:
+        """Commit all queued writes in one transaction; returns how many were written."""
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, _PendingWrites()
+            if not len(batch):
+                return 0
+            with self._db_lock:
+                conn = self._conn
+                conn.execute("BEGIN")
+                try:
+                    if batch.deletes:
+                        conn.executemany("DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?", batch.deletes)
+                        conn.executemany("DELETE FROM events WHERE app_name=? AND user_id=? AND session_id=?", batch.deletes)
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO sessions (app_name, user_id, id, state, last_update_time) VALUES (?, ?, ?, ?, ?)",
+                        [(*key, state, ts) for key, (state, ts) in batch.sessions.items()],
+                    )
+                    conn.executemany(
+                        "INSERT INTO events (app_name, user_id, session_id, data) VALUES (?, ?, ?, ?)", batch.events
+                    )
+                    conn.executemany("INSERT OR REPLACE INTO app_states VALUES (?, ?)", list(batch.app_states.items()))
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO user_states VALUES (?, ?, ?)",
+                        [(app, user, state) for (app, user), state in batch.user_states.items()],
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            return len(batch)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    # -----------------------------
+    # Disk reads (worker thread)
+    # -----------------------------
+    def _load_session(self, key: SessionKey) -> Optional[Session]:
+        self.flush()
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT state, last_update_time FROM sessions WHERE app_name=? AND user_id=? AND id=?", key
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT data FROM events WHERE app_name=? AND user_id=? AND session_id=? ORDER BY seq", key
+            ).fetchall()
+        return Session(
+            app_name=key[0],
+            user_id=key[1],
+            id=key[2],
+            state=json.loads(row[0]),
+            events=[Event.model_validate_json(r[0]) for r in rows],
+            last_update_time=row[1],
+        )
+
+    def _load_scoped_state(self, app_name: str, user_id: str) -> ScopedState:
+        # State dropped with its last session may still have queued writes
+        self.flush()
+        with self._db_lock:
+            row = self._conn.execute("SELECT state FROM app_states WHERE app_name=?", (app_name,)).fetchone()
+            app_state = json.loads(row[0]) if row else {}
+            row = self._conn.execute(
+                "SELECT state FROM user_states WHERE app_name=? AND user_id=?", (app_name, user_id)
+            ).fetchone()
+            user_state = json.loads(row[0]) if row else {}
+        with self._cache_lock:
+            return (
+                self._app_state.setdefault(app_name, app_state),
+                self._user_state.setdefault((app_name, user_id), user_state),
+            )
+
+    async def _scoped_state(self, app_name: str, user_id: str) -> ScopedState:
+        """The app and user state dicts, loaded from disk if no cached session holds them."""
+        with self._cache_lock:
+            app_state = self._app_state.get(app_name)
+            user_state = self._user_state.get((app_name, user_id))
+        if app_state is None or user_state is None:
+            return await asyncio.to_thread(self._load_scoped_state, app_name, user_id)
+        return app_state, user_state
+
+    @staticmethod
+    def _merge_state(session: Session, scoped: ScopedState) -> Session:
+        app_state, user_state = scoped
+        for key, value in app_state.items():
+            session.state[State.APP_PREFIX + key] = value
+        for key, value in user_state.items():
+            session.state[State.USER_PREFIX + key] = value
+        return session
+
+    # -----------------------------
+    # BaseSessionService
+    # -----------------------------
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=_session_state(state or {}),
+            last_update_time=time.time(),
+        )
+        key = (app_name, user_id, session_id)
+        self._cache_put(key, session)
+        app_state, user_state = scoped_state = await self._scoped_state(app_name, user_id)
+        app_state_json = user_state_json = None
+        scoped = {k: v for k, v in (state or {}).items() if k.startswith((State.APP_PREFIX, State.USER_PREFIX))}
+        if scoped:
+            for k, v in scoped.items():
+                if k.startswith(State.APP_PREFIX):
+                    app_state[k.removeprefix(State.APP_PREFIX)] = v
+                else:
+                    user_state[k.removeprefix(State.USER_PREFIX)] = v
+            if any(k.startswith(State.APP_PREFIX) for k in scoped):
+                app_state_json = _dumps(app_state)
+            if any(k.startswith(State.USER_PREFIX) for k in scoped):
+                user_state_json = _dumps(user_state)
+        state_json = _dumps(session.state)
+
+        def _write(p: _PendingWrites) -> None:
+            # Re-creating an id replaces the old session and its events
+            p.deletes.append(key)
+            p.events = [e for e in p.events if e[:3] != key]
+            p.sessions[key] = (state_json, session.last_update_time)
+            # Queued together, so they are committed in the same flush transaction
+            if app_state_json is not None:
+                p.app_states[app_name] = app_state_json
+            if user_state_json is not None:
+                p.user_states[(app_name, user_id)] = user_state_json
+
+        self._queue(_write)
+        return self._merge_state(session.model_copy(deep=True), scoped_state)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        session = self._cache_get(key)
+        if session is None:
+            session = await asyncio.to_thread(self._load_session, key)
+            if session is None:
+                return None
+            self._cache_put(key, session)
+
+        copied = session.model_copy(deep=True)
+        if config:
+            if config.num_recent_events:
+                copied.events = copied.events[-config.num_recent_events:]
+            if config.after_timestamp:
+                i = len(copied.events) - 1
+                while i >= 0 and copied.events[i].timestamp >= config.after_timestamp:
+                    i -= 1
+                copied.events = copied.events[i + 1:]
+        return self._merge_state(copied, await self._scoped_state(app_name, user_id))
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        def _list() -> List[Session]:
+            self.flush()
+            with self._db_lock:
+                rows = self._conn.execute(
+                    "SELECT id, last_update_time FROM sessions WHERE app_name=? AND user_id=?", (app_name, user_id)
+                ).fetchall()
+            return [
+                Session(app_name=app_name, user_id=user_id, id=sid, state={}, last_update_time=ts)
+                for sid, ts in rows
+            ]
+
+        return ListSessionsResponse(sessions=await asyncio.to_thread(_list))
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        with self._cache_lock:
+            self._evict(key)
+
+        def _write(p: _PendingWrites) -> None:
+            p.sessions.pop(key, None)
+            p.events = [e for e in p.events if e[:3] != key]
+            p.deletes.append(key)
+
+        self._queue(_write)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        key = (session.app_name, session.user_id, session.id)
+        storage = self._cache_get(key)
+        if storage is None:
+            storage = await asyncio.to_thread(self._load_session, key)
+            if storage is None:
+                log.warning("[session_store] Failed to append event: session %s not found", session.id)
+                return event
+            self._cache_put(key, storage)
+        if storage is not session:
+            await super().append_event(session=storage, event=event)
+        storage.last_update_time = event.timestamp
+
+        app_state_json = user_state_json = None
+        delta = event.actions.state_delta if event.actions else None
+        if delta:
+            app_state, user_state = await self._scoped_state(session.app_name, session.user_id)
+            app_changed = user_changed = False
+            for k, v in delta.items():
+                if k.startswith(State.APP_PREFIX):
+                    app_state[k.removeprefix(State.APP_PREFIX)] = v
+                    app_changed = True
+                elif k.startswith(State.USER_PREFIX):
+                    user_state[k.removeprefix(State.USER_PREFIX)] = v
+                    user_changed = True
+            if app_changed:
+                app_state_json = _dumps(app_state)
+            if user_changed:
+                user_state_json = _dumps(user_state)
+
+        state_json = _dumps(_session_state(storage.state))
+        event_json = event.model_dump_json(exclude_none=True)
+
+        def _write(p: _PendingWrites) -> None:
+            p.sessions[key] = (state_json, storage.last_update_time)
+            p.events.append((*key, event_json))
+            if app_state_json is not None:
+                p.app_states[session.app_name] = app_state_json
+            if user_state_json is not None:
+                p.user_states[(session.app_name, session.user_id)] = user_state_json
+
+        self._queue(_write)
+        return event
+
+# -----------------------------
+# SAM wiring
+# -----------------------------
+_SERVICES: Dict[str, SqliteSessionService] = {}
+_SERVICES_LOCK = threading.Lock()
+
+def session_service_from_config(config: Dict[str, Any]) -> SqliteSessionService:
+    """Build (or reuse) the service for a session_service config block.
+
+    Agents started by one `sam run` share the service for a given db_path, so
+    the database has a single connection and writer thread per process.
+    """
+    db_path = str(Path(config.get("db_path") or "/tmp/samv2/sessions.db").expanduser().resolve())
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(db_path)
+        if service is None:
+            service = SqliteSessionService(
+                db_path,
+                cache_size=int(config.get("cache_size", DEFAULT_CACHE_SIZE)),
+                ttl_seconds=float(config.get("ttl_seconds", DEFAULT_TTL_SECONDS)),
+                flush_interval=float(config.get("flush_interval_ms", DEFAULT_FLUSH_INTERVAL * 1000)) / 1000.0,
+                flush_batch_size=int(config.get("flush_batch_size", DEFAULT_FLUSH_BATCH)),
+            )
+            _SERVICES[db_path] = service
+            log.info("[session_store] SQLite session store at %s (cache %d, ttl %.0fs)", db_path, service.cache_size, service.ttl_seconds)
+        return service
+
+def install_session_backend(host_component) -> None:
+    """agent_init_function that adds the "sqlite" session_service type.
+
+    SAM calls the init function before it creates the agent's services, so
+    wrapping its factory here is enough; every other type is passed through.
+    """
+    from solace_agent_mesh.agent.sac import component as sac_component
+
+    original = sac_component.initialize_session_service
+    if getattr(original, "_sqlite_session_backend", False):
+        return
+
+    def initialize_session_service(component) -> BaseSessionService:
+        config = component.get_config("session_service", {}) or {}
+        if str(config.get("type", "")).lower() == "sqlite":
+            return session_service_from_config(config)
+        return original(component)
+
+    initialize_session_service._sqlite_session_backend = True
+    sac_component.initialize_session_service = initialize_session_service
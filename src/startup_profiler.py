@@ -0,0 +1,268 @@
+# Startup profiler for the agent mesh
+#
+# `sam run` loads every config into one process, so the time to the first ready
+# agent is the config parsing, the SAM stack import, each app's tool module
+# import and the broker connection, one after the other. This script measures
+# each part per app without starting the mesh:
+#
+#   python -m src.startup_profiler                      # all configs/agents/*.yaml
+#   python -m src.startup_profiler configs/agents/architect_agent.yaml --repeat 5
+#
+# Imports are measured in fresh interpreters with `-X importtime`; the tool
+# module import is measured after the SAM stack is loaded, which is the
+# incremental cost it adds in the real process. The report is written as JSON
+# under $ARTIFACT_BASE_PATH/startup_reports/ (or --output).
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CONFIG_GLOB = "configs/agents/*.yaml"
+DEFAULT_SAM_APP_MODULE = "solace_agent_mesh.agent.sac.app"
+BROKER_DEFAULT_PORTS = {"ws": 80, "wss": 443, "http": 80, "https": 443, "tcp": 55555, "tcps": 55443, "smf": 55555, "smfs": 55443}
+TOP_DEPENDENCIES = 8
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_MARKER = "@@startup_profiler@@"
+
+# -----------------------------
+# Config parsing
+# -----------------------------
+def parse_config(path: Path) -> Tuple[Dict[str, Any], float]:
+    """Load a config exactly as `sam run` does (includes + env defaults) and time it."""
+    from solace_ai_connector.main import expandvars_with_defaults, process_includes
+    import yaml
+
+    started = time.perf_counter()
+    text = expandvars_with_defaults(process_includes(str(path), str(path.parent)))
+    config = yaml.safe_load(text) or {}
+    return config, (time.perf_counter() - started) * 1000.0
+
+def app_modules(app: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """The app's framework module and the python tool modules it imports."""
+    app_config = app.get("app_config") or {}
+    tool_modules: List[str] = []
+    for tool in app_config.get("tools") or []:
+        if not isinstance(tool, dict):
+            continue
+        module = tool.get("component_module")
+        if tool.get("tool_type") == "python" and module and module not in tool_modules:
+            tool_modules.append(module)
+    return app.get("app_module") or DEFAULT_SAM_APP_MODULE, tool_modules
+
+# -----------------------------
+# Import timing
+# -----------------------------
+def parse_importtime(stderr: str) -> Tuple[List[List[Dict[str, Any]]], List[str]]:
+    """Split `-X importtime` output into sections at each marker line.
+
+    Each entry has self/cumulative microseconds, nesting depth and module name;
+    the second list holds the import error text of each section ('' if none).
+    """
+    sections: List[List[Dict[str, Any]]] = [[]]
+    errors: List[str] = []
+    for line in stderr.splitlines():
+        if line.startswith(_MARKER):
+            errors.append(line[len(_MARKER):].strip())
+            sections.append([])
+            continue
+        m = _IMPORTTIME_LINE.match(line)
+        if m:
+            sections[-1].append({
+                "self_us": int(m.group(1)),
+                "cumulative_us": int(m.group(2)),
+                "depth": len(m.group(3)) // 2,
+                "module": m.group(4),
+            })
+    return sections, errors
+
+def summarize_section(entries: List[Dict[str, Any]], top_n: int = TOP_DEPENDENCIES) -> Dict[str, Any]:
+    """Total import time of a section and its self time grouped by top-level package."""
+    total_us = sum(e["cumulative_us"] for e in entries if e["depth"] == 0)
+    by_package: Dict[str, int] = {}
+    for e in entries:
+        package = e["module"].split(".")[0]
+        by_package[package] = by_package.get(package, 0) + e["self_us"]
+    top = sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top_n]
+    return {
+        "import_ms": round(total_us / 1000.0, 2),
+        "modules_imported": len(entries),
+        "top_dependencies": [{"package": p, "self_ms": round(us / 1000.0, 2)} for p, us in top],
+    }
+
+def measure_imports(app_module: str, tool_modules: List[str], cwd: Path) -> Dict[str, Any]:
+    """Import the SAM app module, then each tool module, in one fresh interpreter."""
+    # A module that fails to import is recorded on its marker line and the rest still run
+    script = "import importlib, sys\n"
+    for module in [app_module] + tool_modules:
+        script += (
+            f"try:\n    importlib.import_module({module!r}); err = ''\n"
+            "except Exception as e:\n    err = f'{type(e).__name__}: {e}'.replace('\\n', ' ')\n"
+            f"sys.stderr.write({_MARKER!r} + err + '\\n'); sys.stderr.flush()\n"
+        )
+    env = dict(os.environ, TOOL_HOT_RELOAD="false")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(cwd), env.get("PYTHONPATH", "")) if p)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=str(cwd), env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000.0
+
+    sections, errors = parse_importtime(proc.stderr)
+    if len(errors) < len(tool_modules) + 1:
+        return {"error": f"Import run ended early (exit code {proc.returncode})"}
+
+    def _section(i: int) -> Dict[str, Any]:
+        summary = summarize_section(sections[i])
+        if errors[i]:
+            summary["error"] = errors[i]
+        return summary
+
+    return {
+        "interpreter_wall_ms": round(wall_ms, 2),
+        "sam_stack": _section(0),
+        "tool_modules": [{"module": module, **_section(i + 1)} for i, module in enumerate(tool_modules)],
+    }
+
+def median_run(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The run whose total tool import time is the median of all runs."""
+    ok = [r for r in runs if "error" not in r]
+    if not ok:
+        return runs[0]
+    ok.sort(key=lambda r: r["sam_stack"]["import_ms"] + sum(t["import_ms"] for t in r["tool_modules"]))
+    return ok[len(ok) // 2]
+
+# -----------------------------
+# Broker connection
+# -----------------------------
+def measure_broker_connect(broker: Dict[str, Any], timeout: float = 5.0) -> Dict[str, Any]:
+    """Time a TCP connect to the broker URL; skipped in dev mode (in-process broker)."""
+    if str(broker.get("dev_mode", "false")).lower() == "true":
+        return {"skipped": "dev_mode"}
+    url = broker.get("broker_url") or ""
+    parsed = urlparse(url if "://" in url else f"tcp://{url}")
+    host = parsed.hostname
+    if not host:
+        return {"error": f"Cannot parse broker_url '{url}'"}
+    port = parsed.port or BROKER_DEFAULT_PORTS.get(parsed.scheme, 55555)
+    started = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            pass
+    except OSError as e:
+        return {"broker_url": url, "error": f"{type(e).__name__}: {e}"}
+    return {"broker_url": url, "tcp_connect_ms": round((time.perf_counter() - started) * 1000.0, 2)}
+
+# -----------------------------
+# Report
+# -----------------------------
+def profile_startup(config_paths: List[Path], repeat: int = 1, cwd: Path = REPO_ROOT) -> Dict[str, Any]:
+    apps: List[Dict[str, Any]] = []
+    broker_timings: Dict[str, Dict[str, Any]] = {}
+    # Pay for the loader's own imports before timing the first config
+    parse_config(config_paths[0])
+
+    for path in config_paths:
+        config, parse_ms = parse_config(path)
+        for app in config.get("apps") or []:
+            app_module, tool_modules = app_modules(app)
+            runs = [measure_imports(app_module, tool_modules, cwd) for _ in range(max(1, repeat))]
+            broker = app.get("broker") or {}
+            broker_key = str(broker.get("broker_url"))
+            if broker_key not in broker_timings:
+                broker_timings[broker_key] = measure_broker_connect(broker)
+            apps.append({
+                "app": app.get("name", path.stem),
+                "config": str(path),
+                "config_parse_ms": round(parse_ms, 2),
+                "app_module": app_module,
+                **median_run(runs),
+                "broker_connect": broker_timings[broker_key],
+            })
+
+    tool_ms = [t["import_ms"] for a in apps for t in a.get("tool_modules", [])]
+    stack_ms = [a["sam_stack"]["import_ms"] for a in apps if "sam_stack" in a]
+    return {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "summary": {
+            "apps": len(apps),
+            "config_parse_ms_total": round(sum(a["config_parse_ms"] for a in apps), 2),
+            "sam_stack_import_ms_median": round(statistics.median(stack_ms), 2) if stack_ms else None,
+            "tool_import_ms_total": round(sum(tool_ms), 2),
+            "slowest_tool_modules": sorted(
+                ({"app": a["app"], "module": t["module"], "import_ms": t["import_ms"]}
+                 for a in apps for t in a.get("tool_modules", [])),
+                key=lambda t: t["import_ms"], reverse=True,
+            )[:5],
+        },
+        "apps": apps,
+    }
+
+def default_output() -> Path:
+    base = Path(os.environ.get("ARTIFACT_BASE_PATH", "/tmp/samv2"))
+    return base / "startup_reports" / f"startup-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
+
+def format_table(report: Dict[str, Any]) -> str:
+    lines = [f"{'app':<28}{'config ms':>10}{'sam ms':>10}{'tools ms':>10}  broker"]
+    for a in report["apps"]:
+        broker = a["broker_connect"]
+        broker_text = (
+            f"{broker['tcp_connect_ms']} ms" if "tcp_connect_ms" in broker
+            else broker.get("skipped") or broker.get("error", "")
+        )
+        if "error" in a:
+            lines.append(f"{a['app']:<28}{a['config_parse_ms']:>10}  measurement failed: {a['error']}")
+            continue
+        tools = sum(t["import_ms"] for t in a["tool_modules"])
+        lines.append(
+            f"{a['app']:<28}{a['config_parse_ms']:>10}{a['sam_stack']['import_ms']:>10}{tools:>10.2f}  {broker_text}"
+        )
+        failed = [("sam stack", a["sam_stack"])] + [(t["module"], t) for t in a["tool_modules"]]
+        lines.extend(f"    ! {name}: {entry['error']}" for name, entry in failed if "error" in entry)
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile agent mesh startup per app")
+    parser.add_argument("configs", nargs="*", help=f"Config files (default: {DEFAULT_CONFIG_GLOB})")
+    parser.add_argument("--repeat", type=int, default=1, help="Import measurements per app; the median run is reported")
+    parser.add_argument("--output", help="Report path (default: $ARTIFACT_BASE_PATH/startup_reports/...)")
+    args = parser.parse_args(argv)
+
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(REPO_ROOT / ".env")
+    except ImportError:
+        pass
+
+    paths = [Path(p) for p in args.configs] or [Path(p) for p in sorted(glob.glob(str(REPO_ROOT / DEFAULT_CONFIG_GLOB)))]
+    if not paths:
+        print("No config files found", file=sys.stderr)
+        return 1
+
+    report = profile_startup(paths, repeat=args.repeat)
+    output = Path(args.output) if args.output else default_output()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(format_table(report))
+    print(f"\nReport written to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,488 @@
+# Offline benchmark suite for the agent tools
+#
+# Calls every tool of the requirements, program manager, hiring, architect and
+# scaffolder agents directly, with synthetic inputs of growing size, and
+# records wall time and peak Python memory per call. No broker, LLM or SAM
+# runtime is needed: a stub tool_context provides an in-memory artifact
+# service and a scratch directory the scaffolder writes into.
+#
+#   python -m src.tool_benchmark                          # sizes 10, 1k, 100k
+#   python -m src.tool_benchmark --sizes 10,1000,100000,1000000 --only architect
+#   python -m src.tool_benchmark --update-baselines
+#
+# "Size" is the length of every variable input of a tool: words of a project
+# description, items of a list, services of a graph, generated tool functions.
+# Time is the median of --repeat runs (without tracemalloc), after one untimed
+# warm-up run; peak memory comes from one extra traced run. Each run gets fresh input, so per-description
+# caches are always cold.
+#
+# Each tool runs in its own interpreter. Sizes it is expected (by linear
+# extrapolation) to need more than --max-seconds per call for are skipped, and
+# the interpreter is killed when a size overruns its budget anyway, so a
+# quadratic tool costs minutes rather than hours. Results are compared with
+# benchmarks/tool_baselines.json; the exit code is 1 when a tool got slower or
+# bigger than the thresholds allow. The subprocess import check of scaffolded
+# modules is off (it costs an interpreter start per module and can't import
+# from the scratch directory).
+from __future__ import annotations
+import argparse
+import asyncio
+import importlib
+import importlib.util
+import json
+import os
+import platform
+import queue
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINES = REPO_ROOT / "benchmarks" / "tool_baselines.json"
+DEFAULT_SIZES = (10, 1000, 100000)
+DEFAULT_TIME_THRESHOLD = 1.5
+DEFAULT_MEMORY_THRESHOLD = 1.25
+DEFAULT_MAX_SECONDS = 30.0
+# A size (timed runs plus the traced one) is killed after this many times --max-seconds
+SIZE_BUDGET_FACTOR = 4
+WORKER_START_TIMEOUT = 120.0
+# Differences below these are noise, whatever the ratio
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 256 * 1024
+_MARKER = "@@tool_benchmark@@"
+
+_WORDS = (
+    "platform", "customer", "portal", "payment", "api", "scale", "secure", "real-time",
+    "dashboard", "healthcare", "patient", "mobile", "analytics", "integration", "reporting",
+    "search", "notification", "workflow", "gdpr", "inventory", "billing", "audit", "export",
+)
+
+# -----------------------------
+# Stub framework
+# -----------------------------
+class StubToolContext:
+    """The parts of ADK's ToolContext the tools use."""
+
+    def __init__(self, base_path: Path):
+        from google.adk.artifacts import InMemoryArtifactService
+
+        self.app_base_path = str(base_path)
+        self.state: Dict[str, Any] = {}
+        self._invocation_context = SimpleNamespace(
+            app_name="benchmark",
+            user_id="benchmark-user",
+            session=SimpleNamespace(id="benchmark-session"),
+            artifact_service=InMemoryArtifactService(),
+        )
+
+    async def save_artifact(self, filename: str, data: bytes, mime_type: str) -> None:
+        from google.genai import types
+
+        inv = self._invocation_context
+        await inv.artifact_service.save_artifact(
+            app_name=inv.app_name,
+            user_id=inv.user_id,
+            session_id=inv.session.id,
+            filename=filename,
+            artifact=types.Part.from_bytes(data=data, mime_type=mime_type),
+        )
+
+# -----------------------------
+# Synthetic inputs
+# -----------------------------
+def _text(n: int, rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+def _items(prefix: str, n: int, rng: random.Random) -> List[str]:
+    return [f"{prefix} {i} {rng.choice(_WORDS)} {rng.choice(_WORDS)}" for i in range(n)]
+
+def _tool_specs(n: int, tag: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "function_name": f"{tag}_tool_{i}",
+            "description": f"Synthetic tool {i}.",
+            "params": [
+                {"name": "text", "type": "str", "description": "Input text."},
+                {"name": "limit", "type": "int", "default": 10, "description": "Item cap."},
+            ],
+            "returns": {"type": "dict", "description": "Result payload."},
+        }
+        for i in range(n)
+    ]
+
+def _service_graph(n: int, rng: random.Random) -> bytes:
+    services = []
+    for i in range(n):
+        deps = [f"svc-{rng.randrange(n)}" for _ in range(min(3, n - 1))]
+        services.append({"name": f"svc-{i}", "depends_on": [{"name": d, "type": rng.choice(("sync", "async"))} for d in deps]})
+    return json.dumps({"services": services}).encode("utf-8")
+
+def _openapi_spec(n: int) -> bytes:
+    paths = {}
+    for i in range(n):
+        paths[f"/items{i}/{{item_id}}"] = {
+            "get": {
+                "operationId": f"getItem{i}",
+                "summary": f"Fetch item {i}",
+                "parameters": [
+                    {"name": "item_id", "in": "path", "required": True, "schema": {"type": "string"}},
+                    {"name": "verbose", "in": "query", "schema": {"type": "boolean"}},
+                ],
+            }
+        }
+    doc = {"openapi": "3.0.0", "info": {"title": "Bench", "version": "1"}, "servers": [{"url": "http://localhost:9"}], "paths": paths}
+    return json.dumps(doc).encode("utf-8")
+
+# -----------------------------
+# Cases
+# -----------------------------
+@dataclass
+class Run:
+    tool_context: StubToolContext
+    n: int
+    rng: random.Random
+    tag: str
+
+# Builds the keyword arguments of one call; may save artifacts or write files (not timed)
+Setup = Callable[[Run], Awaitable[Dict[str, Any]]]
+
+@dataclass
+class Case:
+    agent: str
+    tool: str
+    setup: Setup
+
+    @property
+    def name(self) -> str:
+        return f"{self.agent}/{self.tool}"
+
+    def function(self) -> Callable[..., Awaitable[Dict[str, Any]]]:
+        module = importlib.import_module(f"src.{self.agent}.tools")
+        return getattr(module, self.tool)
+
+def _kwargs(build: Callable[[Run], Dict[str, Any]]) -> Setup:
+    async def setup(run: Run) -> Dict[str, Any]:
+        return build(run)
+    return setup
+
+async def _graph_setup(run: Run) -> Dict[str, Any]:
+    filename = f"{run.tag}.json"
+    await run.tool_context.save_artifact(filename, _service_graph(run.n, run.rng), "application/json")
+    return {"graph_artifact": filename}
+
+async def _openapi_setup(run: Run) -> Dict[str, Any]:
+    filename = f"{run.tag}.json"
+    await run.tool_context.save_artifact(filename, _openapi_spec(run.n), "application/json")
+    return {"agent_name": run.tag, "spec_artifact": filename}
+
+async def _reload_setup(run: Run) -> Dict[str, Any]:
+    from src.agent_scaffolder.tools import define_dynamic_tools
+
+    result = await define_dynamic_tools(run.tag, _tool_specs(run.n, "v1"), tool_context=run.tool_context)
+    module_name = result["module_path"]
+    spec = importlib.util.spec_from_file_location(module_name, result["py_file"])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return {"agent_name": run.tag}
+
+def _batch_agents(run: Run) -> List[Dict[str, Any]]:
+    per_agent = 100
+    return [
+        {"agent_name": f"{run.tag}_{a}", "tools": _tool_specs(min(per_agent, run.n - start), "t")}
+        for a, start in enumerate(range(0, run.n, per_agent))
+    ]
+
+CASES: List[Case] = [
+    Case("requirements_agent", "gather_requirements", _kwargs(lambda r: {
+        "project_description": _text(r.n, r.rng),
+        "stakeholder_groups": _items("stakeholder", r.n, r.rng),
+        "compliance_requirements": _items("regulation", r.n, r.rng),
+    })),
+    Case("requirements_agent", "analyze_requirements", _kwargs(lambda r: {
+        "requirements_list": _items("requirement", r.n, r.rng),
+        "project_constraints": _items("constraint", r.n, r.rng),
+    })),
+    Case("requirements_agent", "create_user_stories", _kwargs(lambda r: {
+        "requirements": _items("requirement", r.n, r.rng),
+        "user_personas": _items("persona", r.n, r.rng),
+    })),
+    Case("program_manager_agent", "create_project_plan", _kwargs(lambda r: {
+        "project_name": r.tag, "project_description": _text(r.n, r.rng),
+    })),
+    Case("program_manager_agent", "track_project_progress", _kwargs(lambda r: {
+        "project_name": r.tag, "current_phase": "development",
+        "completed_tasks": r.n // 2, "total_tasks": r.n, "blockers": _items("blocker", r.n, r.rng),
+    })),
+    Case("program_manager_agent", "manage_stakeholders", _kwargs(lambda r: {
+        "project_name": r.tag,
+        "stakeholder_groups": _items("stakeholder", r.n, r.rng),
+        "upcoming_decisions": _items("decision", r.n, r.rng),
+    })),
+    Case("hiring_manager", "create_job_description", _kwargs(lambda r: {
+        "role_title": "Senior Engineer", "department": "Engineering",
+        "required_skills": _items("skill", r.n, r.rng), "nice_to_have_skills": _items("bonus", r.n, r.rng),
+    })),
+    Case("hiring_manager", "design_screening_process", _kwargs(lambda r: {
+        "role_type": "engineering", "skills_to_assess": _items("skill", r.n, r.rng),
+    })),
+    Case("hiring_manager", "analyze_team_needs", _kwargs(lambda r: {
+        "project_description": _text(r.n, r.rng), "current_team_size": 5,
+        "current_skills": _items("skill", r.n, r.rng),
+    })),
+    Case("architect_agent", "create_architecture_diagram", _kwargs(lambda r: {
+        "requirements": _text(r.n, r.rng), "system_type": "microservices", "scale": "large",
+    })),
+    Case("architect_agent", "analyze_requirements", _kwargs(lambda r: {
+        "project_description": _text(r.n, r.rng),
+        "constraints": _items("constraint", r.n, r.rng),
+        "performance_requirements": {f"metric_{i}": i for i in range(r.n)},
+    })),
+    Case("architect_agent", "recommend_technology_stack", _kwargs(lambda r: {
+        "project_type": "web", "team_expertise": _items("expertise", r.n, r.rng),
+    })),
+    Case("architect_agent", "plan_capacity", _kwargs(lambda r: {
+        "target_rps": 500.0, "p95_latency_ms": 250.0,
+        "service_times_ms": {f"tier-{i}": 1.0 + r.rng.random() * 20 for i in range(r.n)},
+        "max_instances": 100000,
+    })),
+    Case("architect_agent", "analyze_service_dependencies", _graph_setup),
+    Case("agent_scaffolder", "define_dynamic_tools", _kwargs(lambda r: {
+        "agent_name": r.tag, "tools": _tool_specs(r.n, "t"),
+    })),
+    Case("agent_scaffolder", "define_dynamic_tools_batch", _kwargs(lambda r: {"agents": _batch_agents(r)})),
+    Case("agent_scaffolder", "reload_agent_tools", _reload_setup),
+    Case("agent_scaffolder", "generate_openapi_tools", _openapi_setup),
+]
+
+# -----------------------------
+# Measurement
+# -----------------------------
+async def _call(case: Case, tool_context: StubToolContext, n: int, tag: str, traced: bool) -> Dict[str, Any]:
+    run = Run(tool_context=tool_context, n=n, rng=random.Random(f"{case.name}:{n}:{tag}"), tag=tag)
+    kwargs = await case.setup(run)
+    func = case.function()
+    if traced:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        result = await func(**kwargs, tool_context=tool_context)
+    finally:
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if traced else None
+        if traced:
+            tracemalloc.stop()
+        for module_name in [m for m in sys.modules if m.startswith(f"src.{tag}")]:
+            del sys.modules[module_name]
+    status = result.get("status") if isinstance(result, dict) else None
+    return {"seconds": elapsed, "peak_bytes": peak, "status": status}
+
+async def benchmark_case(case: Case, tool_context: StubToolContext, n: int, repeat: int, max_seconds: float) -> Dict[str, Any]:
+    # Untimed warm-up: first-call costs (imports, catalog builds) stay out of the median
+    await _call(case, tool_context, n, f"bench_{case.tool}_{n}_warmup", traced=False)
+    times, status = [], None
+    for i in range(max(1, repeat)):
+        outcome = await _call(case, tool_context, n, f"bench_{case.tool}_{n}_{i}", traced=False)
+        times.append(outcome["seconds"])
+        status = outcome["status"]
+        if sum(times) > max_seconds:
+            break
+    traced = await _call(case, tool_context, n, f"bench_{case.tool}_{n}_traced", traced=True)
+    return {
+        "seconds": round(statistics.median(times), 6),
+        "peak_bytes": traced["peak_bytes"],
+        "status": status,
+    }
+
+def compare(results: Dict[str, Dict[str, Any]], baselines: Dict[str, Dict[str, Any]],
+            time_threshold: float, memory_threshold: float) -> List[Dict[str, Any]]:
+    """Entries that regressed against their baseline beyond the thresholds."""
+    regressions = []
+    for case_name, sizes in results.items():
+        for size, current in sizes.items():
+            base = (baselines.get(case_name) or {}).get(size)
+            if not base or "seconds" not in current:
+                continue
+            checks = (
+                ("seconds", time_threshold, MIN_TIME_DELTA),
+                ("peak_bytes", memory_threshold, MIN_MEMORY_DELTA),
+            )
+            for metric, threshold, min_delta in checks:
+                was, now = base.get(metric), current.get(metric)
+                if was is None or now is None:
+                    continue
+                if now > was * threshold and now - was > min_delta:
+                    regressions.append({
+                        "case": case_name, "size": size, "metric": metric,
+                        "baseline": was, "current": now, "ratio": round(now / was, 2) if was else None,
+                    })
+    return regressions
+
+async def run_case(case: Case, scratch: Path, sizes: List[int], repeat: int, max_seconds: float) -> None:
+    """Worker side: measure one case at every size, printing one result line per size."""
+    tool_context = StubToolContext(scratch / "scaffold")
+    case.function()  # imports are not part of any size's budget
+    print(_MARKER + json.dumps({"ready": True}), flush=True)
+    previous = None
+    for n in sorted(sizes):
+        # Linear extrapolation is a lower bound for every tool here
+        if previous is not None and previous[1] * n / previous[0] > max_seconds:
+            estimate = previous[1] * n / previous[0]
+            entry: Dict[str, Any] = {"skipped": f"estimated at over {estimate:.0f}s from size {previous[0]}"}
+        else:
+            entry = await benchmark_case(case, tool_context, n, repeat, max_seconds)
+            previous = (n, entry["seconds"])
+        print(_MARKER + json.dumps({"size": n, **entry}), flush=True)
+
+def _print_entry(case_name: str, n: int, entry: Dict[str, Any]) -> None:
+    if "seconds" in entry:
+        peak = entry["peak_bytes"] / 1024 / 1024
+        print(f"{case_name:<52} {n:>9}  {entry['seconds'] * 1000:>11.2f} ms  {peak:>9.2f} MiB  {entry['status']}", flush=True)
+    else:
+        print(f"{case_name:<52} {n:>9}  {entry.get('skipped') or entry.get('error')}", flush=True)
+
+def run_worker(case: Case, sizes: List[int], repeat: int, max_seconds: float) -> Dict[str, Dict[str, Any]]:
+    """Run one case in a fresh interpreter, killed when a size overruns its budget."""
+    budget = max_seconds * SIZE_BUDGET_FACTOR
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = sorted(sizes)
+    scratch = Path(tempfile.mkdtemp(prefix="tool_benchmark_"))
+    cmd = [
+        sys.executable, "-m", "src.tool_benchmark", "--worker", case.name, "--scratch", str(scratch),
+        "--sizes", ",".join(str(n) for n in pending), "--repeat", str(repeat), "--max-seconds", str(max_seconds),
+    ]
+    lines: "queue.Queue[Optional[str]]" = queue.Queue()
+    try:
+        with open(scratch / "worker.log", "w+", encoding="utf-8") as worker_log:
+            proc = subprocess.Popen(cmd, cwd=str(REPO_ROOT), stdout=subprocess.PIPE, stderr=worker_log, text=True)
+
+            def _pump() -> None:
+                for line in proc.stdout:
+                    if line.startswith(_MARKER):
+                        lines.put(line[len(_MARKER):])
+                lines.put(None)
+
+            threading.Thread(target=_pump, daemon=True).start()
+            waiting_for_start = True
+            while pending:
+                try:
+                    line = lines.get(timeout=WORKER_START_TIMEOUT if waiting_for_start else budget)
+                except queue.Empty:
+                    proc.kill()
+                    if waiting_for_start:
+                        line = f"worker did not start within {WORKER_START_TIMEOUT:g}s"
+                    else:
+                        line = f"size {pending[0]} did not finish within {budget:g}s"
+                    results.update({str(n): {"skipped": line} for n in pending})
+                    _print_entry(case.name, pending[0], {"skipped": line})
+                    break
+                if line is None:
+                    proc.wait()
+                    worker_log.seek(0)
+                    tail = " | ".join(worker_log.read().strip().splitlines()[-3:])
+                    error = tail or f"worker exited with code {proc.returncode}"
+                    results.update({str(n): {"error": error} for n in pending})
+                    _print_entry(case.name, pending[0], {"error": error})
+                    break
+                entry = json.loads(line)
+                if waiting_for_start:
+                    waiting_for_start = False
+                    continue
+                n = entry.pop("size")
+                pending.remove(n)
+                results[str(n)] = entry
+                _print_entry(case.name, n, entry)
+            proc.wait()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+def isolate_environment(scratch: Path) -> None:
+    # Before any tool module is imported: nothing may touch the real artifact
+    # store, start watcher/exporter/recorder threads or spawn import checks
+    os.environ["ARTIFACT_BASE_PATH"] = str(scratch / "artifacts")
+    os.environ["TOOL_METRICS"] = "false"
+    os.environ["TOOL_RECORD"] = ""
+    os.environ["TOOL_HOT_RELOAD"] = "false"
+    os.environ["TOOL_IMPORT_CHECK"] = "false"
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every agent tool at growing input sizes")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated input sizes")
+    parser.add_argument("--only", action="append", help="Run cases whose agent/tool name contains this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per size; the median is reported")
+    parser.add_argument("--max-seconds", type=float, default=DEFAULT_MAX_SECONDS,
+                        help=f"Skip sizes expected to take longer per call; kill a size after {SIZE_BUDGET_FACTOR}x this")
+    parser.add_argument("--baselines", default=str(DEFAULT_BASELINES))
+    parser.add_argument("--update-baselines", action="store_true", help="Store these results as the new baselines")
+    parser.add_argument("--time-threshold", type=float, default=DEFAULT_TIME_THRESHOLD, help="Allowed slowdown ratio")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD, help="Allowed peak memory ratio")
+    parser.add_argument("--output", help="Also write the report as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--scratch", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.worker:
+        case = next(c for c in CASES if c.name == args.worker)
+        isolate_environment(Path(args.scratch))
+        asyncio.run(run_case(case, Path(args.scratch), sizes, args.repeat, args.max_seconds))
+        return 0
+
+    cases = [c for c in CASES if not args.only or any(o in c.name for o in args.only)]
+    if not cases:
+        parser.error("no case matches --only")
+    results = {case.name: run_worker(case, sizes, args.repeat, args.max_seconds) for case in cases}
+
+    baselines_path = Path(args.baselines)
+    stored = json.loads(baselines_path.read_text(encoding="utf-8")) if baselines_path.is_file() else {}
+    machine = {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.machine()}
+    regressions = compare(results, stored.get("results", {}), args.time_threshold, args.memory_threshold)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine,
+        "sizes": sizes,
+        "results": results,
+        "regressions": regressions,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.update_baselines:
+        merged = stored.get("results", {})
+        for case_name, by_size in results.items():
+            merged.setdefault(case_name, {}).update(
+                {size: {"seconds": e["seconds"], "peak_bytes": e["peak_bytes"]} for size, e in by_size.items() if "seconds" in e}
+            )
+        baselines_path.parent.mkdir(parents=True, exist_ok=True)
+        baselines_path.write_text(json.dumps({"machine": machine, "results": merged}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baselines written to {baselines_path}")
+        return 0
+
+    if not stored:
+        print(f"No baselines at {baselines_path}; run with --update-baselines to create them")
+        return 0
+    if stored.get("machine") != machine:
+        print(f"Note: baselines were recorded on {stored.get('machine')}")
+    for r in regressions:
+        print(f"REGRESSION {r['case']} size {r['size']}: {r['metric']} {r['baseline']} -> {r['current']} (x{r['ratio']})")
+    print(f"{len(regressions)} regression(s) against {baselines_path}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
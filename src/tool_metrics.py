@@ -0,0 +1,331 @@
+# Per-tool latency, payload-size and error metrics
+#
+# `instrument_tool` wraps an agent tool. Each call updates counters in a shard
+# owned by the calling thread, so the call path takes no locks and does no
+# I/O. The counters are duration and input/output size histograms plus error
+# counts, per agent and tool. A background thread merges the shards every
+# TOOL_METRICS_INTERVAL seconds and writes them in the Prometheus text format
+# to TOOL_METRICS_FILE (default $ARTIFACT_BASE_PATH/metrics/tool_metrics.prom,
+# for a textfile collector). When TOOL_METRICS_PORT is set they are also
+# served at http://<host>:<port>/metrics. The p50/p95/p99 gauges are estimated
+# from the histogram buckets the same way Prometheus' histogram_quantile does.
+# With TOOL_RECORD set, the same wrapper also hands each call to the tool
+# recorder (src/tool_recorder.py) for later replay.
+# Other subsystems (the LLM response cache) add their series to the same file
+# and endpoint through `register_collector`.
+from __future__ import annotations
+import bisect
+import functools
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from solace_ai_connector.common.log import log
+from src.tool_recorder import active_recorder
+
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUANTILES = (0.5, 0.95, 0.99)
+DEFAULT_EXPORT_INTERVAL = 15.0
+_CONTEXT_ARGS = ("tool_context", "tool_config")
+_ENCODER = json.JSONEncoder(separators=(",", ":"), default=str)
+
+def metrics_enabled() -> bool:
+    return os.environ.get("TOOL_METRICS", "true").lower() not in {"0", "false", "no"}
+
+# -----------------------------
+# Recording
+# -----------------------------
+class _Series:
+    __slots__ = ("duration", "duration_sum", "input", "input_sum", "output", "output_sum", "errors")
+
+    def __init__(self):
+        self.duration = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration_sum = 0.0
+        self.input = [0] * (len(SIZE_BUCKETS) + 1)
+        self.input_sum = 0
+        self.output = [0] * (len(SIZE_BUCKETS) + 1)
+        self.output_sum = 0
+        self.errors: Dict[str, int] = {}
+
+_local = threading.local()
+_SHARDS: List[Dict[Tuple[str, str], _Series]] = []
+_SHARDS_LOCK = threading.Lock()
+
+def _shard() -> Dict[Tuple[str, str], _Series]:
+    try:
+        return _local.series
+    except AttributeError:
+        series: Dict[Tuple[str, str], _Series] = {}
+        with _SHARDS_LOCK:  # once per thread
+            _SHARDS.append(series)
+        _local.series = series
+        return series
+
+def _payload_size(value: Any) -> int:
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    try:
+        return len(_ENCODER.encode(value))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+def record_call(agent: str, tool: str, seconds: float, input_bytes: int, output_bytes: int, error: Optional[str] = None) -> None:
+    shard = _shard()
+    series = shard.get((agent, tool))
+    if series is None:
+        series = shard[(agent, tool)] = _Series()
+    series.duration[bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+    series.duration_sum += seconds
+    series.input[bisect.bisect_left(SIZE_BUCKETS, input_bytes)] += 1
+    series.input_sum += input_bytes
+    series.output[bisect.bisect_left(SIZE_BUCKETS, output_bytes)] += 1
+    series.output_sum += output_bytes
+    if error:
+        series.errors[error] = series.errors.get(error, 0) + 1
+
+def _agent_name(kwargs: Dict[str, Any], default: str) -> str:
+    inv_context = getattr(kwargs.get("tool_context"), "_invocation_context", None)
+    return getattr(inv_context, "app_name", None) or default
+
+def _input_size(args: tuple, kwargs: Dict[str, Any]) -> int:
+    payload = {k: v for k, v in kwargs.items() if k not in _CONTEXT_ARGS}
+    return _payload_size(payload) + sum(_payload_size(a) for a in args)
+
+def _result_error(result: Any) -> Optional[str]:
+    return "status_error" if isinstance(result, dict) and result.get("status") == "error" else None
+
+def instrument_tool(func: Callable) -> Callable:
+    """Decorator recording duration, payload sizes and errors of every call to a tool.
+
+    The wrapper keeps the tool's signature and docstring (ADK builds the tool
+    declaration from them). Returns the function unchanged when TOOL_METRICS
+    is disabled and TOOL_RECORD is not set.
+    """
+    metrics = metrics_enabled()
+    recorder = active_recorder()
+    if not (metrics or recorder) or getattr(func, "_instrumented", False):
+        return func
+    tool = func.__name__
+    # src.<agent>.tools -> <agent>; used when the call carries no invocation context
+    parts = func.__module__.split(".")
+    default_agent = parts[1] if len(parts) > 2 and parts[0] == "src" else parts[-1]
+
+    def observe(args: tuple, kwargs: Dict[str, Any], result: Any, elapsed: float, error: Optional[str]) -> None:
+        agent = _agent_name(kwargs, default_agent)
+        if metrics:
+            output_bytes = _payload_size(result) if result is not None else 0
+            record_call(agent, tool, elapsed, _input_size(args, kwargs), output_bytes, error)
+        if recorder:
+            recorder.record(func, agent, args, kwargs, result, elapsed, error)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                observe(args, kwargs, None, time.perf_counter() - started, type(e).__name__)
+                raise
+            observe(args, kwargs, result, time.perf_counter() - started, _result_error(result))
+            return result
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                observe(args, kwargs, None, time.perf_counter() - started, type(e).__name__)
+                raise
+            observe(args, kwargs, result, time.perf_counter() - started, _result_error(result))
+            return result
+
+    wrapper._instrumented = True
+    if metrics:
+        _ensure_exporter()
+    return wrapper
+
+# -----------------------------
+# Aggregation and export
+# -----------------------------
+def _merged() -> Dict[Tuple[str, str], _Series]:
+    merged: Dict[Tuple[str, str], _Series] = {}
+    with _SHARDS_LOCK:
+        shards = list(_SHARDS)
+    for shard in shards:
+        for key, series in list(shard.items()):
+            total = merged.get(key)
+            if total is None:
+                total = merged[key] = _Series()
+            for name in ("duration", "input", "output"):
+                counts = getattr(total, name)
+                for i, n in enumerate(getattr(series, name)):
+                    counts[i] += n
+            total.duration_sum += series.duration_sum
+            total.input_sum += series.input_sum
+            total.output_sum += series.output_sum
+            for kind, n in list(series.errors.items()):
+                total.errors[kind] = total.errors.get(kind, 0) + n
+    return merged
+
+def estimate_quantile(bounds: Tuple[float, ...], counts: List[int], q: float) -> Optional[float]:
+    """Linear interpolation inside the bucket holding the q-th observation."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    for i, n in enumerate(counts):
+        if cumulative + n >= rank and n:
+            if i == len(bounds):  # +Inf bucket: the best answer is its lower bound
+                return bounds[-1]
+            lower = bounds[i - 1] if i else 0.0
+            return lower + (bounds[i] - lower) * (rank - cumulative) / n
+        cumulative += n
+    return bounds[-1]
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Per agent/tool summary: calls, errors, p50/p95/p99 in ms and mean payload sizes."""
+    result: Dict[str, Dict[str, Any]] = {}
+    for (agent, tool), series in sorted(_merged().items()):
+        calls = sum(series.duration)
+        entry: Dict[str, Any] = {"calls": calls, "errors": dict(series.errors)}
+        for q in QUANTILES:
+            value = estimate_quantile(DURATION_BUCKETS, series.duration, q)
+            entry[f"p{int(q * 100)}_ms"] = round(value * 1000.0, 2) if value is not None else None
+        entry["mean_input_bytes"] = round(series.input_sum / calls) if calls else 0
+        entry["mean_output_bytes"] = round(series.output_sum / calls) if calls else 0
+        result[f"{agent}/{tool}"] = entry
+    return result
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _histogram_lines(name: str, labels: str, bounds: Tuple[float, ...], counts: List[int], total: float) -> List[str]:
+    lines, cumulative = [], 0
+    for bound, n in zip(bounds, counts):
+        cumulative += n
+        lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+    cumulative += counts[-1]
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+    lines.append(f"{name}_sum{{{labels}}} {total:g}")
+    lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return lines
+
+def render_prometheus() -> str:
+    merged = sorted(_merged().items())
+    sections = {
+        "duration": ["# HELP sam_tool_duration_seconds Tool call duration",
+                     "# TYPE sam_tool_duration_seconds histogram"],
+        "quantile": ["# HELP sam_tool_duration_quantile_seconds Tool call duration quantiles estimated from the histogram",
+                     "# TYPE sam_tool_duration_quantile_seconds gauge"],
+        "input": ["# HELP sam_tool_input_bytes Serialized size of tool arguments",
+                  "# TYPE sam_tool_input_bytes histogram"],
+        "output": ["# HELP sam_tool_output_bytes Serialized size of tool results",
+                   "# TYPE sam_tool_output_bytes histogram"],
+        "errors": ["# HELP sam_tool_errors_total Tool calls that raised (by exception type) or returned status error",
+                   "# TYPE sam_tool_errors_total counter"],
+    }
+    for (agent, tool), series in merged:
+        labels = f'agent="{_label(agent)}",tool="{_label(tool)}"'
+        sections["duration"] += _histogram_lines("sam_tool_duration_seconds", labels, DURATION_BUCKETS, series.duration, series.duration_sum)
+        for q in QUANTILES:
+            value = estimate_quantile(DURATION_BUCKETS, series.duration, q)
+            if value is not None:
+                sections["quantile"].append(f'sam_tool_duration_quantile_seconds{{{labels},quantile="{q:g}"}} {value:g}')
+        sections["input"] += _histogram_lines("sam_tool_input_bytes", labels, SIZE_BUCKETS, series.input, series.input_sum)
+        sections["output"] += _histogram_lines("sam_tool_output_bytes", labels, SIZE_BUCKETS, series.output, series.output_sum)
+        for kind, n in sorted(series.errors.items()):
+            sections["errors"].append(f'sam_tool_errors_total{{{labels},kind="{_label(kind)}"}} {n}')
+    extra = []
+    for collector in list(_COLLECTORS):
+        try:
+            extra += collector()
+        except Exception as e:
+            log.warning("[tool_metrics] Metrics collector %s failed: %s", getattr(collector, "__name__", collector), e)
+    return "\n".join([line for lines in sections.values() for line in lines] + extra) + "\n"
+
+_COLLECTORS: List[Callable[[], List[str]]] = []
+
+def register_collector(render: Callable[[], List[str]]) -> None:
+    """Export the Prometheus lines returned by `render` along with the tool metrics."""
+    with _SHARDS_LOCK:
+        if render in _COLLECTORS:
+            return
+        _COLLECTORS.append(render)
+    if metrics_enabled():
+        _ensure_exporter()
+
+def metrics_file() -> Path:
+    configured = os.environ.get("TOOL_METRICS_FILE")
+    if configured:
+        return Path(configured)
+    return Path(os.environ.get("ARTIFACT_BASE_PATH", "/tmp/samv2")) / "metrics" / "tool_metrics.prom"
+
+def write_metrics_file(path: Optional[Path] = None) -> Path:
+    """Write the current metrics atomically (a scraper never sees a partial file)."""
+    path = path or metrics_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(render_prometheus())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return path
+
+def _export_forever(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            write_metrics_file()
+        except Exception as e:
+            log.warning("[tool_metrics] Could not write metrics file: %s", e)
+
+def _serve_metrics(port: int) -> None:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((os.environ.get("TOOL_METRICS_HOST", "127.0.0.1"), port), _Handler)
+    threading.Thread(target=server.serve_forever, name="tool-metrics-http", daemon=True).start()
+    log.info("[tool_metrics] Serving tool metrics on port %d", port)
+
+_EXPORTER_STARTED = False
+
+def _ensure_exporter() -> None:
+    global _EXPORTER_STARTED
+    with _SHARDS_LOCK:
+        if _EXPORTER_STARTED:
+            return
+        _EXPORTER_STARTED = True
+    interval = float(os.environ.get("TOOL_METRICS_INTERVAL", DEFAULT_EXPORT_INTERVAL))
+    if interval > 0:
+        threading.Thread(target=_export_forever, args=(interval,), name="tool-metrics-export", daemon=True).start()
+    port = os.environ.get("TOOL_METRICS_PORT")
+    if port:
+        try:
+            _serve_metrics(int(port))
+        except (OSError, ValueError) as e:
+            log.warning("[tool_metrics] Could not serve metrics on port %s: %s", port, e)
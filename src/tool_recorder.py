@@ -0,0 +1,337 @@
+# Record and replay of tool invocations
+#
+# With TOOL_RECORD=<path>, `instrument_tool` appends every tool call to a log:
+# agent, tool module and function, arguments, duration, error kind and a hash
+# of the result. The log is JSON lines, or msgpack when the path ends in
+# .msgpack (needs the msgpack package). Arguments and result are serialized
+# on the call path. Hashing and file I/O run on a writer thread, so a recorded
+# service pays about one extra JSON encoding per call.
+#
+#   TOOL_RECORD=/var/log/sam/tools.jsonl sam run configs/
+#   python -m src.tool_recorder /var/log/sam/tools.jsonl                 # full speed, one call at a time
+#   python -m src.tool_recorder tools.jsonl --timing original --speed 2  # original spacing, twice as fast
+#   python -m src.tool_recorder tools.jsonl --only architect --output replay.json
+#
+# The replay imports the recorded modules (src.<agent>.tools) and calls the
+# functions with the recorded arguments. Each call gets a stub tool_context
+# with an in-memory artifact service and a scratch directory (the one from
+# src.tool_benchmark). The report lists, per tool, the calls whose result
+# hash changed and the latency against the recording. The exit code is 1 when
+# any result changed. Before hashing, results are normalised so the same
+# output hashes the same on another day or machine: dates and timestamps, the
+# tool_context base path and the repository path are replaced by placeholders.
+# A tool that reads artifacts which existed only in the recorded session
+# replays against an empty store and shows up as changed.
+from __future__ import annotations
+import argparse
+import asyncio
+import atexit
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import queue
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from solace_ai_connector.common.log import log
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+_CONTEXT_ARGS = ("tool_context", "tool_config")
+_ENCODER = json.JSONEncoder(separators=(",", ":"), sort_keys=True, default=str)
+_VOLATILE = (
+    (re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"), "<datetime>"),
+    (re.compile(r"\b\d{8}-\d{6}\b"), "<timestamp>"),
+)
+_BATCH = 256
+_STOP = object()
+
+# -----------------------------
+# Result hashing
+# -----------------------------
+def _replace_path(text: str, path: Optional[str], placeholder: str) -> str:
+    if not path:
+        return text
+    # Paths appear both raw and JSON-escaped (backslashes on Windows)
+    for variant in {path, json.dumps(path)[1:-1]}:
+        text = text.replace(variant, placeholder)
+    return text
+
+def normalise_result(encoded: str, base_path: Optional[str] = None) -> str:
+    text = _replace_path(encoded, base_path, "<base>")
+    text = _replace_path(text, str(REPO_ROOT), "<repo>")
+    for pattern, placeholder in _VOLATILE:
+        text = pattern.sub(placeholder, text)
+    return text
+
+def result_hash(encoded: str, base_path: Optional[str] = None) -> str:
+    return hashlib.sha256(normalise_result(encoded, base_path).encode("utf-8")).hexdigest()[:32]
+
+def _encode(value: Any) -> str:
+    try:
+        return _ENCODER.encode(value)
+    except (TypeError, ValueError):
+        return json.dumps(repr(value))
+
+def _base_path(tool_context: Any) -> Optional[str]:
+    base = getattr(tool_context, "app_base_path", None) or getattr(tool_context, "component_base_path", None)
+    return str(Path(base).resolve()) if base else None
+
+# -----------------------------
+# Recording
+# -----------------------------
+class ToolRecorder:
+    """Appends tool calls to a JSON lines (or msgpack) log from a writer thread."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.msgpack = path.suffix == ".msgpack"
+        if self.msgpack:
+            try:
+                import msgpack  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Recording tool calls to .msgpack requires the msgpack package") from e
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_forever, name="tool-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, func: Any, agent: str, args: tuple, kwargs: Dict[str, Any], result: Any,
+               seconds: float, error: Optional[str]) -> None:
+        arguments = {k: v for k, v in kwargs.items() if k not in _CONTEXT_ARGS}
+        if args:
+            try:
+                bound = inspect.signature(func).bind_partial(*args, **arguments).arguments
+                arguments = {k: v for k, v in bound.items() if k not in _CONTEXT_ARGS}
+            except TypeError:
+                arguments["_args"] = list(args)
+        self._queue.put((
+            time.time() - seconds, agent, func.__module__, func.__name__, _encode(arguments),
+            _encode(result) if error is None or error == "status_error" else None,
+            _base_path(kwargs.get("tool_context")), seconds, error,
+        ))
+
+    def _entry(self, item: tuple) -> Dict[str, Any]:
+        started, agent, module, tool, arguments, encoded, base_path, seconds, error = item
+        entry = {
+            "ts": round(started, 6),
+            "agent": agent,
+            "module": module,
+            "tool": tool,
+            "args": json.loads(arguments),
+            "result_hash": result_hash(encoded, base_path) if encoded is not None else None,
+            "duration_ms": round(seconds * 1000.0, 3),
+        }
+        if error:
+            entry["error"] = error
+        return entry
+
+    def _write_forever(self) -> None:
+        mode = "ab" if self.msgpack else "a"
+        packer = None
+        if self.msgpack:
+            import msgpack
+
+            packer = msgpack.Packer(default=str)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, mode, **({} if self.msgpack else {"encoding": "utf-8"})) as f:
+            while True:
+                items = [self._queue.get()]
+                try:
+                    while len(items) < _BATCH:
+                        items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                stop = any(item is _STOP for item in items)
+                for item in items:
+                    if item is _STOP:
+                        continue
+                    try:
+                        entry = self._entry(item)
+                        f.write(packer.pack(entry) if packer else _ENCODER.encode(entry) + "\n")
+                    except Exception as e:
+                        log.warning("[tool_recorder] Could not record a %s call: %s", item[3], e)
+                f.flush()
+                if stop:
+                    return
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+
+_RECORDER: Optional[ToolRecorder] = None
+_RECORDER_LOCK = threading.Lock()
+
+def active_recorder() -> Optional[ToolRecorder]:
+    """The process-wide recorder when TOOL_RECORD names a log file, else None."""
+    global _RECORDER
+    path = os.environ.get("TOOL_RECORD", "").strip()
+    if not path or path.lower() in {"0", "false", "no"}:
+        return None
+    with _RECORDER_LOCK:
+        if _RECORDER is None or _RECORDER.path != Path(path):
+            try:
+                _RECORDER = ToolRecorder(Path(path))
+            except ImportError as e:
+                log.warning("[tool_recorder] Tool calls are not recorded: %s", e)
+                return None
+            log.info("[tool_recorder] Recording tool calls to %s", path)
+        return _RECORDER
+
+# -----------------------------
+# Replay
+# -----------------------------
+def read_log(path: Path) -> Iterator[Dict[str, Any]]:
+    if path.suffix == ".msgpack":
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError("Reading a .msgpack tool log requires the msgpack package") from e
+        with open(path, "rb") as f:
+            yield from msgpack.Unpacker(f, raw=False)
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+async def _replay_one(entry: Dict[str, Any], functions: Dict[Tuple[str, str], Any], contexts: Dict[str, Any]) -> Dict[str, Any]:
+    func = functions[(entry["module"], entry["tool"])]
+    tool_context = contexts[entry["agent"]]
+    arguments = dict(entry.get("args") or {})
+    args = arguments.pop("_args", [])
+    error = None
+    encoded = None
+    started = time.perf_counter()
+    try:
+        result = func(*args, tool_context=tool_context, **arguments)
+        if inspect.isawaitable(result):
+            result = await result
+        encoded = _encode(result)
+        if isinstance(result, dict) and result.get("status") == "error":
+            error = "status_error"
+    except Exception as e:
+        error = type(e).__name__
+    seconds = time.perf_counter() - started
+    digest = result_hash(encoded, _base_path(tool_context)) if encoded is not None else None
+    return {"duration_ms": seconds * 1000.0, "result_hash": digest, "error": error}
+
+async def replay(entries: List[Dict[str, Any]], scratch: Path, timing: str = "fast", speed: float = 1.0) -> List[Dict[str, Any]]:
+    """Re-run recorded calls. "fast": one after another; "original": at the recorded offsets / speed."""
+    from src.tool_benchmark import StubToolContext
+
+    functions: Dict[Tuple[str, str], Any] = {}
+    contexts: Dict[str, Any] = {}
+    for entry in entries:
+        key = (entry["module"], entry["tool"])
+        if key not in functions:
+            functions[key] = getattr(importlib.import_module(entry["module"]), entry["tool"])
+        if entry["agent"] not in contexts:
+            context = StubToolContext(scratch / re.sub(r"[^\w.-]", "_", entry["agent"]))
+            context._invocation_context.app_name = entry["agent"]
+            contexts[entry["agent"]] = context
+
+    if timing == "fast":
+        return [await _replay_one(entry, functions, contexts) for entry in entries]
+
+    first = entries[0]["ts"] if entries else 0.0
+    started = time.monotonic()
+
+    async def scheduled(entry: Dict[str, Any]) -> Dict[str, Any]:
+        delay = started + (entry["ts"] - first) / speed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await _replay_one(entry, functions, contexts)
+
+    return list(await asyncio.gather(*(scheduled(entry) for entry in entries)))
+
+def build_report(entries: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    per_tool: Dict[str, Dict[str, Any]] = {}
+    for index, (entry, result) in enumerate(zip(entries, results)):
+        name = f"{entry['agent']}/{entry['tool']}"
+        tool = per_tool.setdefault(name, {"calls": 0, "mismatches": [], "recorded_ms": [], "replayed_ms": []})
+        tool["calls"] += 1
+        tool["recorded_ms"].append(entry["duration_ms"])
+        tool["replayed_ms"].append(result["duration_ms"])
+        if result["result_hash"] != entry.get("result_hash") or result["error"] != entry.get("error"):
+            tool["mismatches"].append({
+                "index": index,
+                "recorded": entry.get("error") or entry.get("result_hash"),
+                "replayed": result["error"] or result["result_hash"],
+            })
+    report = {}
+    for name, tool in sorted(per_tool.items()):
+        recorded = statistics.median(tool["recorded_ms"])
+        replayed = statistics.median(tool["replayed_ms"])
+        report[name] = {
+            "calls": tool["calls"],
+            "mismatches": tool["mismatches"],
+            "recorded_p50_ms": round(recorded, 3),
+            "replayed_p50_ms": round(replayed, 3),
+            "delta_ms": round(replayed - recorded, 3),
+            "delta_pct": round((replayed - recorded) / recorded * 100.0, 1) if recorded else None,
+        }
+    return report
+
+def format_report(report: Dict[str, Dict[str, Any]]) -> str:
+    lines = [f"{'tool':<48} {'calls':>6} {'changed':>8} {'recorded p50':>13} {'replayed p50':>13} {'delta':>9}"]
+    for name, tool in report.items():
+        delta = f"{tool['delta_pct']:+.1f}%" if tool["delta_pct"] is not None else "n/a"
+        lines.append(f"{name:<48} {tool['calls']:>6} {len(tool['mismatches']):>8} "
+                     f"{tool['recorded_p50_ms']:>10.3f} ms {tool['replayed_p50_ms']:>10.3f} ms {delta:>9}")
+        for mismatch in tool["mismatches"][:5]:
+            lines.append(f"    call #{mismatch['index']}: {mismatch['recorded']} -> {mismatch['replayed']}")
+        if len(tool["mismatches"]) > 5:
+            lines.append(f"    ... {len(tool['mismatches']) - 5} more")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded tool-call log against the current tools")
+    parser.add_argument("log", help="Log written with TOOL_RECORD (.jsonl or .msgpack)")
+    parser.add_argument("--timing", choices=("fast", "original"), default="fast",
+                        help="fast: back to back; original: keep the recorded spacing (calls may overlap)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time compression for --timing original")
+    parser.add_argument("--only", help="Replay only calls whose agent/tool name or module contains this text")
+    parser.add_argument("--limit", type=int, help="Replay at most this many calls")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    entries = list(read_log(Path(args.log)))
+    if args.only:
+        entries = [e for e in entries if args.only in f"{e['agent']}/{e['tool']} {e['module']}"]
+    entries = entries[: args.limit] if args.limit else entries
+    if not entries:
+        print("No tool calls to replay")
+        return 0
+
+    from src.tool_benchmark import isolate_environment
+
+    scratch = Path(tempfile.mkdtemp(prefix="tool_replay_"))
+    try:
+        isolate_environment(scratch)
+        started = time.perf_counter()
+        results = asyncio.run(replay(entries, scratch, args.timing, args.speed))
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = build_report(entries, results)
+    print(format_report(report))
+    changed = sum(len(tool["mismatches"]) for tool in report.values())
+    print(f"\n{len(entries)} calls replayed in {elapsed:.2f}s, {changed} with a different result")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if changed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# Hot reload for scaffolded tool modules
+#
+# `sam run` hosts every agent app in one process and each python tool keeps a
+# reference to the function object it imported at startup. Reloading a module
+# therefore has to update those existing function objects in place: the new
+# source is compiled and executed into a scratch namespace first (so a broken
+# module is rejected before anything changes), then every function that still
+# exists gets the new code object swapped into the old function object.
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from solace_ai_connector.common.log import log
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+_WATCHED: Dict[str, Tuple[Path, int]] = {}
+_LOCK = threading.RLock()
+_POLLER: Optional[threading.Thread] = None
+
+def hot_reload_enabled() -> bool:
+    return os.environ.get("TOOL_HOT_RELOAD", "true").lower() not in {"0", "false", "no"}
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+def _mark_seen(module_name: str, path: Path, mtime: int) -> None:
+    # Also called for rejected reloads, so a broken file is retried only once it changes again
+    if module_name in _WATCHED:
+        _WATCHED[module_name] = (path, mtime)
+
+def _swap_function(old: types.FunctionType, new: types.FunctionType) -> bool:
+    """Give `old` the behaviour of `new` without changing its identity."""
+    # Decorated tools (functools.wraps): the wrapper's closure holds the old inner
+    # function, so that one has to be patched as well
+    old_inner, new_inner = getattr(old, "__wrapped__", None), getattr(new, "__wrapped__", None)
+    if isinstance(old_inner, types.FunctionType) and isinstance(new_inner, types.FunctionType):
+        if not _swap_function(old_inner, new_inner):
+            return False
+        new.__wrapped__ = old_inner
+    try:
+        old.__code__ = new.__code__
+    except ValueError:
+        # Different closure layout; callers holding `old` keep the previous code
+        return False
+    old.__defaults__ = new.__defaults__
+    old.__kwdefaults__ = new.__kwdefaults__
+    old.__annotations__ = new.__annotations__
+    old.__doc__ = new.__doc__
+    old.__dict__.update(new.__dict__)
+    return True
+
+def reload_module(module_name: str) -> Dict[str, Any]:
+    """Recompile a loaded module and patch its functions in place.
+
+    Returns a summary with the functions that were updated, added and removed;
+    on compile or import errors the old module is left untouched and the
+    error is returned.
+    """
+    module = sys.modules.get(module_name)
+    if module is None or not getattr(module, "__file__", None):
+        return {"status": "skipped", "module": module_name, "reason": "module not loaded"}
+    path = Path(module.__file__)
+
+    with _LOCK:
+        mtime = _mtime_ns(path)
+        try:
+            source = path.read_text(encoding="utf-8")
+            code = compile(source, str(path), "exec", dont_inherit=True)
+        except (OSError, SyntaxError, ValueError) as e:
+            _mark_seen(module_name, path, mtime)
+            log.warning("[tool_reloader] Rejected reload of %s: %s", module_name, e)
+            return {"status": "error", "module": module_name, "error": f"{type(e).__name__}: {e}"}
+
+        scratch: Dict[str, Any] = {
+            "__name__": module_name,
+            "__file__": str(path),
+            "__package__": module.__package__,
+            "__spec__": module.__spec__,
+            "__loader__": module.__loader__,
+            "__builtins__": module.__dict__.get("__builtins__", __builtins__),
+        }
+        try:
+            exec(code, scratch)
+        except Exception as e:
+            _mark_seen(module_name, path, mtime)
+            log.warning("[tool_reloader] Rejected reload of %s: %s", module_name, e)
+            return {"status": "error", "module": module_name, "error": f"{type(e).__name__}: {e}"}
+
+        namespace = module.__dict__
+        previous = {
+            name: obj for name, obj in namespace.items()
+            if isinstance(obj, types.FunctionType) and obj.__module__ == module_name
+        }
+        updated, rebound = [], []
+        for name, new_obj in scratch.items():
+            old_obj = previous.get(name)
+            if old_obj is not None and isinstance(new_obj, types.FunctionType):
+                if _swap_function(old_obj, new_obj):
+                    scratch[name] = old_obj
+                    updated.append(name)
+                else:
+                    rebound.append(name)
+        namespace.update(scratch)
+
+        added = sorted(
+            name for name, obj in scratch.items()
+            if isinstance(obj, types.FunctionType) and obj.__module__ == module_name and name not in previous
+        )
+        removed = sorted(name for name in previous if name not in scratch)
+        _mark_seen(module_name, path, mtime)
+
+    log.info(
+        "[tool_reloader] Reloaded %s: %d updated, %d added, %d removed",
+        module_name, len(updated), len(added), len(removed),
+    )
+    result = {
+        "status": "success",
+        "module": module_name,
+        "updated": sorted(updated),
+        "added": added,
+        "removed": removed,
+    }
+    if rebound:
+        result["rebound_only"] = sorted(rebound)
+    if added:
+        result["note"] = "New functions need a tools entry in the agent YAML before the agent can call them"
+    return result
+
+def check_for_changes() -> List[Dict[str, Any]]:
+    """Reload every watched module whose file changed since it was last loaded."""
+    with _LOCK:
+        changed = [
+            name for name, (path, seen) in _WATCHED.items()
+            if _mtime_ns(path) != seen
+        ]
+    return [reload_module(name) for name in changed]
+
+def _poll_forever(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            check_for_changes()
+        except Exception as e:
+            log.warning("[tool_reloader] Watch loop error: %s", e)
+
+def watch_module(module_name: str) -> None:
+    """Register a loaded module for mtime-based hot reload.
+
+    Generated tool modules call this at import time; it is idempotent and a
+    no-op when TOOL_HOT_RELOAD is disabled.
+    """
+    global _POLLER
+    if not hot_reload_enabled():
+        return
+    module = sys.modules.get(module_name)
+    file = getattr(module, "__file__", None)
+    if not file:
+        return
+    path = Path(file)
+    with _LOCK:
+        if module_name not in _WATCHED:
+            _WATCHED[module_name] = (path, _mtime_ns(path))
+        if _POLLER is None:
+            interval = float(os.environ.get("TOOL_RELOAD_INTERVAL", DEFAULT_POLL_INTERVAL))
+            _POLLER = threading.Thread(
+                target=_poll_forever, args=(interval,), name="tool-reloader", daemon=True
+            )
+            _POLLER.start()
@@ -0,0 +1,35 @@
+from __future__ import annotations
+import importlib.util
+from src.agent_scaffolder.tools import _atomic_write_stream, _validate_module
+
+def _write(py_file, text, base):
+    return _atomic_write_stream(py_file, (text,), lambda staged: _validate_module(staged, py_file, "src.demo.tools", base))
+
+def test_module_is_only_replaced_after_it_validates(tmp_path):
+    package = tmp_path / "src" / "demo"
+    package.mkdir(parents=True)
+    (tmp_path / "src" / "__init__.py").write_text("", encoding="utf-8")
+    (package / "__init__.py").write_text("", encoding="utf-8")
+    py_file = package / "tools.py"
+    py_file.write_text("VALUE = 1\n", encoding="utf-8")
+
+    for broken in ("VALUE = (\n", "raise RuntimeError('import fails')\n"):
+        assert _write(py_file, broken, tmp_path)
+        assert py_file.read_text(encoding="utf-8") == "VALUE = 1\n"
+    assert sorted(p.name for p in package.iterdir() if p.is_file()) == ["__init__.py", "tools.py"]
+
+    assert _write(py_file, "VALUE = 2\n", tmp_path) is None
+    assert py_file.read_text(encoding="utf-8") == "VALUE = 2\n"
+    assert (tmp_path / importlib.util.cache_from_source(str(py_file))).exists()
+
+def test_batch_reports_malformed_entries_per_agent(monkeypatch):
+    import asyncio
+    from src.agent_scaffolder import tools
+
+    async def fake_define(**kwargs):
+        return {"status": "success", "module_path": f"src.{kwargs['agent_name']}.tools", "yaml_tools_block": "- tool"}
+
+    monkeypatch.setattr(tools, "define_dynamic_tools", fake_define)
+    result = asyncio.run(tools.define_dynamic_tools_batch([{"agent_name": "good", "tools": []}, "bad", None]))
+    assert result["status"] == "partial"
+    assert [r["status"] for r in result["results"]] == ["success", "error", "error"]
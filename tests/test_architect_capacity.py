@@ -0,0 +1,35 @@
+from __future__ import annotations
+import asyncio
+import pytest
+from src.architect_agent.tools import analyze_requirements, plan_capacity
+
+@pytest.mark.parametrize("requirements", [
+    {"target_rps": 100, "service_times_ms": {"a": 0}},
+    {"target_rps": 0, "service_times_ms": {"a": 10}},
+    {"target_rps": 100, "service_times_ms": {"a": -5}},
+    {"target_rps": 100, "service_times_ms": {}},
+])
+def test_invalid_capacity_inputs_are_reported_not_raised(requirements):
+    result = asyncio.run(analyze_requirements("An API", performance_requirements=requirements))
+    assert result["status"] == "success"
+    assert result["capacity_plan"]["status"] == "error"
+
+    direct = asyncio.run(plan_capacity(requirements["target_rps"], 500, requirements["service_times_ms"]))
+    assert direct == result["capacity_plan"]
+
+def test_valid_capacity_inputs_are_sized():
+    result = asyncio.run(analyze_requirements("An API", performance_requirements={"target_rps": 100, "service_times_ms": {"a": 10}}))
+    assert result["capacity_plan"]["all_targets_met"] is True
+
+@pytest.mark.parametrize("workers, max_instances", [(2.0, 50.0), ("2", "50"), ("2.0", 50)])
+def test_numeric_strings_and_whole_floats_are_coerced(workers, max_instances):
+    result = asyncio.run(plan_capacity("100", 500.0, {"api": 10.0}, workers_per_instance=workers, max_instances=max_instances))
+    expected = asyncio.run(plan_capacity(100, 500, {"api": 10}, workers_per_instance=2, max_instances=50))
+    assert result["status"] == "success"
+    assert result["tiers"] == expected["tiers"]
+
+def test_non_numeric_sizing_inputs_are_reported():
+    result = asyncio.run(plan_capacity(100, 500, {"api": 10}, workers_per_instance="two"))
+    assert result["status"] == "error"
+    requirements = {"target_rps": 100, "service_times_ms": {"api": 10}, "workers_per_instance": "two"}
+    assert asyncio.run(analyze_requirements("An API", performance_requirements=requirements))["capacity_plan"]["status"] == "error"
@@ -0,0 +1,34 @@
+from __future__ import annotations
+import asyncio
+from src.columnar_query import query_table_artifact
+
+def test_host_path_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.delenv("ARTIFACT_LOCAL_DIRS", raising=False)
+    monkeypatch.setenv("COLUMNAR_CACHE_DIR", str(tmp_path / "cache"))
+    result = asyncio.run(query_table_artifact("/etc/passwd", source_format="csv"))
+    assert result["status"] == "error"
+    assert "rows" not in result
+
+def test_path_outside_allowlist_is_rejected(tmp_path, monkeypatch):
+    allowed = tmp_path / "allowed"
+    allowed.mkdir()
+    (allowed / "table.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+    (tmp_path / "secret.csv").write_text("a,b\n9,9\n", encoding="utf-8")
+    monkeypatch.setenv("ARTIFACT_LOCAL_DIRS", str(allowed))
+    monkeypatch.setenv("COLUMNAR_CACHE_DIR", str(tmp_path / "cache"))
+
+    assert asyncio.run(query_table_artifact("table.csv"))["rows"] == [{"a": 1, "b": 2}]
+    for name in ("../secret.csv", str(tmp_path / "secret.csv"), "/etc/passwd"):
+        assert asyncio.run(query_table_artifact(name, source_format="csv"))["status"] == "error"
+
+def test_min_max_of_string_columns(tmp_path, monkeypatch):
+    allowed = tmp_path / "allowed"
+    allowed.mkdir()
+    (allowed / "people.csv").write_text("team,name\nb,zoe\na,mia\nb,ann\na,\n", encoding="utf-8")
+    monkeypatch.setenv("ARTIFACT_LOCAL_DIRS", str(allowed))
+    monkeypatch.setenv("COLUMNAR_CACHE_DIR", str(tmp_path / "cache"))
+
+    overall = asyncio.run(query_table_artifact("people.csv", aggregations={"name": "min"}))
+    assert overall["rows"][0]["name_min"] == "ann"
+    grouped = asyncio.run(query_table_artifact("people.csv", group_by=["team"], aggregations={"name": "max"}))
+    assert sorted((r["team"], r["name_max"]) for r in grouped["rows"]) == [("a", "mia"), ("b", "zoe")]
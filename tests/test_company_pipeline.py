@@ -0,0 +1,16 @@
+from __future__ import annotations
+import asyncio
+import pytest
+from src.company_pipeline import run_company_pipeline
+
+@pytest.mark.parametrize("team_size", [0, -3])
+def test_team_size_must_be_positive(team_size):
+    result = asyncio.run(run_company_pipeline("A customer web portal", team_size=team_size))
+    assert result["status"] == "error"
+
+def test_bundle_records_the_plan_team_size():
+    result = asyncio.run(run_company_pipeline("A customer web portal with login and payments", team_size=4))
+    assumptions = result["bundle"]["plan_assumptions"]
+    assert assumptions["team_size"] == result["summary"]["plan_team_size"] == 4
+    assert assumptions["staffing_target_team_size"] == result["summary"]["target_team_size"]
+    assert assumptions["staffing_gap"] == assumptions["staffing_target_team_size"] - 4
@@ -0,0 +1,20 @@
+from __future__ import annotations
+import pytest
+from google.adk.tools import FunctionTool
+from src.architect_agent.tools import plan_capacity
+from src.fast_path import CommandError, parse_commands, validate_args
+from src.program_manager_agent.tools import create_project_plan
+
+def test_documented_examples_validate():
+    commands = parse_commands(
+        '/call ArchitectAgent.plan_capacity {"target_rps": 500, "p95_latency_ms": 300, "service_times_ms": {"api": 20, "db": 8}}\n'
+        '/call create_project_plan {"project_name": "Portal", "project_description": "Customer portal", "duration_weeks": 12}'
+    )
+    tools = {"plan_capacity": FunctionTool(plan_capacity), "create_project_plan": FunctionTool(create_project_plan)}
+    for command in commands:
+        validate_args(tools[command.tool], command.args)
+
+@pytest.mark.parametrize("injected", ["tool_context", "tool_config"])
+def test_injected_parameters_are_rejected(injected):
+    with pytest.raises(CommandError):
+        validate_args(FunctionTool(create_project_plan), {"project_name": "P", "project_description": "D", injected: {}})
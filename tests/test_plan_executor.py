@@ -0,0 +1,35 @@
+from __future__ import annotations
+import asyncio
+from types import SimpleNamespace
+from google.adk.models.llm_request import LlmRequest
+from google.adk.tools import FunctionTool
+from google.genai import types
+from src.fast_path import fast_path_response
+from src.plan_executor import CALL_ID_PREFIX, STATE_KEY, plan_model_callback, run_plan
+
+SETTINGS = {"max_parallel": 4, "branch_timeout_seconds": 60.0, "context_chars": 4000, "request_timeout_seconds": 600.0}
+
+async def _peer(task_description: str) -> str:
+    return task_description
+
+def _request(*parts: types.Part) -> LlmRequest:
+    request = LlmRequest(contents=[types.Content(role="user", parts=list(parts))])
+    request.tools_dict = {"run_plan": FunctionTool(run_plan), "peer_ArchitectAgent": FunctionTool(_peer)}
+    return request
+
+def test_fast_path_run_plan_dispatches_the_first_wave():
+    context = SimpleNamespace(state={})
+    callback = plan_model_callback(None, SETTINGS, lambda ctx, req: fast_path_response(req, "OrchestratorAgent", ("*",)))
+    steps = [{"id": "design", "agent": "ArchitectAgent", "task": "Design it"}]
+
+    first = asyncio.run(callback(context, _request(types.Part(text=f'/call run_plan {{"steps": [{{"id": "design", "agent": "ArchitectAgent", "task": "Design it"}}]}}'))))
+    call = first.content.parts[0].function_call
+    assert call.name == "run_plan" and call.id.startswith("fastpath-")
+
+    scheduled = asyncio.run(run_plan(steps, tool_context=SimpleNamespace(state=context.state)))
+    response = types.Part(function_response=types.FunctionResponse(id=call.id, name="run_plan", response=scheduled))
+    wave = asyncio.run(callback(context, _request(response)))
+    calls = [p.function_call for p in wave.content.parts]
+    assert [c.name for c in calls] == ["peer_ArchitectAgent"]
+    assert calls[0].id.startswith(CALL_ID_PREFIX)
+    assert context.state[STATE_KEY]["steps"][0]["status"] == "running"
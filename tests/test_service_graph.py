@@ -0,0 +1,21 @@
+from __future__ import annotations
+import json
+from src.architect_agent.service_graph import analyze_service_graph, parse_service_graph
+
+def _analyze(doc, focus=None):
+    return analyze_service_graph(parse_service_graph(json.dumps(doc).encode(), "json"), focus=focus)
+
+def test_self_loop_is_a_cycle_everywhere():
+    result = _analyze({"a": ["a", "b"], "b": []}, focus=["a", "b"])
+    assert result["cycles"]["self_loops"] == ["a"]
+    assert result["focus"]["a"]["in_cycle"] is True
+    assert result["focus"]["b"]["in_cycle"] is False
+    assert result["longest_sync_chain"]["cyclic_segments"] == [["a"]]
+    assert result["longest_sync_chain"]["contains_cycle"] is True
+
+def test_empty_graph_has_the_same_keys():
+    empty = _analyze({})
+    full = _analyze({"a": ["b"], "b": []})
+    assert empty.keys() == full.keys()
+    assert empty["longest_sync_chain"].keys() == full["longest_sync_chain"].keys()
+    assert empty["longest_sync_chain"]["cyclic_segments"] == []
@@ -0,0 +1,45 @@
+from __future__ import annotations
+import asyncio
+from src.session_store import SqliteSessionService
+
+def test_create_session_keeps_scoped_initial_state(tmp_path):
+    async def scenario():
+        db = str(tmp_path / "sessions.db")
+        service = SqliteSessionService(db)
+        created = await service.create_session(
+            app_name="app", user_id="u1", session_id="s1",
+            state={"user:n": 2, "app:mode": "fast", "plain": 1, "temp:x": 0},
+        )
+        assert created.state == {"plain": 1, "user:n": 2, "app:mode": "fast"}
+
+        fetched = await service.get_session(app_name="app", user_id="u1", session_id="s1")
+        assert fetched.state["user:n"] == 2 and fetched.state["app:mode"] == "fast"
+        other = await service.create_session(app_name="app", user_id="u2")
+        assert other.state == {"app:mode": "fast"}
+        service.close()
+
+        reopened = SqliteSessionService(db)
+        fetched = await reopened.get_session(app_name="app", user_id="u1", session_id="s1")
+        assert fetched.state == {"plain": 1, "user:n": 2, "app:mode": "fast"}
+        reopened.close()
+
+    asyncio.run(scenario())
+
+def test_scoped_state_is_released_with_the_last_cached_session(tmp_path):
+    async def scenario():
+        service = SqliteSessionService(str(tmp_path / "sessions.db"), cache_size=2, flush_interval=60)
+        for n in range(20):
+            await service.create_session(app_name="app", user_id=f"u{n}", session_id="s", state={"user:n": n})
+        info = service.cache_info()
+        assert info["cached_sessions"] == 2 and info["cached_user_states"] == 2
+
+        # Evicted users reload their state, including writes that were still queued
+        fetched = await service.get_session(app_name="app", user_id="u3", session_id="s")
+        assert fetched.state["user:n"] == 3
+        assert service.cache_info()["cached_user_states"] == 2
+
+        await service.delete_session(app_name="app", user_id="u3", session_id="s")
+        assert service.cache_info()["cached_user_states"] == 1
+        service.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,6 @@
+from __future__ import annotations
+from src.startup_profiler import DEFAULT_SAM_APP_MODULE, app_modules
+
+def test_app_modules_skips_malformed_tool_entries():
+    app = {"app_config": {"tools": ["builtin", None, {"tool_type": "python", "component_module": "src.x.tools"}]}}
+    assert app_modules(app) == (DEFAULT_SAM_APP_MODULE, ["src.x.tools"])